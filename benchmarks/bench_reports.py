@@ -0,0 +1,50 @@
+"""
+Сравнение пакетного отчета spending_by_categories с циклом вызовов spending_by_category.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.bench_reports --file operations.xlsx --months 12
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from src.reports import spending_by_categories, spending_by_category
+from src.store import TransactionStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--file', default='operations.xlsx', help='Файл с операциями.')
+    parser.add_argument('--months', type=int, default=12, help='Число последних концов месяцев.')
+    args = parser.parse_args()
+
+    store = TransactionStore.from_file(args.file)
+    categories = sorted(store.frame['Категория'].dropna().unique())
+    last_date = store.dates[-1]
+    dates = [date.strftime('%Y-%m-%d') for date in pd.date_range(end=last_date, periods=args.months, freq='M')]
+    store.cube
+
+    started = time.perf_counter()
+    batch = spending_by_categories.__wrapped__(store, categories, dates).to_list()
+    batch_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    single = [json.loads(spending_by_category.__wrapped__(store, category, date))
+              for category in categories for date in dates]
+    loop_time = time.perf_counter() - started
+
+    matches = all(np.isclose(a['spending'], b['spending'], atol=0.005) for a, b in zip(batch, single))
+    print(json.dumps({
+        "pairs": len(batch),
+        "batch_s": round(batch_time, 4),
+        "loop_s": round(loop_time, 4),
+        "speedup": round(loop_time / batch_time, 1),
+        "results_match": matches
+    }, ensure_ascii=False, indent=4))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Замеры времени и пиковой памяти основных точек входа на синтетических данных.
+
+Запуск из корня проекта:
+
+    python -m benchmarks.run --sizes 10k,100k --output results.json
+    python -m benchmarks.run --sizes 10k,100k --compare results.json --threshold 1.25
+
+Для каждого размера набора генерируется выгрузка (benchmarks.synthetic), из нее
+строится TransactionStore, и каждая точка входа вызывается несколько раз:
+в результат попадают min/median/mean/stddev времени (как в pytest-benchmark)
+и пик памяти по tracemalloc за один дополнительный вызов. Рыночные данные
+(курсы валют и цены акций) подменяются локальными заглушками.
+
+С --compare медианы сравниваются с прошлым файлом результатов; если какая-то
+точка входа замедлилась больше чем в threshold раз, код возврата - 1.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import generate_transactions
+from src.reports import spending_by_category
+from src.schema import apply_schema
+from src.services import profitable_cashback_categories
+from src.store import TransactionStore
+from src.views import events_page, home_page
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_SIZES = '10k,100k'
+SIZE_SUFFIXES = {'k': 1000, 'm': 1000000}
+USER_SETTINGS = {'user_currencies': ['USD', 'EUR'], 'user_stocks': ['AAPL', 'AMZN', 'GOOGL', 'MSFT', 'TSLA']}
+# Дата запросов - конец синтетической истории
+BENCH_DATE = datetime(2021, 12, 20, 14, 30, 0)
+
+
+def parse_size(size: str) -> int:
+    """
+    Разбирает размер набора: '10k' -> 10000, '1m' -> 1000000.
+
+    Аргументы:
+        size (str): Размер набора.
+
+    Возвращает:
+        int: Число операций.
+    """
+    size = size.strip().lower()
+    if size[-1:] in SIZE_SUFFIXES:
+        return int(float(size[:-1]) * SIZE_SUFFIXES[size[-1]])
+    return int(size)
+
+
+def get_entry_points(store: TransactionStore) -> dict:
+    """
+    Возвращает замеряемые точки входа для хранилища.
+
+    Аргументы:
+        store (TransactionStore): Хранилище синтетических операций.
+
+    Возвращает:
+        dict: Название -> функция без аргументов.
+    """
+    date_time = BENCH_DATE.strftime('%Y-%m-%d %H:%M:%S')
+    date = BENCH_DATE.strftime('%Y-%m-%d')
+    return {
+        'home_page': lambda: home_page(date_time, store, USER_SETTINGS),
+        'events_page[M]': lambda: events_page(date, 'M', store, USER_SETTINGS),
+        'events_page[Y]': lambda: events_page(date, 'Y', store, USER_SETTINGS),
+        'events_page[ALL]': lambda: events_page(date, 'ALL', store, USER_SETTINGS),
+        # Без записи файла отчета: замеряется расчет
+        'spending_by_category': lambda: spending_by_category.__wrapped__(store, 'Супермаркеты', date),
+        'profitable_cashback_categories': lambda: profitable_cashback_categories(store, 2021, 11),
+    }
+
+
+def measure(func: Callable, rounds: int) -> dict:
+    """
+    Замеряет время и пиковую память функции.
+
+    Аргументы:
+        func (Callable): Функция без аргументов.
+        rounds (int): Число замеров времени.
+
+    Возвращает:
+        dict: rounds, min, median, mean, stddev (секунды) и peak_memory_bytes.
+    """
+    func()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "rounds": rounds,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "peak_memory_bytes": peak
+    }
+
+
+def run(sizes: List[int], rounds: int = 5, seed: int = 0, names: Optional[List[str]] = None) -> dict:
+    """
+    Выполняет замеры для всех размеров наборов.
+
+    Аргументы:
+        sizes (list): Размеры наборов (число операций).
+        rounds (int): Число замеров времени на точку входа.
+        seed (int): Зерно генератора данных.
+        names (list): Только эти точки входа.
+
+    Возвращает:
+        dict: Результаты в формате для сохранения в JSON.
+    """
+    results = []
+    with patch('src.views.get_currency_rates', side_effect=lambda currencies: {c: 90.0 for c in currencies}), \
+            patch('src.views.get_stock_prices', side_effect=lambda stocks: {s: 100.0 for s in stocks}):
+        for rows in sizes:
+            started = time.perf_counter()
+            store = TransactionStore(apply_schema(generate_transactions(rows, seed, as_text=False)))
+            store.cube
+            setup = time.perf_counter() - started
+            for name, func in get_entry_points(store).items():
+                if names and name not in names:
+                    continue
+                result = measure(func, rounds)
+                results.append({"name": name, "rows": rows, "setup_s": setup, **result})
+                print('%-32s %10d rows  median %9.2f ms  peak %8.1f MiB' % (
+                    name, rows, result['median'] * 1000, result['peak_memory_bytes'] / 2 ** 20), file=sys.stderr)
+
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "seed": seed
+        },
+        "results": results
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Сравнивает медианы времени с прошлыми результатами.
+
+    Аргументы:
+        current (dict): Текущие результаты.
+        baseline (dict): Прошлые результаты.
+        threshold (float): Допустимое отношение медиан (текущая / прошлая).
+
+    Возвращает:
+        list: Записи {"name", "rows", "baseline", "current", "ratio", "regression"} по общим замерам.
+    """
+    previous = {(result['name'], result['rows']): result for result in baseline['results']}
+    report = []
+    for result in current['results']:
+        old = previous.get((result['name'], result['rows']))
+        if old is None:
+            continue
+        ratio = result['median'] / old['median'] if old['median'] else float('inf')
+        report.append({
+            "name": result['name'],
+            "rows": result['rows'],
+            "baseline": old['median'],
+            "current": result['median'],
+            "ratio": ratio,
+            "regression": ratio > threshold
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='Размеры наборов через запятую: 10k,100k,1m,10m.')
+    parser.add_argument('--rounds', type=int, default=5, help='Число замеров времени.')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно генератора данных.')
+    parser.add_argument('--only', default='', help='Только эти точки входа (через запятую).')
+    parser.add_argument('--output', help='Файл для результатов в JSON.')
+    parser.add_argument('--compare', help='Файл прошлых результатов для сравнения.')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Допустимое замедление медианы.')
+    args = parser.parse_args()
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    names = [name.strip() for name in args.only.split(',') if name.strip()]
+    results = run(sizes, args.rounds, args.seed, names)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            report = compare(results, json.load(f), args.threshold)
+        print(json.dumps(report, ensure_ascii=False, indent=4))
+        if any(entry['regression'] for entry in report):
+            sys.exit(1)
+    elif not args.output:
+        print(json.dumps(results, ensure_ascii=False, indent=4))
+
+
+if __name__ == '__main__':
+    main()
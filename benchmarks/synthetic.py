@@ -0,0 +1,122 @@
+"""
+Генератор синтетических выгрузок операций в формате 'operations (1).xlsx'.
+
+Генерация детерминирована (seed), поэтому результаты замеров сравнимы между запусками.
+Excel ограничен 1 048 576 строками, более крупные наборы пишутся в CSV
+(формат src.ingest: разделитель ';', десятичная запятая).
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    'Дата операции', 'Дата платежа', 'Номер карты', 'Статус', 'Сумма операции', 'Валюта операции',
+    'Сумма платежа', 'Валюта платежа', 'Кэшбэк', 'Категория', 'MCC', 'Описание', 'Бонусы (включая кэшбэк)',
+    'Округление на инвесткопилку', 'Сумма операции с округлением'
+]
+EXCEL_MAX_ROWS = 1048575
+# История охватывает четыре года, как в реальной выгрузке; с размером набора растет плотность операций
+START_DATE = '2018-01-01'
+HISTORY_DAYS = 1461
+
+# Категория -> (MCC, получатели, средний модуль суммы, доля доходов)
+CATEGORIES = {
+    'Супермаркеты': (5411, ['Колхоз', 'Магнит', 'Пятерочка', 'Перекресток'], 700, 0.0),
+    'Фастфуд': (5814, ['Вкусно и точка', 'KFC', 'Burger King'], 350, 0.0),
+    'Рестораны': (5812, ['Ресторан Пушкин', 'Теремок', 'Шоколадница'], 1500, 0.0),
+    'Транспорт': (4111, ['Метро Санкт-Петербург', 'Яндекс Такси', 'Ситидрайв'], 250, 0.0),
+    'Такси': (4121, ['Яндекс Такси', 'Ситимобил'], 450, 0.0),
+    'Аптеки': (5912, ['Аптека Вита', 'Ригла'], 600, 0.0),
+    'Связь': (4814, ['МТС', 'Билайн', 'Тинькофф Мобайл'], 400, 0.0),
+    'Одежда и обувь': (5651, ['Uniqlo', 'Спортмастер', 'Lamoda'], 3500, 0.0),
+    'Развлечения': (7999, ['Кино', 'Парк Горького'], 900, 0.0),
+    'Каршеринг': (7512, ['Ситидрайв', 'Делимобиль'], 600, 0.0),
+    'Наличные': (6011, ['Снятие в банкомате'], 5000, 0.0),
+    'Переводы': (np.nan, ['Перевод Кредитная карта', 'Перевод с карты на карту'], 4000, 0.35),
+    'Пополнения': (np.nan, ['Пополнение через Сбербанк', 'Внесение наличных'], 15000, 1.0),
+    'Бонусы': (np.nan, ['Кэшбэк за обычные покупки'], 150, 1.0),
+}
+CARDS = ['*7197', '*4556', '*5091', '*1112', None]
+CARD_WEIGHTS = [0.45, 0.3, 0.15, 0.05, 0.05]
+
+
+def generate_transactions(rows: int, seed: int = 0, as_text: bool = True) -> pd.DataFrame:
+    """
+    Генерирует синтетические операции со столбцами и форматами выгрузки банка.
+
+    Даты - строки 'ДД.ММ.ГГГГ ЧЧ:ММ:СС' (дата платежа - 'ДД.ММ.ГГГГ'), строки идут
+    от новых к старым, как в выгрузке; около 1% операций в статусе FAILED.
+
+    Аргументы:
+        rows (int): Число операций.
+        seed (int): Зерно генератора случайных чисел.
+        as_text (bool): Даты строками, как в файле; иначе datetime, как после
+            src.utils.load_transactions (форматирование и разбор миллионов дат долгие).
+
+    Возвращает:
+        pd.DataFrame: Операции.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(CATEGORIES)
+    weights = np.array([8, 4, 2, 5, 2, 1, 1, 1, 1, 1, 1, 2, 1, 1], dtype=float)
+    category_codes = rng.choice(len(names), size=rows, p=weights / weights.sum())
+
+    seconds = np.sort(rng.integers(0, HISTORY_DAYS * 86400, size=rows))[::-1]
+    dates = pd.Timestamp(START_DATE) + pd.to_timedelta(seconds, unit='s')
+    payment_dates = dates + pd.to_timedelta(rng.integers(0, 3, size=rows), unit='D')
+
+    mean_amounts = np.array([CATEGORIES[name][2] for name in names], dtype=float)
+    income_shares = np.array([CATEGORIES[name][3] for name in names])
+    magnitudes = np.round(rng.lognormal(np.log(mean_amounts[category_codes]), 0.8), 2)
+    signs = np.where(rng.random(rows) < income_shares[category_codes], 1.0, -1.0)
+    amounts = magnitudes * signs
+
+    descriptions = np.empty(rows, dtype=object)
+    for code, name in enumerate(names):
+        selected = np.flatnonzero(category_codes == code)
+        merchants = CATEGORIES[name][1]
+        descriptions[selected] = np.array(merchants, dtype=object)[rng.integers(0, len(merchants), len(selected))]
+
+    cards = np.array(CARDS, dtype=object)[rng.choice(len(CARDS), size=rows, p=CARD_WEIGHTS)]
+    statuses = np.where(rng.random(rows) < 0.01, 'FAILED', 'OK')
+    cashback = np.where((amounts < 0) & (rng.random(rows) < 0.1), np.round(-amounts * 0.01), np.nan)
+    bonuses = np.where(amounts < 0, np.floor(-amounts / 100), 0).astype(np.int64)
+
+    return pd.DataFrame({
+        'Дата операции': dates.strftime('%d.%m.%Y %H:%M:%S') if as_text else dates,
+        'Дата платежа': payment_dates.strftime('%d.%m.%Y') if as_text else payment_dates.normalize(),
+        'Номер карты': cards,
+        'Статус': statuses,
+        'Сумма операции': amounts,
+        'Валюта операции': 'RUB',
+        'Сумма платежа': amounts,
+        'Валюта платежа': 'RUB',
+        'Кэшбэк': cashback,
+        'Категория': np.array(names, dtype=object)[category_codes],
+        'MCC': np.array([CATEGORIES[name][0] for name in names], dtype=float)[category_codes],
+        'Описание': descriptions,
+        'Бонусы (включая кэшбэк)': bonuses,
+        'Округление на инвесткопилку': 0,
+        'Сумма операции с округлением': np.abs(amounts)
+    })
+
+
+def write_operations(file_path: str, rows: int, seed: int = 0) -> str:
+    """
+    Записывает синтетическую выгрузку в файл .xlsx или .csv (по расширению).
+
+    Аргументы:
+        file_path (str): Путь к файлу.
+        rows (int): Число операций.
+        seed (int): Зерно генератора случайных чисел.
+
+    Возвращает:
+        str: Путь к файлу.
+    """
+    transactions = generate_transactions(rows, seed)
+    if file_path.endswith('.csv'):
+        transactions.to_csv(file_path, sep=';', decimal=',', index=False)
+    elif rows > EXCEL_MAX_ROWS:
+        raise ValueError(f'Excel вмещает не больше {EXCEL_MAX_ROWS} операций, используйте .csv')
+    else:
+        transactions.to_excel(file_path, index=False)
+    return file_path
@@ -1,16 +1,79 @@
-# This is a sample Python script.
+import argparse
+import json
+import threading
+from datetime import datetime
+from urllib.parse import quote
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+from src.instrumentation import MemorySink, add_sink
+from src.server import AppState, DEFAULT_HOST, DEFAULT_PORT, make_server, run_benchmark
+from src.views import TRANSACTIONS_FILE, USER_SETTINGS_FILE
 
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='HTTP API для страниц "Главная" и "События".')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--transactions', default=TRANSACTIONS_FILE, help='Файл с операциями.')
+    parser.add_argument('--settings', default=USER_SETTINGS_FILE, help='Файл настроек пользователя.')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Замерять этапы построения страниц и отдавать замеры на /metrics.')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='Запустить сервер на свободном порту, нагрузить его и вывести задержки.')
+    parser.add_argument('--requests', type=int, default=200, help='Число запросов в режиме --benchmark.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Число одновременных запросов.')
+    parser.add_argument('--date', default=None, help="Дата запросов в режиме --benchmark, 'YYYY-MM-DD HH:MM:SS'.")
+    return parser.parse_args()
 
 
-# Press the green button in the gutter to run the script.
-if __name__ == '__main__':
-    print_hi('PyCharm')
+def benchmark(state: AppState, args: argparse.Namespace) -> dict:
+    """
+    Запускает сервер в фоновом потоке и нагружает его запросами /home и /events.
+
+    Аргументы:
+        state (AppState): Загруженные данные.
+        args (argparse.Namespace): Параметры командной строки.
+
+    Возвращает:
+        dict: Результаты нагрузки (см. run_benchmark).
+    """
+    date = datetime.strptime(args.date, '%Y-%m-%d %H:%M:%S') if args.date else datetime.now()
+    day = date.strftime('%Y-%m-%d')
+    paths = ['/home?date=' + quote(date.strftime('%Y-%m-%d %H:%M:%S'))]
+    paths += ['/events?date=%s&period=%s' % (day, period) for period in ('W', 'M', 'Y', 'ALL')]
+
+    server = make_server(state, args.host, 0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        return run_benchmark('http://%s:%d' % (host, port), paths, args.requests, args.concurrency)
+    finally:
+        server.shutdown()
+        server.server_close()
+
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+def main():
+    args = parse_args()
+    # Транзакции и настройки загружаются один раз при запуске
+    state = AppState(args.transactions, args.settings)
+
+    if args.benchmark:
+        print(json.dumps(benchmark(state, args), ensure_ascii=False, indent=4))
+        return
+
+    metrics = None
+    if args.metrics:
+        metrics = MemorySink()
+        add_sink(metrics)
+    server = make_server(state, args.host, args.port, metrics=metrics)
+    print('Сервер запущен: http://%s:%d (/home, /events)' % (args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
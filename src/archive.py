@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Union
+
+from src.cache import read_bundle, write_bundle
+from src.lazy import lazy_import
+from src.report_writer import write_atomic
+from src.schema import apply_schema
+from src.store import DATE_COLUMN, TransactionStore
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Столбцы, по которым операция считается уже загруженной
+KEY_COLUMNS = ['Дата операции', 'Номер карты', 'Сумма операции', 'Описание']
+
+# Партиция для операций без даты
+UNDATED_PARTITION = 'undated'
+
+ARCHIVE_MANIFEST = 'manifest.json'
+ARCHIVE_FORMAT_VERSION = 1
+
+# Число хранилищ для окон дат, которые архив держит в памяти
+WINDOW_CACHE_SIZE = 8
+
+
+class TransactionArchive:
+    """
+    Архив операций на диске, разбитый на партиции по году и месяцу операции.
+
+    Каждая партиция - набор сегментов в формате столбцового кеша (src.cache),
+    каталог <год>/<месяц>/<номер сегмента>. Загрузка новой выгрузки только
+    добавляет сегменты: уже записанные файлы не переписываются, а манифест
+    архива заменяется атомарно после записи сегментов. Запросы за окно дат
+    читают только партиции месяцев, которых касается окно.
+
+    Писать в архив должен один процесс; читать можно одновременно с записью.
+    """
+
+    def __init__(self, root: str):
+        """
+        Аргументы:
+            root (str): Каталог архива (создается при первой загрузке).
+        """
+        self.root = root
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+        self._windows = OrderedDict()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, ARCHIVE_MANIFEST)
+
+    def read_manifest(self) -> dict:
+        """
+        Возвращает манифест архива, перечитывая его при изменении файла.
+
+        Возвращает:
+            dict: Манифест: партиции с сегментами, столбцы и загруженные выгрузки.
+        """
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return _empty_manifest()
+        with self._lock:
+            if self._manifest is None or mtime != self._manifest_mtime:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+                self._manifest_mtime = mtime
+                self._windows.clear()
+            return self._manifest
+
+    def partitions(self) -> list:
+        """
+        Возвращает ключи партиций с датой ('YYYY-MM') по возрастанию.
+
+        Возвращает:
+            list: Ключи партиций.
+        """
+        return sorted(key for key in self.read_manifest()["partitions"] if key != UNDATED_PARTITION)
+
+    def ingest(self, source: Union[str, pd.DataFrame]) -> int:
+        """
+        Добавляет в архив операции из выгрузки, пропуская уже загруженные.
+
+        Операция считается загруженной, если в ее партиции уже есть операция с теми же
+        'Дата операции', 'Номер карты', 'Сумма операции' и 'Описание'. Сравнение идет
+        с содержимым архива до загрузки, поэтому одинаковые операции внутри одной
+        выгрузки сохраняются. Для сравнения из сегментов читаются только ключевые столбцы.
+
+        Аргументы:
+            source (str | pd.DataFrame): Путь к выгрузке (.xlsx или .csv) или DataFrame с операциями.
+
+        Возвращает:
+            int: Число добавленных операций.
+        """
+        manifest = json.loads(json.dumps(self.read_manifest()))
+        # Чтение выгрузок порциями (pandas, openpyxl) нужно только при загрузке
+        from src.ingest import iter_transaction_chunks
+        chunks = iter_transaction_chunks(source) if isinstance(source, str) else [apply_schema(source)]
+
+        known = {}
+        added = {}
+        rows_read = 0
+        for chunk in chunks:
+            rows_read += len(chunk)
+            keys = _key_frame(chunk)
+            hashes = _row_keys(keys)
+            partitions = _partition_keys(chunk[DATE_COLUMN])
+            for partition in pd.unique(partitions):
+                if partition not in known:
+                    known[partition] = self._read_keys(manifest, partition)
+                selected = np.flatnonzero(partitions == partition)
+                fresh = np.zeros(len(chunk), dtype=bool)
+                fresh[selected] = ~_find_known(keys.iloc[selected], hashes[selected], *known[partition])
+                if fresh.any():
+                    added.setdefault(partition, []).append(chunk[fresh])
+
+        # Сегменты пишутся под временными именами и получают свои только вместе с манифестом:
+        # при ошибке в архиве не остается сегментов, которых нет в манифесте
+        segments = []
+        try:
+            for partition, frames in sorted(added.items()):
+                frame = pd.concat(frames, ignore_index=True)
+                segment = manifest["next_segment"]
+                manifest["next_segment"] += 1
+                path = _segment_path(partition, segment)
+                segments.append(os.path.join(self.root, path))
+                write_bundle(frame, _temp_segment_path(segments[-1]), {"segment": segment})
+                entry = manifest["partitions"].setdefault(partition, {"rows": 0, "segments": []})
+                entry["segments"].append({"path": path, "rows": len(frame)})
+                entry["rows"] += len(frame)
+                if not manifest["columns"]:
+                    manifest["columns"] = [str(column) for column in frame.columns]
+
+            rows_added = sum(len(frame) for frames in added.values() for frame in frames)
+            manifest["sources"].append({
+                "source": os.path.abspath(source) if isinstance(source, str) else None,
+                "ingested": datetime.now().isoformat(timespec='seconds'),
+                "rows_read": rows_read,
+                "rows_added": rows_added
+            })
+            os.makedirs(self.root, exist_ok=True)
+            # Манифест заменяется последним, уже после переименования сегментов
+            write_atomic(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=4),
+                         before_replace=lambda: _publish_segments(segments))
+        except BaseException:
+            for path in segments:
+                shutil.rmtree(_temp_segment_path(path), ignore_errors=True)
+                shutil.rmtree(path, ignore_errors=True)
+            raise
+        return rows_added
+
+    def load(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+             columns: Optional[list] = None) -> pd.DataFrame:
+        """
+        Читает операции партиций, которых касается окно [start_date, end_date].
+
+        Возвращаются партиции целиком (точную границу окна проверяет TransactionStore).
+        Операции без даты читаются только без границ окна.
+
+        Аргументы:
+            start_date (datetime): Начало окна; по умолчанию с первой партиции.
+            end_date (datetime): Конец окна; по умолчанию до последней партиции.
+            columns (list): Читать только эти столбцы.
+
+        Возвращает:
+            pd.DataFrame: Операции с типами схемы src.schema.
+        """
+        manifest = self.read_manifest()
+        frames = []
+        for partition in self._select_partitions(manifest, start_date, end_date):
+            for segment in manifest["partitions"][partition]["segments"]:
+                frames.append(read_bundle(os.path.join(self.root, segment["path"]), columns=columns))
+
+        names = [column for column in manifest["columns"] if columns is None or column in columns]
+        if not frames:
+            return apply_schema(pd.DataFrame({name: [] for name in names}))
+        # Категориальные столбцы сегментов с разными словарями склеиваются как object
+        return apply_schema(pd.concat(frames, ignore_index=True))
+
+    def window(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+               columns: Optional[list] = None) -> TransactionStore:
+        """
+        Возвращает хранилище операций партиций окна [start_date, end_date].
+
+        Несколько последних хранилищ кешируются по набору партиций и столбцов
+        и сбрасываются при изменении манифеста.
+
+        Аргументы:
+            start_date (datetime): Начало окна; по умолчанию с первой партиции.
+            end_date (datetime): Конец окна; по умолчанию до последней партиции.
+            columns (list): Читать только эти столбцы ('Дата операции' добавляется всегда).
+
+        Возвращает:
+            TransactionStore: Хранилище операций окна.
+        """
+        if columns is not None and DATE_COLUMN not in columns:
+            columns = [DATE_COLUMN] + list(columns)
+        manifest = self.read_manifest()
+        key = (tuple(self._select_partitions(manifest, start_date, end_date)),
+               tuple(columns) if columns is not None else None)
+        with self._lock:
+            store = self._windows.get(key)
+            if store is not None:
+                self._windows.move_to_end(key)
+                return store
+
+        store = TransactionStore(self.load(start_date, end_date, columns))
+        with self._lock:
+            self._windows[key] = store
+            while len(self._windows) > WINDOW_CACHE_SIZE:
+                self._windows.popitem(last=False)
+        return store
+
+    def _select_partitions(self, manifest: dict, start_date: Optional[datetime],
+                           end_date: Optional[datetime]) -> list:
+        partitions = sorted(key for key in manifest["partitions"] if key != UNDATED_PARTITION)
+        first = _month_key(start_date) if start_date is not None else None
+        last = _month_key(end_date) if end_date is not None else None
+        selected = [key for key in partitions if (first is None or key >= first) and (last is None or key <= last)]
+        if start_date is None and end_date is None and UNDATED_PARTITION in manifest["partitions"]:
+            selected.insert(0, UNDATED_PARTITION)
+        return selected
+
+    def _read_keys(self, manifest: dict, partition: str) -> tuple:
+        # Ключевые столбцы операций партиции и их хеши, упорядоченные по хешу
+        entry = manifest["partitions"].get(partition)
+        if entry is None:
+            return pd.DataFrame({column: [] for column in KEY_COLUMNS}), np.empty(0, dtype=np.uint64)
+        keys = pd.concat([_key_frame(read_bundle(os.path.join(self.root, segment["path"]), columns=KEY_COLUMNS))
+                          for segment in entry["segments"]], ignore_index=True)
+        hashes = _row_keys(keys)
+        order = np.argsort(hashes, kind='stable')
+        return keys.take(order), hashes[order]
+
+
+def _empty_manifest() -> dict:
+    return {"version": ARCHIVE_FORMAT_VERSION, "next_segment": 1, "columns": [], "partitions": {}, "sources": []}
+
+
+def _month_key(date: datetime) -> str:
+    return pd.Timestamp(date).strftime('%Y-%m')
+
+
+def _partition_keys(dates: pd.Series) -> np.ndarray:
+    months = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[M]')
+    keys = np.datetime_as_string(months, unit='M').astype(object)
+    keys[np.isnat(months)] = UNDATED_PARTITION
+    return keys
+
+
+def _segment_path(partition: str, segment: int) -> str:
+    if partition == UNDATED_PARTITION:
+        return os.path.join(UNDATED_PARTITION, '%06d' % segment)
+    year, month = partition.split('-')
+    return os.path.join(year, month, '%06d' % segment)
+
+
+def _temp_segment_path(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, '.' + name + '.tmp')
+
+
+def _publish_segments(paths: list) -> None:
+    for path in paths:
+        # Сегмент с тем же номером мог остаться от прерванной загрузки; в манифесте его нет
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(_temp_segment_path(path), path)
+
+
+def _key_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    # Ключевые столбцы; категории приводятся к значениям, чтобы ключ не зависел от словаря сегмента
+    return pd.DataFrame({
+        column: frame[column].astype(object) if pd.api.types.is_categorical_dtype(frame[column]) else frame[column]
+        for column in KEY_COLUMNS
+    }).reset_index(drop=True)
+
+
+def _row_keys(keys: pd.DataFrame) -> np.ndarray:
+    # 64-битный хеш ключевых столбцов (см. _key_frame)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _find_known(keys: pd.DataFrame, hashes: np.ndarray, known_keys: pd.DataFrame,
+                known_hashes: np.ndarray) -> np.ndarray:
+    """
+    Отмечает операции, которые уже есть среди известных.
+
+    Кандидаты ищутся по хешу, а совпадение хешей проверяется сравнением
+    ключевых столбцов (пустые значения равны друг другу), поэтому коллизия
+    хешей не отбрасывает новую операцию.
+
+    Аргументы:
+        keys (pd.DataFrame): Ключевые столбцы операций (см. _key_frame).
+        hashes (np.ndarray): Хеши операций (см. _row_keys).
+        known_keys (pd.DataFrame): Ключевые столбцы известных операций, упорядоченные по хешу.
+        known_hashes (np.ndarray): Хеши известных операций по возрастанию.
+
+    Возвращает:
+        np.ndarray: Признак уже известной операции.
+    """
+    left = np.searchsorted(known_hashes, hashes, side='left')
+    right = np.searchsorted(known_hashes, hashes, side='right')
+    found = np.zeros(len(keys), dtype=bool)
+    # Одинаковых хешей у известных операций обычно не больше одного: каждый проход сравнивает
+    # кандидатов со следующей известной операцией с тем же хешем
+    offset = 0
+    pending = np.flatnonzero(left < right)
+    while len(pending):
+        rows = left[pending] + offset
+        equal = np.ones(len(pending), dtype=bool)
+        for column in KEY_COLUMNS:
+            values = keys[column].to_numpy()[pending]
+            known = known_keys[column].to_numpy()[rows]
+            equal &= (values == known) | (pd.isna(values) & pd.isna(known))
+        found[pending[equal]] = True
+        offset += 1
+        pending = pending[~equal & (left[pending] + offset < right[pending])]
+    return found
@@ -0,0 +1,175 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from src.cache import get_bundle_path, get_source_key, read_bundle, read_manifest
+from src.cube import CARD_COLUMN, CATEGORY_COLUMN, CUBE_COLUMNS, MONTH_COLUMN, aggregate_cells
+from src.reports import get_spending_records
+from src.schema import SCHEMA_VERSION
+from src.services import profitable_cashback_categories
+from src.store import DATE_COLUMN, TransactionStore
+from src.utils import load_transactions
+from src.views import get_events_sections
+
+
+def analyze_files(file_paths: List[str], date: str, period: str = 'M', categories: Optional[list] = None,
+                  cashback_month: Optional[str] = None, processes: Optional[int] = None) -> list:
+    """
+    Выполняет анализ нескольких выгрузок параллельно, по одной выгрузке на задачу пула процессов.
+
+    Процессам передаются только пути и параметры: каждый процесс загружает свою
+    выгрузку через столбцовый кеш (src.cache), отображая столбцы в память, а
+    обратно возвращает небольшие словари с результатами. Порядок результатов
+    совпадает с порядком file_paths.
+
+    Аргументы:
+        file_paths (list): Пути к выгрузкам.
+        date (str): Дата в формате 'YYYY-MM-DD'.
+        period (str): Период для страницы событий ('W', 'M', 'Y', 'ALL').
+        categories (list): Категории для трат за три месяца до date.
+        cashback_month (str): Месяц для анализа кешбэка в формате 'YYYY-MM'; по умолчанию месяц date.
+        processes (int): Число процессов, по умолчанию число ядер.
+
+    Возвращает:
+        list: Для каждого файла словарь 'file', 'expenses', 'income', 'spending', 'cashback'.
+    """
+    tasks = [(file_path, date, period, list(categories or []), cashback_month or date[:7]) for file_path in file_paths]
+    if _get_processes(processes, len(tasks)) == 1:
+        return [_analyze_file(task) for task in tasks]
+    with ProcessPoolExecutor(_get_processes(processes, len(tasks))) as pool:
+        return list(pool.map(_analyze_file, tasks))
+
+
+def aggregate_file_parallel(file_path: str, processes: Optional[int] = None,
+                            partitions: Optional[int] = None) -> pd.DataFrame:
+    """
+    Строит ячейки куба агрегатов (src.cube) для одной выгрузки, деля ее по месяцам между процессами.
+
+    Выгрузка один раз загружается в столбцовый кеш, а в текущий процесс
+    читается только столбец дат: по нему строки делятся на диапазоны месяцев
+    (split_months, split_rows). Каждый процесс читает из бандла только
+    столбцы куба и только строки своего диапазона и агрегирует их, так что
+    суммарная работа процессов не растет с их числом. Диапазоны не
+    пересекаются, поэтому частичные результаты объединяются без пересчета;
+    ячейки сортируются по ключам, и результат не зависит от числа процессов
+    и совпадает с ячейками AggregateCube с точностью до порядка строк.
+
+    Аргументы:
+        file_path (str): Путь к выгрузке.
+        processes (int): Число процессов, по умолчанию число ядер.
+        partitions (int): Число диапазонов месяцев, по умолчанию равно числу процессов.
+
+    Возвращает:
+        pd.DataFrame: Ячейки куба, упорядоченные по месяцу, категории и карте.
+    """
+    # Бандл строится (или обновляется) один раз, а в текущий процесс читается только столбец дат
+    dates = load_transactions(file_path, columns=[DATE_COLUMN])[DATE_COLUMN].to_numpy()
+    bundle_path = get_bundle_path(file_path)
+    manifest = read_manifest(bundle_path)
+    if manifest is None or manifest.get("key") != get_source_key(file_path, SCHEMA_VERSION):
+        # Кеш не записался: агрегируем в текущем процессе
+        return aggregate_cells(load_transactions(file_path, use_cache=False))
+
+    processes = _get_processes(processes, partitions or os.cpu_count() or 1)
+    ranges = split_months(dates, partitions or processes)
+    tasks = [(bundle_path, rows) for rows in split_rows(dates, ranges)]
+    if processes == 1:
+        parts = [_aggregate_rows(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            parts = list(pool.map(_aggregate_rows, tasks))
+    if not parts:
+        return aggregate_cells(read_bundle(bundle_path, manifest, CUBE_COLUMNS, rows=slice(0, 0)))
+    cells = pd.concat(parts, ignore_index=True)
+    return cells.sort_values([MONTH_COLUMN, CATEGORY_COLUMN, CARD_COLUMN], kind='mergesort', ignore_index=True)
+
+
+def split_months(dates: np.ndarray, partitions: int) -> list:
+    """
+    Делит месяцы операций на непрерывные диапазоны с примерно равным числом операций.
+
+    Аргументы:
+        dates (np.ndarray): Даты операций (datetime64).
+        partitions (int): Желаемое число диапазонов.
+
+    Возвращает:
+        list: Диапазоны (начало, конец) в виде 'YYYY-MM', конец не включается; пустые диапазоны отброшены.
+    """
+    months = dates[~np.isnat(dates)].astype('datetime64[M]')
+    if len(months) == 0:
+        return []
+    unique, counts = np.unique(months, return_counts=True)
+    # Граница диапазона - месяц, на котором накопленное число операций переходит очередную долю
+    targets = np.arange(1, partitions) * (counts.sum() / partitions)
+    cuts = np.unique(np.searchsorted(np.cumsum(counts), targets, side='right'))
+    cuts = cuts[(cuts > 0) & (cuts < len(unique))]
+    bounds = np.concatenate([[0], cuts, [len(unique)]])
+    ends = np.append(unique, unique[-1] + 1)
+    return [(str(unique[first]), str(ends[last])) for first, last in zip(bounds[:-1], bounds[1:])]
+
+
+def split_rows(dates: np.ndarray, ranges: list) -> list:
+    """
+    Находит строки выгрузки, попадающие в каждый диапазон месяцев (см. split_months).
+
+    Каждая строка относится к диапазону одним двоичным поиском по началам
+    диапазонов. Если выгрузка упорядочена по дате, строки диапазона идут
+    подряд и возвращаются срезом; иначе - номерами строк по возрастанию.
+    Строки без даты не попадают ни в один диапазон.
+
+    Аргументы:
+        dates (np.ndarray): Даты операций (datetime64) в порядке выгрузки.
+        ranges (list): Диапазоны (начало, конец) в виде 'YYYY-MM', конец не включается, по возрастанию.
+
+    Возвращает:
+        list: Для каждого диапазона slice или np.ndarray номеров строк.
+    """
+    positions = np.flatnonzero(~np.isnat(dates))
+    starts = np.array([np.datetime64(start, 'M') for start, _ in ranges], dtype='datetime64[M]')
+    ends = np.array([np.datetime64(end, 'M') for _, end in ranges], dtype='datetime64[M]')
+    months = dates[positions].astype('datetime64[M]')
+    codes = np.searchsorted(starts, months, side='right') - 1
+    # Месяцы вне диапазонов (до первого или после последнего) отбрасываются
+    inside = (codes >= 0) & (months < ends[np.maximum(codes, 0)])
+    positions, codes = positions[inside], codes[inside]
+
+    if len(codes) > 1 and (codes[1:] < codes[:-1]).any():
+        # Выгрузка не упорядочена по возрастанию даты: устойчивая сортировка сохраняет порядок строк в диапазоне
+        order = np.argsort(codes, kind='stable')
+        positions, codes = positions[order], codes[order]
+    bounds = np.searchsorted(codes, np.arange(len(ranges) + 1), side='left')
+
+    selections = []
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        rows = positions[first:last]
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            selections.append(slice(int(rows[0]), int(rows[-1]) + 1))
+        else:
+            selections.append(rows)
+    return selections
+
+
+def _analyze_file(task: tuple) -> dict:
+    file_path, date, period, categories, cashback_month = task
+    store = TransactionStore(load_transactions(file_path))
+    year, month = (int(part) for part in cashback_month.split('-'))
+    return {
+        "file": file_path,
+        **get_events_sections(date, period, store),
+        "spending": {record["category"]: record["spending"]
+                     for record in get_spending_records(store, categories, [date])},
+        "cashback": json.loads(profitable_cashback_categories(store, year, month))
+    }
+
+
+def _aggregate_rows(task: tuple) -> pd.DataFrame:
+    bundle_path, rows = task
+    # Рабочий процесс читает из бандла только столбцы куба и только строки своего диапазона
+    return aggregate_cells(read_bundle(bundle_path, columns=CUBE_COLUMNS, rows=rows))
+
+
+def _get_processes(processes: Optional[int], tasks: int) -> int:
+    return max(1, min(processes or os.cpu_count() or 1, tasks))
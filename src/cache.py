@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Optional
+
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Каталог кеша создается рядом с исходным файлом
+CACHE_DIR_NAME = '.operations_cache'
+
+# Версия формата; при изменении формата старые бандлы перестраиваются
+CACHE_FORMAT_VERSION = 2
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def get_cache_dir(file_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Возвращает каталог, в котором хранятся бандлы кеша для файла.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу с операциями.
+        cache_dir (str): Явно заданный каталог кеша.
+
+    Возвращает:
+        str: Путь к каталогу кеша.
+    """
+    if cache_dir:
+        return cache_dir
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR_NAME)
+
+
+def get_bundle_path(file_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Возвращает путь к бандлу кеша для конкретного исходного файла.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу с операциями.
+        cache_dir (str): Явно заданный каталог кеша.
+
+    Возвращает:
+        str: Путь к каталогу бандла.
+    """
+    digest = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_cache_dir(file_path, cache_dir), digest)
+
+
+def get_source_key(file_path: str, reader_version=None) -> dict:
+    """
+    Формирует ключ кеша: путь, время изменения и размер исходного файла.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу с операциями.
+        reader_version: Версия функции чтения (например, версия схемы типов).
+
+    Возвращает:
+        dict: Ключ кеша.
+    """
+    stat = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "version": CACHE_FORMAT_VERSION,
+        "reader_version": reader_version
+    }
+
+
+def write_bundle(frame: pd.DataFrame, bundle_path: str, key: dict) -> None:
+    """
+    Записывает DataFrame в бандл из .npy файлов (по одному на столбец).
+
+    Даты хранятся как datetime64[ns], числа - в исходном типе, столбцы типа category
+    и текстовые столбцы - словарным кодированием (коды + список значений в манифесте).
+    И те и другие читаются как category: коды берутся из файла без декодирования
+    каждой строки в объект str.
+    Бандл собирается во временном каталоге и переименовывается целиком.
+
+    Аргументы:
+        frame (pd.DataFrame): DataFrame с транзакциями.
+        bundle_path (str): Путь к каталогу бандла.
+        key (dict): Ключ кеша исходного файла.
+    """
+    parent = os.path.dirname(bundle_path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        columns = []
+        for position, name in enumerate(frame.columns):
+            series = frame[name]
+            file_name = f'col_{position}.npy'
+            column = {"name": name, "file": file_name}
+            if pd.api.types.is_datetime64_any_dtype(series):
+                column["kind"] = 'datetime'
+                values = series.to_numpy(dtype='datetime64[ns]')
+            elif pd.api.types.is_categorical_dtype(series):
+                column["kind"] = 'category'
+                values = series.cat.codes.to_numpy()
+                column["categories"] = [_to_json_scalar(value) for value in series.cat.categories]
+            elif pd.api.types.is_numeric_dtype(series):
+                column["kind"] = 'numeric'
+                values = series.to_numpy()
+            else:
+                column["kind"] = 'dictionary'
+                # Те же категории, что дает astype('category') (как в src.schema)
+                categorical = pd.Categorical(series)
+                values = categorical.codes.astype(np.int32)
+                column["categories"] = [_to_json_scalar(value) for value in categorical.categories]
+            np.save(os.path.join(tmp_path, file_name), values, allow_pickle=False)
+            columns.append(column)
+
+        with open(os.path.join(tmp_path, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({"key": key, "rows": len(frame), "columns": columns}, f, ensure_ascii=False)
+
+        if os.path.exists(bundle_path):
+            shutil.rmtree(bundle_path)
+        os.replace(tmp_path, bundle_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+
+def read_manifest(bundle_path: str) -> Optional[dict]:
+    """
+    Читает манифест бандла.
+
+    Аргументы:
+        bundle_path (str): Путь к каталогу бандла.
+
+    Возвращает:
+        dict: Манифест или None, если бандла нет или он поврежден.
+    """
+    try:
+        with open(os.path.join(bundle_path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_bundle(bundle_path: str, manifest: Optional[dict] = None, columns: Optional[list] = None,
+                rows=None) -> pd.DataFrame:
+    """
+    Читает DataFrame из бандла, отображая столбцы в память (memmap).
+
+    Аргументы:
+        bundle_path (str): Путь к каталогу бандла.
+        manifest (dict): Уже прочитанный манифест.
+        columns (list): Читать только эти столбцы (остальные файлы не открываются).
+        rows (np.ndarray | slice): Номера строк или срез; декодируются только они (см. select_rows).
+
+    Возвращает:
+        pd.DataFrame: DataFrame с транзакциями.
+    """
+    if manifest is None:
+        manifest = _require_manifest(bundle_path)
+
+    data = {}
+    for column in manifest["columns"]:
+        if columns is not None and column["name"] not in columns:
+            continue
+        values = np.load(os.path.join(bundle_path, column["file"]), mmap_mode='r', allow_pickle=False)
+        if rows is not None:
+            # Из отображенного файла копируются только выбранные строки
+            values = values[rows]
+        if column["kind"] in ('category', 'dictionary'):
+            data[column["name"]] = pd.Categorical.from_codes(values, categories=column["categories"])
+        else:
+            data[column["name"]] = np.asarray(values)
+    return pd.DataFrame(data)
+
+
+def select_rows(bundle_path: str, manifest: Optional[dict], column: str, start=None, end=None) -> np.ndarray:
+    """
+    Находит строки бандла, в которых значение столбца лежит в диапазоне [start, end].
+
+    Читается только сам столбец; пропуски (NaT, NaN) в диапазон не попадают.
+
+    Аргументы:
+        bundle_path (str): Путь к каталогу бандла.
+        manifest (dict): Уже прочитанный манифест.
+        column (str): Числовой столбец или столбец дат.
+        start: Начало диапазона (включительно); None - без ограничения.
+        end: Конец диапазона (включительно); None - без ограничения.
+
+    Возвращает:
+        np.ndarray: Номера строк в порядке бандла.
+    """
+    if manifest is None:
+        manifest = _require_manifest(bundle_path)
+    spec = next(item for item in manifest["columns"] if item["name"] == column)
+    values = np.load(os.path.join(bundle_path, spec["file"]), mmap_mode='r', allow_pickle=False)
+    if spec["kind"] == 'datetime':
+        start = None if start is None else np.datetime64(pd.Timestamp(start), 'ns')
+        end = None if end is None else np.datetime64(pd.Timestamp(end), 'ns')
+        mask = ~np.isnat(values)
+    else:
+        mask = ~np.isnan(values)
+    if start is not None:
+        mask &= values >= start
+    if end is not None:
+        mask &= values <= end
+    return np.flatnonzero(mask)
+
+
+def load_cached_frame(file_path: str, reader: Callable[[str], pd.DataFrame], rebuild: bool = False,
+                      cache_dir: Optional[str] = None, reader_version=None, columns: Optional[list] = None,
+                      between: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Загружает DataFrame из кеша, перестраивая его при изменении исходного файла.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу с операциями.
+        reader (Callable): Функция, читающая исходный файл в DataFrame.
+        rebuild (bool): Принудительно перестроить кеш.
+        cache_dir (str): Явно заданный каталог кеша.
+        reader_version: Версия функции чтения; при ее изменении кеш перестраивается.
+        columns (list): Вернуть только эти столбцы.
+        between (tuple): (столбец, начало, конец) - вернуть только строки из диапазона (см. select_rows).
+
+    Возвращает:
+        pd.DataFrame: DataFrame с транзакциями.
+    """
+    key = get_source_key(file_path, reader_version)
+    bundle_path = get_bundle_path(file_path, cache_dir)
+
+    manifest = None if rebuild else read_manifest(bundle_path)
+    if manifest is None or manifest.get("key") != key:
+        frame = reader(file_path)
+        try:
+            write_bundle(frame, bundle_path, key)
+        except (OSError, TypeError, ValueError):
+            # Кеш - только ускорение: если столбцы не удалось записать, работаем без него
+            return select_frame(frame, columns, between)
+        manifest = _require_manifest(bundle_path)
+
+    rows = select_rows(bundle_path, manifest, *between) if between is not None else None
+    return read_bundle(bundle_path, manifest, columns, rows)
+
+
+def rebuild_cache(file_path: str, reader: Callable[[str], pd.DataFrame], cache_dir: Optional[str] = None,
+                  reader_version=None) -> None:
+    """
+    Принудительно перестраивает кеш для файла.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу с операциями.
+        reader (Callable): Функция, читающая исходный файл в DataFrame.
+        cache_dir (str): Явно заданный каталог кеша.
+        reader_version: Версия функции чтения.
+    """
+    load_cached_frame(file_path, reader, rebuild=True, cache_dir=cache_dir, reader_version=reader_version)
+
+
+def clear_cache(file_path: Optional[str] = None, cache_dir: Optional[str] = None) -> None:
+    """
+    Удаляет бандл кеша для файла или весь каталог кеша.
+
+    Аргументы:
+        file_path (str): Путь к исходному файлу; если не указан, удаляется весь каталог cache_dir.
+        cache_dir (str): Явно заданный каталог кеша.
+    """
+    if file_path is not None:
+        shutil.rmtree(get_bundle_path(file_path, cache_dir), ignore_errors=True)
+    elif cache_dir is not None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    else:
+        raise ValueError('Нужно указать file_path или cache_dir')
+
+
+def select_frame(frame: pd.DataFrame, columns: Optional[list] = None, between: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Отбирает столбцы и строки DataFrame в памяти так же, как load_cached_frame - из бандла.
+
+    Аргументы:
+        frame (pd.DataFrame): DataFrame с транзакциями.
+        columns (list): Оставить только эти столбцы.
+        between (tuple): (столбец, начало, конец) - оставить только строки из диапазона.
+
+    Возвращает:
+        pd.DataFrame: Отобранные строки и столбцы.
+    """
+    if between is not None:
+        column, start, end = between
+        values = frame[column]
+        mask = values.notna()
+        if start is not None:
+            mask &= values >= start
+        if end is not None:
+            mask &= values <= end
+        frame = frame[mask.to_numpy()]
+    if columns is not None:
+        frame = frame[[name for name in frame.columns if name in columns]]
+    return frame
+
+
+def _require_manifest(bundle_path: str) -> dict:
+    manifest = read_manifest(bundle_path)
+    if manifest is None:
+        raise FileNotFoundError(f'Бандл кеша не найден: {bundle_path}')
+    return manifest
+
+
+def _to_json_scalar(value):
+    # numpy-скаляры не сериализуются в JSON напрямую
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import datetime
+from src.store import DATE_COLUMN
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+MONTH_COLUMN = 'Месяц'
+CATEGORY_COLUMN = 'Категория'
+CARD_COLUMN = 'Номер карты'
+AMOUNT_COLUMN = 'Сумма операции'
+
+# Столбцы, из которых строится куб; функциям, читающим только куб, достаточно их
+CUBE_COLUMNS = [DATE_COLUMN, CATEGORY_COLUMN, CARD_COLUMN, AMOUNT_COLUMN]
+
+# Измерение куба -> способ объединения ячеек
+MEASURES = {
+    'sum': 'sum',
+    'count': 'sum',
+    'min': 'min',
+    'max': 'max',
+    'expense_sum': 'sum',
+    'expense_count': 'sum',
+    'income_sum': 'sum',
+    'income_count': 'sum'
+}
+
+
+def aggregate_cells(transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Агрегирует операции в ячейки месяц x категория x карта.
+
+    Для каждой ячейки считаются сумма, количество, минимум и максимум 'Сумма операции',
+    а также отдельно сумма и количество расходов (< 0) и доходов (> 0).
+    Операции без категории или карты (или DataFrame без этих столбцов) попадают в ячейки
+    с ключом NaN, операции без даты
+    в куб не попадают. Ячейки упорядочены по месяцу.
+
+    Аргументы:
+        transactions (pd.DataFrame): DataFrame с транзакциями.
+
+    Возвращает:
+        pd.DataFrame: Ячейки куба (ключи и измерения в столбцах).
+    """
+    amounts = transactions[AMOUNT_COLUMN].to_numpy(dtype=float)
+    expenses = amounts < 0
+    income = amounts > 0
+    rows = pd.DataFrame({
+        MONTH_COLUMN: transactions[DATE_COLUMN].to_numpy().astype('datetime64[M]').astype('datetime64[ns]'),
+        CATEGORY_COLUMN: _key_values(transactions, CATEGORY_COLUMN),
+        CARD_COLUMN: _key_values(transactions, CARD_COLUMN),
+        'sum': amounts,
+        'count': np.ones(len(amounts), dtype=np.int64),
+        'min': amounts,
+        'max': amounts,
+        'expense_sum': np.where(expenses, amounts, 0.0),
+        'expense_count': expenses.astype(np.int64),
+        'income_sum': np.where(income, amounts, 0.0),
+        'income_count': income.astype(np.int64)
+    })
+    rows = rows[rows[MONTH_COLUMN].notna()]
+    cells = combine_cells(rows, [MONTH_COLUMN, CATEGORY_COLUMN, CARD_COLUMN])
+    return cells.sort_values(MONTH_COLUMN, kind='mergesort', ignore_index=True)
+
+
+def combine_cells(cells: pd.DataFrame, keys: list) -> pd.DataFrame:
+    """
+    Объединяет ячейки (или строки того же вида) по ключам.
+
+    Аргументы:
+        cells (pd.DataFrame): Ячейки куба.
+        keys (list): Столбцы-ключи, по которым объединяются ячейки.
+
+    Возвращает:
+        pd.DataFrame: Объединенные ячейки.
+    """
+    return cells.groupby(keys, dropna=False, sort=False, observed=True).agg(MEASURES).reset_index()
+
+
+def _key_values(transactions: pd.DataFrame, column: str) -> np.ndarray:
+    if column in transactions:
+        return transactions[column].to_numpy()
+    return np.full(len(transactions), np.nan, dtype=object)
+
+
+class AggregateCube:
+    """
+    Материализованный куб агрегатов месяц x категория x карта.
+
+    Запрос за период складывается из готовых ячеек полных месяцев и не более
+    двух неполных крайних месяцев, которые досчитываются по срезу хранилища.
+    Новые операции добавляются в куб без пересчета истории.
+    """
+
+    def __init__(self, store):
+        """
+        Строит куб по всем операциям хранилища.
+
+        Аргументы:
+            store (TransactionStore): Хранилище транзакций.
+        """
+        self._store = store
+        self._cells = aggregate_cells(store.frame)
+
+    @property
+    def cells(self) -> pd.DataFrame:
+        """
+        Ячейки куба (только для чтения).
+        """
+        return self._cells
+
+    def add(self, transactions: pd.DataFrame) -> None:
+        """
+        Добавляет новые операции в куб, объединяя их агрегаты с уже готовыми ячейками.
+
+        Аргументы:
+            transactions (pd.DataFrame): Новые операции (даты в формате datetime).
+        """
+        if len(transactions) == 0:
+            return
+        cells = pd.concat([self._cells, aggregate_cells(transactions)], ignore_index=True)
+        cells = combine_cells(cells, [MONTH_COLUMN, CATEGORY_COLUMN, CARD_COLUMN])
+        self._cells = cells.sort_values(MONTH_COLUMN, kind='mergesort', ignore_index=True)
+
+    def query(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Возвращает агрегаты по категориям и картам за период с start_date по end_date включительно.
+
+        Аргументы:
+            start_date (datetime): Начало периода (включительно).
+            end_date (datetime): Конец периода (включительно).
+
+        Возвращает:
+            pd.DataFrame: Агрегаты; ключи 'Категория' и 'Номер карты', измерения - как в MEASURES.
+        """
+        start_date = pd.Timestamp(start_date)
+        end_date = pd.Timestamp(end_date)
+        if end_date < start_date:
+            return self._empty()
+
+        # Полные месяцы [first_full, after_full): с первого месяца, начинающегося не раньше
+        # start_date, до последнего месяца, заканчивающегося не позже end_date
+        first_full = start_date.to_period('M').to_timestamp()
+        if first_full < start_date:
+            first_full = first_full + pd.DateOffset(months=1)
+        after_full = (end_date + pd.Timedelta(1, 'ns')).to_period('M').to_timestamp()
+
+        parts = []
+        if first_full < after_full:
+            months = self._cells[MONTH_COLUMN]
+            left = int(months.searchsorted(first_full, side='left'))
+            right = int(months.searchsorted(after_full, side='left'))
+            parts.append(self._cells.iloc[left:right])
+            edges = [(start_date, first_full - pd.Timedelta(1, 'ns')), (after_full, end_date)]
+        else:
+            edges = [(start_date, end_date)]
+
+        for edge_start, edge_end in edges:
+            if edge_start <= edge_end:
+                rows = self._store.between(edge_start, edge_end)
+                if len(rows):
+                    parts.append(aggregate_cells(rows))
+
+        if not parts:
+            return self._empty()
+        return combine_cells(pd.concat(parts, ignore_index=True), [CATEGORY_COLUMN, CARD_COLUMN])
+
+    def _empty(self) -> pd.DataFrame:
+        return self._cells.iloc[0:0].drop(columns=[MONTH_COLUMN])
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+from src.instrumentation import increment
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Форматы дат выгрузок: банк пишет 'ДД.ММ.ГГГГ ЧЧ:ММ:СС' и 'ДД.ММ.ГГГГ', в тестах и API - ISO
+DATE_FORMATS = (
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%d.%m.%Y %H:%M',
+    '%Y-%m-%d %H:%M',
+)
+# Сколько разных значений столбца проверяется при выборе формата
+DETECT_SAMPLE_SIZE = 100
+
+# Форматы фиксированной ширины -> шаблон строки (буквы - цифры, остальное - разделители).
+# Такие строки переставляются посимвольно в ISO 8601 и разбираются numpy без strptime.
+FIXED_WIDTH_TEMPLATES = {
+    '%d.%m.%Y %H:%M:%S': 'DD.MM.YYYY hh:mm:ss',
+    '%d.%m.%Y %H:%M': 'DD.MM.YYYY hh:mm',
+    '%d.%m.%Y': 'DD.MM.YYYY',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class DateParser:
+    """
+    Разбор дат одного столбца выгрузки.
+
+    Формат определяется один раз (по первым значениям) и дальше используется
+    для всех порций того же файла. Каждое значение разбирается один раз:
+    повторяющиеся строки (в выгрузках много одинаковых дат) сводятся к
+    уникальным через pd.factorize, уникальные разбираются векторно по точному
+    формату, и только не подошедшие под формат разбираются по одной
+    (pd.to_datetime с dayfirst=True, как раньше). Число таких строк
+    накапливается в fallback_rows и передается счетчиком 'dates.fallback_rows'
+    в src.instrumentation.
+    """
+
+    def __init__(self, date_format: Optional[str] = None, errors: str = 'raise'):
+        """
+        Аргументы:
+            date_format (str): Формат strptime; по умолчанию определяется по данным (DATE_FORMATS).
+            errors (str): 'raise' - ошибка на неразбираемом значении, 'coerce' - NaT.
+        """
+        self.date_format = date_format
+        self.errors = errors
+        self.rows = 0
+        self.unique_values = 0
+        self.fallback_rows = 0
+        self._fallback_cache = {}
+
+    def parse(self, values) -> pd.Series:
+        """
+        Разбирает даты.
+
+        Аргументы:
+            values (pd.Series | list): Строки с датами, объекты datetime или уже datetime64.
+
+        Возвращает:
+            pd.Series: Даты datetime64[ns] (пропуски - NaT) с индексом исходного Series.
+        """
+        series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+
+        codes, uniques = pd.factorize(series)
+        parsed, fallback = self._parse_unique(pd.Index(uniques, dtype=object))
+
+        result = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+        present = codes >= 0
+        result[present] = parsed[codes[present]]
+
+        fallback_rows = int(np.bincount(codes[present], minlength=len(uniques))[fallback].sum())
+        self.rows += len(codes)
+        self.unique_values += len(uniques)
+        if fallback_rows:
+            self.fallback_rows += fallback_rows
+            increment('dates.fallback_rows', fallback_rows)
+            logger.info('%s: %d строк не подошли под формат %r', series.name, fallback_rows, self.date_format)
+        return pd.Series(result, index=series.index, name=series.name)
+
+    def stats(self) -> dict:
+        """
+        Возвращает статистику разбора.
+
+        Возвращает:
+            dict: format, rows, unique_values, fallback_rows.
+        """
+        return {
+            "format": self.date_format,
+            "rows": self.rows,
+            "unique_values": self.unique_values,
+            "fallback_rows": self.fallback_rows
+        }
+
+    def _parse_unique(self, uniques: pd.Index) -> tuple:
+        # Возвращает даты для уникальных значений и маску значений, разобранных по одному
+        parsed = np.full(len(uniques), np.datetime64('NaT'), dtype='datetime64[ns]')
+        fallback = np.zeros(len(uniques), dtype=bool)
+        is_text = np.fromiter((isinstance(value, str) for value in uniques), dtype=bool, count=len(uniques))
+
+        if not is_text.all():
+            # datetime, Timestamp и прочие не строки (например, ячейки даты из openpyxl)
+            parsed[~is_text] = pd.to_datetime(uniques[~is_text], errors=self.errors).to_numpy(dtype='datetime64[ns]')
+
+        texts = uniques[is_text]
+        if len(texts) == 0:
+            return parsed, fallback
+        if self.date_format is None:
+            self.date_format = detect_format(texts[:DETECT_SAMPLE_SIZE])
+
+        positions = np.flatnonzero(is_text)
+        if self.date_format is not None:
+            exact = parse_exact(texts, self.date_format)
+            parsed[positions] = exact
+        # Пустые строки - пропуски, а не выбросы
+        missed = np.asarray(texts.str.strip() != '', dtype=bool)
+        if self.date_format is not None:
+            missed &= np.isnat(exact)
+
+        for position, text in zip(positions[missed], texts[missed]):
+            parsed[position] = self._parse_one(text)
+        fallback[positions[missed]] = True
+        return parsed, fallback
+
+    def _parse_one(self, text: str):
+        value = self._fallback_cache.get(text)
+        if value is None:
+            value = pd.to_datetime(text, dayfirst=True, errors=self.errors)
+            value = np.datetime64('NaT') if pd.isna(value) else value.to_datetime64()
+            self._fallback_cache[text] = value
+        return value
+
+
+def parse_exact(texts, date_format: str) -> np.ndarray:
+    """
+    Векторно разбирает строки по точному формату; не подошедшие строки дают NaT.
+
+    Для форматов из FIXED_WIDTH_TEMPLATES строки проверяются по шаблону и
+    переставляются посимвольно в ISO 8601, остальные разбираются
+    pd.to_datetime(format=...).
+
+    Аргументы:
+        texts (pd.Index | list): Строки с датами.
+        date_format (str): Формат strptime.
+
+    Возвращает:
+        np.ndarray: Даты datetime64[ns].
+    """
+    texts = pd.Index(texts, dtype=object)
+    template = FIXED_WIDTH_TEMPLATES.get(date_format)
+    if template is not None and len(texts):
+        try:
+            return _parse_fixed_width(texts, template)
+        except ValueError:
+            # Строка прошла проверку шаблона, но это не дата (например, 31.02): разбираем через pandas
+            pass
+    return pd.to_datetime(texts, format=date_format, errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+
+def detect_format(texts) -> Optional[str]:
+    """
+    Выбирает из DATE_FORMATS формат, под который подходит больше всего значений.
+
+    Аргументы:
+        texts (pd.Index | list): Строки с датами (образец).
+
+    Возвращает:
+        str: Формат strptime или None, если не подошел ни один.
+    """
+    texts = pd.Index(texts, dtype=object)
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = int(pd.to_datetime(texts, format=date_format, errors='coerce').notna().sum())
+        if count > best_count:
+            best_format, best_count = date_format, count
+            if count == len(texts):
+                break
+    return best_format
+
+
+def _parse_fixed_width(texts: pd.Index, template: str) -> np.ndarray:
+    width = len(template)
+    result = np.full(len(texts), np.datetime64('NaT'), dtype='datetime64[ns]')
+    fits = np.fromiter((len(text) == width for text in texts), dtype=bool, count=len(texts))
+    rows = np.flatnonzero(fits)
+    chars = np.array(texts[fits].tolist(), dtype=f'U{width}').view('U1').reshape(-1, width)
+
+    # Цифры на местах букв шаблона, разделители - на своих местах
+    matches = np.ones(len(chars), dtype=bool)
+    for position, symbol in enumerate(template):
+        column = chars[:, position]
+        matches &= ((column >= '0') & (column <= '9')) if symbol.isalpha() else (column == symbol)
+    chars, rows = chars[matches], rows[matches]
+
+    # Символы в порядке 'YYYY-MM-DDThh:mm:ss' (части, которых нет в шаблоне, пропускаются)
+    pieces = []
+    for part, separator in (('YYYY', ''), ('MM', '-'), ('DD', '-'), ('hh', 'T'), ('mm', ':'), ('ss', ':')):
+        start = template.find(part)
+        if start < 0:
+            continue
+        if separator:
+            pieces.append(np.full((len(chars), 1), separator, dtype='U1'))
+        pieces.append(chars[:, start:start + len(part)])
+    iso = np.ascontiguousarray(np.concatenate(pieces, axis=1))
+    result[rows] = iso.view(f'U{iso.shape[1]}').ravel().astype('datetime64[s]')
+    return result
+
+
+def parse_dates(values, date_format: Optional[str] = None, errors: str = 'raise') -> pd.Series:
+    """
+    Разбирает даты одного столбца (см. DateParser).
+
+    Аргументы:
+        values (pd.Series | list): Даты.
+        date_format (str): Формат strptime; по умолчанию определяется по данным.
+        errors (str): 'raise' или 'coerce'.
+
+    Возвращает:
+        pd.Series: Даты datetime64[ns].
+    """
+    return DateParser(date_format, errors).parse(values)
@@ -0,0 +1,255 @@
+import json
+from typing import Iterator
+
+# Записей Records в одном куске вывода: кодируются и отдаются порциями,
+# поэтому весь текст большого ответа не собирается в памяти при записи в файл
+ROWS_PER_CHUNK = 4096
+# Отступ в читаемом режиме, как у json.dumps(..., indent=4)
+INDENT = 4
+BACKENDS = ('json', 'orjson', 'auto')
+
+_INFINITY = float('inf')
+
+
+class Records:
+    """
+    Список записей JSON, хранящийся по столбцам.
+
+    Кодируется как список объектов с ключами-столбцами (как
+    DataFrame.to_dict(orient='records')), но словарь на каждую запись не
+    создается: значения столбца кодируются в JSON один раз списком, а
+    записи собираются из готовых строк по шаблону. Значения кодируются как
+    элементы column.tolist() (numpy-массивы) или самого списка.
+    """
+
+    def __init__(self, columns: dict):
+        """
+        Аргументы:
+            columns (dict): Ключ записи -> столбец значений (список или numpy-массив) одной длины.
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'Столбцы разной длины: {sorted(lengths)}')
+        self.columns = columns
+        self._length = lengths.pop() if lengths else 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[dict]:
+        keys = list(self.columns)
+        for row in zip(*(_to_list(values) for values in self.columns.values())):
+            yield dict(zip(keys, row))
+
+    def to_list(self) -> list:
+        """
+        Возвращает записи списком словарей.
+
+        Возвращает:
+            list: Записи.
+        """
+        return list(self)
+
+
+def iter_json(value, compact: bool = False, backend: str = 'json') -> Iterator[str]:
+    """
+    Кодирует значение в JSON по частям.
+
+    В читаемом режиме вывод побайтно совпадает с
+    json.dumps(value, ensure_ascii=False, indent=4, default=str), где Records
+    заменены списками словарей. В компактном режиме разделители - ',' и ':'.
+
+    Части без Records кодирует бэкенд: 'json' - стандартный модуль, 'orjson' -
+    библиотека orjson (если установлена; только компактный режим: NaN она
+    пишет как null, numpy-числа - числами, а не строками), 'auto' - orjson,
+    если она установлена, иначе json.
+
+    Аргументы:
+        value: dict, list, Records или любое значение, которое кодирует json.dumps.
+        compact (bool): Без отступов и лишних пробелов.
+        backend (str): 'json', 'orjson' или 'auto'.
+
+    Возвращает:
+        Iterator[str]: Части JSON-текста.
+    """
+    return _Encoder(compact, backend).iterencode(value)
+
+
+def encode_json(value, compact: bool = False, backend: str = 'json') -> str:
+    """
+    Кодирует значение в JSON (см. iter_json).
+
+    Аргументы:
+        value: dict, list, Records или любое значение, которое кодирует json.dumps.
+        compact (bool): Без отступов и лишних пробелов.
+        backend (str): 'json', 'orjson' или 'auto'.
+
+    Возвращает:
+        str: JSON-текст.
+    """
+    return ''.join(iter_json(value, compact, backend))
+
+
+def write_json(file, value, compact: bool = False, backend: str = 'json') -> None:
+    """
+    Записывает значение в открытый текстовый файл по частям (см. iter_json).
+
+    Аргументы:
+        file: Файл, открытый на запись текста.
+        value: dict, list, Records или любое значение, которое кодирует json.dumps.
+        compact (bool): Без отступов и лишних пробелов.
+        backend (str): 'json', 'orjson' или 'auto'.
+    """
+    for chunk in iter_json(value, compact, backend):
+        file.write(chunk)
+
+
+class _Encoder:
+    # Обходит только контейнеры, внутри которых есть Records; все остальное кодирует бэкенд целиком
+
+    def __init__(self, compact: bool, backend: str):
+        if backend not in BACKENDS:
+            raise ValueError(f'Неизвестный бэкенд JSON: {backend}')
+        self.compact = compact
+        if compact:
+            self.item_separator, self.key_separator = ',', ':'
+            self._plain = _get_compact_encoder(backend)
+        else:
+            self.item_separator, self.key_separator = ',', ': '
+            self._plain = json.JSONEncoder(ensure_ascii=False, indent=INDENT, default=_default).encode
+
+    def iterencode(self, value, level: int = 0) -> Iterator[str]:
+        if isinstance(value, Records):
+            yield from self._iter_records(value, level)
+        elif isinstance(value, dict) and value and _has_records(value):
+            yield from self._iter_dict(value, level)
+        elif isinstance(value, (list, tuple)) and value and _has_records(value):
+            yield from self._iter_list(value, level)
+        else:
+            yield self.encode_plain(value, level)
+
+    def encode_plain(self, value, level: int) -> str:
+        text = self._plain(value)
+        if self.compact or not level:
+            return text
+        # Переводы строк в JSON бывают только между элементами (в строках они экранированы)
+        return text.replace('\n', self._newline(level))
+
+    def _newline(self, level: int) -> str:
+        return '' if self.compact else '\n' + ' ' * (INDENT * level)
+
+    def _iter_dict(self, value: dict, level: int) -> Iterator[str]:
+        inner = self._newline(level + 1)
+        yield '{' + inner
+        for position, (key, item) in enumerate(value.items()):
+            if position:
+                yield self.item_separator + inner
+            yield _encode_key(key) + self.key_separator
+            yield from self.iterencode(item, level + 1)
+        yield self._newline(level) + '}'
+
+    def _iter_list(self, value, level: int) -> Iterator[str]:
+        inner = self._newline(level + 1)
+        yield '[' + inner
+        for position, item in enumerate(value):
+            if position:
+                yield self.item_separator + inner
+            yield from self.iterencode(item, level + 1)
+        yield self._newline(level) + ']'
+
+    def _iter_records(self, records: Records, level: int) -> Iterator[str]:
+        if not len(records):
+            yield '[]'
+            return
+        # Шаблон записи: ключи и разделители готовы, на месте значений - '{}'
+        key_indent, row_indent = self._newline(level + 2), self._newline(level + 1)
+        parts = [_encode_key(key).replace('{', '{{').replace('}', '}}') + self.key_separator
+                 for key in records.columns]
+        template = '{{' + key_indent + (self.item_separator + key_indent).join(part + '{}' for part in parts)
+        template += row_indent + '}}'
+        row_separator = self.item_separator + row_indent
+
+        yield '[' + row_indent
+        for start in range(0, len(records), ROWS_PER_CHUNK):
+            encoded = [self._encode_column(_to_list(values[start:start + ROWS_PER_CHUNK]), level + 2)
+                       for values in records.columns.values()]
+            chunk = row_separator.join(template.format(*row) for row in zip(*encoded))
+            yield (row_separator + chunk) if start else chunk
+        yield self._newline(level) + ']'
+
+    def _encode_column(self, values: list, level: int) -> list:
+        # Числа и строки кодируются напрямую, без кодировщика json; повторяющиеся
+        # строки (категории, даты) - один раз
+        encoded, strings = [], {}
+        for value in values:
+            kind = type(value)
+            if kind is float:
+                text = _encode_float(value)
+            elif kind is str:
+                text = strings.get(value)
+                if text is None:
+                    text = strings[value] = _encode_string(value)
+            elif kind is int:
+                text = int.__repr__(value)
+            else:
+                text = self.encode_plain(value, level)
+            encoded.append(text)
+        return encoded
+
+
+def _get_compact_encoder(backend: str):
+    if backend != 'json':
+        try:
+            import orjson
+        except ImportError:
+            if backend == 'orjson':
+                raise
+        else:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            return lambda value: orjson.dumps(value, default=_default, option=option).decode('utf-8')
+    return json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default).encode
+
+
+def _default(value):
+    # Records внутри обычных значений кодируются списком словарей, остальное - строкой, как default=str
+    if isinstance(value, Records):
+        return value.to_list()
+    return str(value)
+
+
+def _has_records(value) -> bool:
+    if isinstance(value, Records):
+        return True
+    if isinstance(value, dict):
+        return any(_has_records(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_records(item) for item in value)
+    return False
+
+
+def _encode_key(key) -> str:
+    # Ключи приводятся к строкам так же, как в json.dumps
+    if not isinstance(key, str):
+        if not isinstance(key, (bool, type(None), int, float)):
+            raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
+        key = json.dumps(key)
+    return _encode_string(key)
+
+
+def _encode_string(value: str) -> str:
+    return json.encoder.encode_basestring(value)
+
+
+def _encode_float(value: float) -> str:
+    # Как json.dumps: NaN и бесконечности - литералами JavaScript
+    if value != value:
+        return 'NaN'
+    if value == _INFINITY:
+        return 'Infinity'
+    if value == -_INFINITY:
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _to_list(values) -> list:
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
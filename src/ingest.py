@@ -0,0 +1,115 @@
+import os
+from typing import Iterator, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.schema import apply_schema
+from src.cube import aggregate_cells, combine_cells, MONTH_COLUMN, CATEGORY_COLUMN, CARD_COLUMN
+
+CHUNK_SIZE = 50000
+
+# Формат CSV-выгрузки банка: разделитель ';', десятичная запятая
+CSV_OPTIONS = {'sep': ';', 'decimal': ','}
+
+
+def iter_transaction_chunks(file_path: str, chunk_size: int = CHUNK_SIZE, **csv_options) -> Iterator[pd.DataFrame]:
+    """
+    Потоково читает файл с операциями (.xlsx или .csv) порциями по chunk_size строк.
+
+    Excel читается построчно через openpyxl в режиме read_only, CSV - через
+    pd.read_csv(chunksize=...), поэтому в памяти одновременно находится только
+    одна порция. Типы столбцов порций задаются схемой src.schema.TRANSACTION_SCHEMA.
+
+    Аргументы:
+        file_path (str): Путь к файлу operations.xlsx или выгрузке .csv.
+        chunk_size (int): Число строк в порции.
+        csv_options: Параметры pd.read_csv для CSV (по умолчанию CSV_OPTIONS).
+
+    Возвращает:
+        Iterator[pd.DataFrame]: Порции операций.
+    """
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        chunks = _iter_csv_chunks(file_path, chunk_size, {**CSV_OPTIONS, **csv_options})
+    else:
+        chunks = _iter_excel_chunks(file_path, chunk_size)
+    # Формат дат определяется по первой порции и используется для всего файла
+    parsers = {}
+    for chunk in chunks:
+        yield type_chunk(chunk, parsers)
+
+
+def type_chunk(chunk: pd.DataFrame, parsers: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Приводит столбцы порции к типам схемы src.schema.TRANSACTION_SCHEMA.
+
+    Аргументы:
+        chunk (pd.DataFrame): Порция операций.
+        parsers (dict): Разборщики дат, общие для порций одного файла (см. apply_schema).
+
+    Возвращает:
+        pd.DataFrame: Порция с приведенными типами.
+    """
+    return apply_schema(chunk, parsers=parsers)
+
+
+def aggregate_file(file_path: str, chunk_size: int = CHUNK_SIZE, **csv_options) -> pd.DataFrame:
+    """
+    Строит ячейки куба месяц x категория x карта (см. src.cube) за один проход по файлу.
+
+    Память ограничена размером порции и числом ячеек, а не размером файла.
+
+    Аргументы:
+        file_path (str): Путь к файлу operations.xlsx или выгрузке .csv.
+        chunk_size (int): Число строк в порции.
+        csv_options: Параметры pd.read_csv для CSV.
+
+    Возвращает:
+        pd.DataFrame: Ячейки куба.
+    """
+    keys = [MONTH_COLUMN, CATEGORY_COLUMN, CARD_COLUMN]
+    cells = None
+    for chunk in iter_transaction_chunks(file_path, chunk_size, **csv_options):
+        chunk_cells = aggregate_cells(chunk)
+        if cells is None:
+            cells = chunk_cells
+        else:
+            cells = combine_cells(pd.concat([cells, chunk_cells], ignore_index=True), keys)
+    if cells is None:
+        return aggregate_cells(pd.DataFrame(columns=['Дата операции', 'Сумма операции']))
+    return cells.sort_values(MONTH_COLUMN, kind='mergesort', ignore_index=True)
+
+
+def _iter_excel_chunks(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header: Optional[list] = None
+        for row in rows:
+            if any(value is not None for value in row):
+                header = list(row)
+                break
+        if header is None:
+            return
+
+        width = len(header)
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            batch.append(row[:width])
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame.from_records(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _iter_csv_chunks(file_path: str, chunk_size: int, csv_options: dict) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(file_path, chunksize=chunk_size, **csv_options) as reader:
+        for chunk in reader:
+            yield chunk
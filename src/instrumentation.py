@@ -0,0 +1,221 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional
+
+# Границы корзин гистограммы длительностей, в секундах
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Подключенные приемники; пока список пуст, инструментирование выключено
+_sinks = []
+_sinks_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def add_sink(sink) -> None:
+    """
+    Подключает приемник замеров (LogSink, MemorySink или объект с теми же методами).
+
+    Аргументы:
+        sink: Приемник с методами record_span(name, seconds, rows_in, rows_out)
+            и record_count(name, value).
+    """
+    global _sinks
+    with _sinks_lock:
+        # Список заменяется целиком, чтобы читать его можно было без блокировки
+        _sinks = _sinks + [sink]
+
+
+def remove_sink(sink) -> None:
+    """
+    Отключает приемник замеров.
+
+    Аргументы:
+        sink: Подключенный ранее приемник.
+    """
+    global _sinks
+    with _sinks_lock:
+        _sinks = [item for item in _sinks if item is not sink]
+
+
+def is_enabled() -> bool:
+    return bool(_sinks)
+
+
+def instrumented(name: str):
+    """
+    Декоратор, замеряющий длительность вызова функции.
+
+    Вместе с длительностью передаются размер входа (длина первого аргумента-таблицы)
+    и выхода (длина результата-таблицы или списка). Без подключенных приемников
+    декоратор только проверяет пустой список и вызывает функцию.
+
+    Аргументы:
+        name (str): Имя замера, например 'views.get_cards_data'.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _sinks:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            _emit_span(name, time.perf_counter() - started, _rows_in(args), _rows(result))
+            return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def span(name: str, rows_in: Optional[int] = None):
+    """
+    Контекстный менеджер, замеряющий длительность участка кода.
+
+    Аргументы:
+        name (str): Имя замера.
+        rows_in (int): Размер входа.
+
+    Возвращает:
+        dict: Словарь, в который участок кода может записать 'rows_out'.
+    """
+    if not _sinks:
+        yield {}
+        return
+    info = {}
+    started = time.perf_counter()
+    yield info
+    _emit_span(name, time.perf_counter() - started, rows_in, info.get('rows_out'))
+
+
+def increment(name: str, value: int = 1) -> None:
+    """
+    Увеличивает счетчик (например, число HTTP-запросов).
+
+    Аргументы:
+        name (str): Имя счетчика.
+        value (int): Приращение.
+    """
+    for sink in _sinks:
+        sink.record_count(name, value)
+
+
+class LogSink:
+    """
+    Приемник, записывающий каждый замер в журнал.
+    """
+
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO):
+        self.log = log
+        self.level = level
+
+    def record_span(self, name: str, seconds: float, rows_in: Optional[int], rows_out: Optional[int]) -> None:
+        self.log.log(self.level, '%s %.3f ms rows_in=%s rows_out=%s', name, seconds * 1000, rows_in, rows_out)
+
+    def record_count(self, name: str, value: int) -> None:
+        self.log.log(self.level, '%s +%d', name, value)
+
+
+class MemorySink:
+    """
+    Приемник, накапливающий гистограммы длительностей, строки и счетчики в памяти.
+
+    Результат доступен как словарь (snapshot()) или в текстовом формате Prometheus
+    (prometheus_text()).
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._counters = {}
+
+    def record_span(self, name: str, seconds: float, rows_in: Optional[int], rows_out: Optional[int]) -> None:
+        with self._lock:
+            stats = self._spans.get(name)
+            if stats is None:
+                stats = self._spans[name] = {
+                    "count": 0, "sum": 0.0, "max": 0.0, "rows_in": 0, "rows_out": 0,
+                    "buckets": [0] * (len(self.buckets) + 1)
+                }
+            stats["count"] += 1
+            stats["sum"] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            stats["rows_in"] += rows_in or 0
+            stats["rows_out"] += rows_out or 0
+            stats["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    def record_count(self, name: str, value: int) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает копию накопленных замеров.
+
+        Возвращает:
+            dict: {"spans": {имя: {count, sum, max, rows_in, rows_out, buckets}}, "counters": {имя: значение}}.
+        """
+        with self._lock:
+            return {
+                "spans": {name: {**stats, "buckets": list(stats["buckets"])} for name, stats in self._spans.items()},
+                "counters": dict(self._counters)
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def prometheus_text(self, prefix: str = 'operations') -> str:
+        """
+        Выгружает замеры в текстовом формате Prometheus.
+
+        Аргументы:
+            prefix (str): Префикс имен метрик.
+
+        Возвращает:
+            str: Гистограмма '<prefix>_span_seconds', счетчики строк и '<prefix>_<счетчик>_total'.
+        """
+        snapshot = self.snapshot()
+        lines = [f'# TYPE {prefix}_span_seconds histogram']
+        for name, stats in sorted(snapshot["spans"].items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), stats["buckets"]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_span_seconds_sum{{span="{name}"}} {stats["sum"]!r}')
+            lines.append(f'{prefix}_span_seconds_count{{span="{name}"}} {stats["count"]}')
+        for kind in ('rows_in', 'rows_out'):
+            lines.append(f'# TYPE {prefix}_span_{kind}_total counter')
+            for name, stats in sorted(snapshot["spans"].items()):
+                lines.append(f'{prefix}_span_{kind}_total{{span="{name}"}} {stats[kind]}')
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = f'{prefix}_{name.replace(".", "_")}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _emit_span(name: str, seconds: float, rows_in: Optional[int], rows_out: Optional[int]) -> None:
+    for sink in _sinks:
+        sink.record_span(name, seconds, rows_in, rows_out)
+
+
+def _rows(value) -> Optional[int]:
+    # Таблицы, хранилища и списки записей; строки (готовый JSON) не считаются
+    if isinstance(value, (str, bytes, dict)) or not hasattr(value, '__len__'):
+        return None
+    return len(value)
+
+
+def _rows_in(args: tuple) -> Optional[int]:
+    for arg in args:
+        rows = _rows(arg)
+        if rows is not None:
+            return rows
+    return None
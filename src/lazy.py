@@ -0,0 +1,46 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Модуль, который импортируется при первом обращении к его атрибуту.
+
+    Так pandas и numpy не загружаются при импорте src.views и src.server:
+    короткие вызовы (приветствие, справка командной строки) обходятся без них,
+    а первая функция, которой нужны таблицы, платит за импорт один раз.
+    Аннотации типов с pd./np. в модулях с отложенным импортом не вычисляются
+    (from __future__ import annotations).
+    """
+
+    def __init__(self, name: str):
+        self._lazy_name = name
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    def __getattr__(self, attr: str):
+        # Вызывается только для атрибутов, которых нет у самого объекта, то есть для атрибутов модуля
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self._lazy_name)
+                module = self._lazy_module
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = 'загружен' if self._lazy_module is not None else 'не загружен'
+        return f'<LazyModule {self._lazy_name!r} ({state})>'
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Возвращает модуль с отложенным импортом.
+
+    Аргументы:
+        name (str): Имя модуля, например 'pandas'.
+
+    Возвращает:
+        LazyModule: Объект, передающий обращения к атрибутам модулю после его импорта.
+    """
+    return LazyModule(name)
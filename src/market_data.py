@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from src.instrumentation import increment, span
+
+# Загрузка переменных окружения (адрес API акций и ключ API); модуль импортируется
+# при первом запросе рыночных данных
+load_dotenv()
+
+EXCHANGE_API_URL = 'https://api.exchangerate-api.com/v4'
+
+# Базовая валюта таблицы курсов: один ответ latest/RUB содержит все кросс-курсы
+BASE_CURRENCY = 'RUB'
+
+# Курсы валют могут устаревать на несколько минут, цены акций - на минуту
+RATES_TTL = 300.0
+STOCKS_TTL = 60.0
+
+# Таймауты (соединение, чтение) в секундах
+REQUEST_TIMEOUT = (3.05, 5.0)
+
+POOL_SIZE = 8
+
+# Ошибки загрузки, при которых используется устаревшее значение из кеша
+FETCH_ERRORS = (requests.RequestException, ValueError, KeyError, TypeError, IndexError)
+
+
+class RateTable:
+    """
+    Таблица курсов валют относительно одной базовой валюты.
+
+    rates[X] - количество валюты X за одну единицу базовой валюты (как в ответе
+    /latest/{base}); курс любой пары вычисляется локально.
+    """
+
+    def __init__(self, base: str, rates: dict):
+        """
+        Создает таблицу курсов.
+
+        Аргументы:
+            base (str): Базовая валюта.
+            rates (dict): Курсы валют относительно базовой.
+        """
+        self.base = base
+        self.rates = dict(rates)
+        self.rates[base] = 1.0
+        self._series = pd.Series(self.rates, dtype=float)
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.rates
+
+    def rate(self, from_ccy: str, to_ccy: str) -> float:
+        """
+        Возвращает курс пары: сколько to_ccy стоит одна единица from_ccy.
+
+        Аргументы:
+            from_ccy (str): Исходная валюта.
+            to_ccy (str): Целевая валюта.
+
+        Возвращает:
+            float: Курс пары.
+        """
+        return self.rates[to_ccy] / self.rates[from_ccy]
+
+    def convert(self, amounts, from_ccy, to_ccy: str):
+        """
+        Переводит суммы из одной валюты в другую.
+
+        Аргументы:
+            amounts: Сумма, массив или pd.Series сумм.
+            from_ccy: Исходная валюта или массив/pd.Series валют для каждой суммы
+                (например, столбец 'Валюта операции'); для неизвестных валют результат NaN.
+            to_ccy (str): Целевая валюта.
+
+        Возвращает:
+            Суммы в целевой валюте того же вида, что и amounts.
+        """
+        target = self.rates[to_ccy]
+        if isinstance(from_ccy, str):
+            return amounts * (target / self.rates[from_ccy])
+        source = pd.Series(np.asarray(from_ccy, dtype=object)).map(self._series).to_numpy(dtype=float)
+        if isinstance(amounts, pd.Series):
+            return amounts * (target / source)
+        return np.asarray(amounts, dtype=float) * (target / source)
+
+
+class MarketDataClient:
+    """
+    Клиент рыночных данных: курсы валют и цены акций.
+
+    Использует общий пул соединений requests.Session, кеширует значение каждого
+    символа на TTL, объединяет одновременные запросы одного символа в один
+    (single-flight) и при ошибке или таймауте возвращает последнее известное
+    (устаревшее) значение.
+
+    Курсы валют берутся из одной таблицы latest/RUB (RateTable), цены всех
+    акций - одним пакетным запросом /time_series.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, exchange_api_url: str = EXCHANGE_API_URL,
+                 stock_api_url: Optional[str] = None, api_key: Optional[str] = None,
+                 rates_ttl: float = RATES_TTL, stocks_ttl: float = STOCKS_TTL,
+                 timeout: tuple = REQUEST_TIMEOUT, pool_size: int = POOL_SIZE):
+        """
+        Создает клиент.
+
+        Аргументы:
+            session (requests.Session): Сессия; по умолчанию создается сессия с пулом соединений.
+            exchange_api_url (str): Базовый URL API курсов валют.
+            stock_api_url (str): Базовый URL API цен акций; по умолчанию STOCK_API_URL из окружения.
+            api_key (str): Ключ API цен акций; по умолчанию API_KEY из окружения.
+            rates_ttl (float): Время жизни курса валюты в кеше, секунд.
+            stocks_ttl (float): Время жизни цены акции в кеше, секунд.
+            timeout (tuple): Таймауты соединения и чтения, секунд.
+            pool_size (int): Размер пула соединений сессии.
+        """
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self.exchange_api_url = exchange_api_url.rstrip('/')
+        self._stock_api_url = stock_api_url
+        self._api_key = api_key
+        self.rates_ttl = rates_ttl
+        self.stocks_ttl = stocks_ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, tuple] = {}
+        self._inflight: Dict[tuple, Future] = {}
+
+    @property
+    def stock_api_url(self) -> Optional[str]:
+        return self._stock_api_url or os.getenv('STOCK_API_URL')
+
+    @property
+    def api_key(self) -> Optional[str]:
+        return self._api_key or os.getenv('API_KEY')
+
+    def fetch_json(self, url: str, params: Optional[dict] = None):
+        """
+        Выполняет GET-запрос через общую сессию и возвращает разобранный JSON.
+
+        Аргументы:
+            url (str): URL запроса.
+            params (dict): Параметры запроса.
+
+        Возвращает:
+            Разобранный JSON-ответ.
+        """
+        increment('market_data.http_requests')
+        with span('market_data.fetch_json'):
+            response = self.session.get(url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    def get_cached(self, kind: str, symbols: list, loader: Callable, ttl: float) -> dict:
+        """
+        Возвращает значения символов из кеша, недостающие загружает одним вызовом loader.
+
+        Символы, которые уже загружаются другим потоком, не запрашиваются повторно:
+        вызов ждет ту же загрузку (single-flight). Если значение символа получить
+        не удалось, используется устаревшее значение из кеша, а при его отсутствии
+        символ пропускается.
+
+        Аргументы:
+            kind (str): Вид данных (часть ключа кеша).
+            symbols (list): Список символов.
+            loader (Callable): Функция, загружающая значения списка символов и возвращающая словарь.
+            ttl (float): Время жизни значения, секунд.
+
+        Возвращает:
+            dict: Значения по символам в порядке symbols.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        values, stale, owned, waiting = {}, {}, {}, {}
+        now = time.monotonic()
+        with self._lock:
+            for symbol in symbols:
+                key = (kind, symbol)
+                cached = self._cache.get(key)
+                if cached is not None and now - cached[1] < ttl:
+                    values[symbol] = cached[0]
+                    continue
+                if cached is not None:
+                    stale[symbol] = cached[0]
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    owned[symbol] = future
+                else:
+                    waiting[symbol] = future
+
+        if owned:
+            error = None
+            try:
+                loaded = loader(list(owned))
+            except BaseException as exc:
+                loaded, error = {}, exc
+            with self._lock:
+                loaded_at = time.monotonic()
+                for symbol in owned:
+                    del self._inflight[(kind, symbol)]
+                    if symbol in loaded:
+                        self._cache[(kind, symbol)] = (loaded[symbol], loaded_at)
+            for symbol, future in owned.items():
+                if symbol in loaded or symbol in stale:
+                    values[symbol] = loaded[symbol] if symbol in loaded else stale[symbol]
+                    future.set_result(values[symbol])
+                else:
+                    future.set_exception(error or KeyError(symbol))
+            if error is not None and not isinstance(error, FETCH_ERRORS):
+                raise error
+
+        for symbol, future in waiting.items():
+            try:
+                values[symbol] = future.result()
+            except FETCH_ERRORS:
+                continue
+        return {symbol: values[symbol] for symbol in symbols if symbol in values}
+
+    def get_currency_rates(self, currencies: list) -> dict:
+        """
+        Получает курсы валют к рублю.
+
+        Аргументы:
+            currencies (list): Список валют.
+
+        Возвращает:
+            dict: Курсы валют.
+        """
+        table = self.get_rate_table()
+        if table is None:
+            return {}
+        return {currency: table.rate(currency, BASE_CURRENCY) for currency in currencies if currency in table}
+
+    def get_rate_table(self, base: str = BASE_CURRENCY) -> Optional[RateTable]:
+        """
+        Возвращает таблицу курсов относительно базовой валюты (из кеша или API).
+
+        Аргументы:
+            base (str): Базовая валюта.
+
+        Возвращает:
+            RateTable: Таблица курсов или None, если ее не удалось получить.
+        """
+        tables = self.get_cached('rates', [base], lambda bases: {base: self._load_rate_table(base)}, self.rates_ttl)
+        return tables.get(base)
+
+    def get_stock_prices(self, stocks: list) -> dict:
+        """
+        Получает цены на акции (цена открытия последней минутной свечи).
+
+        Все акции, которых нет в кеше, запрашиваются одним пакетным запросом.
+
+        Аргументы:
+            stocks (list): Список акций.
+
+        Возвращает:
+            dict: Цены на акции.
+        """
+        return self.get_cached('stock', stocks, self._load_stock_prices, self.stocks_ttl)
+
+    def _load_rate_table(self, base: str) -> RateTable:
+        data = self.fetch_json(f'{self.exchange_api_url}/latest/{base}')
+        return RateTable(data.get('base', base), data['rates'])
+
+    def _load_stock_prices(self, stocks: list) -> dict:
+        # Только последняя минутная свеча всех акций одним запросом
+        data = self.fetch_json(f'{self.stock_api_url}/time_series', params={
+            'symbol': ','.join(stocks), 'interval': '1min', 'outputsize': 1, 'apikey': self.api_key
+        })
+        return parse_time_series_prices(data, stocks)
+
+
+def parse_time_series_prices(data: dict, stocks: list) -> dict:
+    """
+    Разбирает ответ /time_series (для одной или нескольких акций) в словарь цен открытия последней свечи.
+
+    Для одной акции API возвращает {'meta': ..., 'values': [...]}, для нескольких -
+    {'AAPL': {'meta': ..., 'values': [...]}, ...}. Акции с ошибкой или без данных пропускаются.
+
+    Аргументы:
+        data (dict): Ответ API.
+        stocks (list): Запрошенные акции.
+
+    Возвращает:
+        dict: Цены на акции.
+    """
+    if 'values' in data and len(stocks) == 1:
+        data = {stocks[0]: data}
+    prices = {}
+    for stock in stocks:
+        series = data.get(stock)
+        if not isinstance(series, dict) or series.get('status') == 'error':
+            continue
+        values = series.get('values') or []
+        if values:
+            prices[stock] = float(values[0]['open'])
+    return prices
+
+
+_default_client: Optional[MarketDataClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_market_data_client() -> MarketDataClient:
+    """
+    Возвращает общий для процесса клиент рыночных данных.
+
+    Возвращает:
+        MarketDataClient: Клиент рыночных данных.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = MarketDataClient()
+        return _default_client
@@ -1,25 +1,28 @@
 import pandas as pd
 from datetime import datetime, timedelta
+from src.ingest import iter_transaction_chunks
+from src.store import TransactionStore, slice_by_date
 
 # Функция для фильтрации транзакций за текущий месяц
 def filter_current_month_transactions(transactions):
     now = datetime.now()
     start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     end_date = (start_date + timedelta(days=32)).replace(day=1, hour=0, minute=0, second=0, microsecond=0) - timedelta(seconds=1)
-    return transactions[(transactions['Дата операции'] >= start_date) & (transactions['Дата операции'] <= end_date)]
+    if isinstance(transactions, TransactionStore):
+        return transactions.between(start_date, end_date)
+    return slice_by_date(transactions, start_date, end_date)
 
-# Укажите правильный путь к вашему файлу
-file_path = '../data/operations (1).xlsx'
 
-# Читаем данные из Excel-файла
-df = pd.read_excel(file_path)
+if __name__ == '__main__':
+    # Укажите правильный путь к вашему файлу
+    file_path = '../data/operations (1).xlsx'
 
-# Преобразуем столбцы с датами в формат datetime
-df['Дата операции'] = pd.to_datetime(df['Дата операции'], format='%Y-%m-%d %H:%M:%S')
-df['Дата платежа'] = pd.to_datetime(df['Дата платежа'], format='%Y-%m-%d %H:%M:%S')
+    # Читаем данные из Excel-файла порциями (даты уже в формате datetime)
+    # и фильтруем транзакции за текущий месяц в каждой порции
+    current_month_transactions = pd.concat(
+        [filter_current_month_transactions(chunk) for chunk in iter_transaction_chunks(file_path)],
+        ignore_index=True
+    )
 
-# Фильтруем транзакции за текущий месяц
-current_month_transactions = filter_current_month_transactions(df)
-
-# Проверяем, что есть данные
-print(current_month_transactions.head())
\ No newline at end of file
+    # Проверяем, что есть данные
+    print(current_month_transactions.head())
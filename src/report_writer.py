@@ -0,0 +1,167 @@
+import atexit
+import os
+import secrets
+import stat
+import threading
+from collections import deque
+from typing import Callable, Iterable, Optional, Union
+from src.encoding import iter_json
+
+
+def iter_report(result, compact: bool = False) -> Iterable[str]:
+    """
+    Кодирует результат отчета в JSON по частям (см. src.encoding.iter_json).
+
+    Большой отчет (например, src.encoding.Records) пишется в файл порциями,
+    и весь JSON-текст не собирается в памяти.
+
+    Аргументы:
+        result: Результат функции отчета.
+        compact (bool): Без отступов и лишних пробелов.
+
+    Возвращает:
+        Iterable[str]: Части JSON-текста.
+    """
+    if isinstance(result, str):
+        return (result,)
+    return iter_json(result, compact)
+
+
+def write_atomic(file_name: str, text: Union[str, Iterable[str]], before_replace: Optional[Callable[[], None]] = None):
+    """
+    Записывает текст в файл через временный файл и переименование.
+
+    Читатель файла видит либо старое, либо новое содержимое целиком.
+    Права файла сохраняются, а новый файл получает права по umask, как при open().
+
+    Аргументы:
+        file_name (str): Путь к файлу.
+        text (str | Iterable[str]): Содержимое или его части по порядку.
+        before_replace (Callable): Вызывается после записи временного файла, перед
+            переименованием; ошибка в нем отменяет запись.
+    """
+    fd, temp_path = _create_temp(file_name)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if isinstance(text, str):
+                f.write(text)
+            else:
+                f.writelines(text)
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(file_name).st_mode))
+        except FileNotFoundError:
+            pass
+        if before_replace is not None:
+            before_replace()
+        os.replace(temp_path, file_name)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _create_temp(file_name: str) -> tuple:
+    # Временный файл рядом с целевым; права 0666 урезает umask, как при open()
+    # (mkstemp создал бы файл с правами 0600)
+    directory, name = os.path.split(os.path.abspath(file_name))
+    while True:
+        temp_path = os.path.join(directory, f'.{name}.{secrets.token_hex(4)}.tmp')
+        try:
+            return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+class ReportWriter:
+    """
+    Фоновая запись отчетов в файлы.
+
+    submit() только ставит отчет в очередь; кодирование в JSON и запись
+    выполняет рабочий поток. Повторные отчеты в один и тот же файл, еще
+    не записанные к моменту обработки, схлопываются: записывается только
+    последний. Ошибки записи не прерывают поток и сохраняются в errors.
+    """
+
+    def __init__(self):
+        self.writes = 0
+        self.coalesced = 0
+        self.errors = []
+        self._pending = {}
+        self._order = deque()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._thread = None
+
+    def submit(self, file_name: str, result, compact: bool = False):
+        """
+        Ставит отчет в очередь на запись.
+
+        Аргументы:
+            file_name (str): Путь к файлу отчета.
+            result: Результат функции отчета (не должен изменяться после передачи).
+            compact (bool): Компактное кодирование JSON.
+        """
+        with self._condition:
+            if file_name in self._pending:
+                self.coalesced += 1
+            else:
+                self._order.append(file_name)
+            self._pending[file_name] = (result, compact)
+            self._ensure_thread()
+            self._condition.notify()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ждет, пока все поставленные в очередь отчеты будут записаны.
+
+        Аргументы:
+            timeout (float): Максимальное время ожидания в секундах.
+
+        Возвращает:
+            bool: True, если очередь пуста.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._order and not self._busy, timeout)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='report-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._order)
+                file_name = self._order.popleft()
+                result, compact = self._pending.pop(file_name)
+                self._busy = True
+            try:
+                write_atomic(file_name, iter_report(result, compact))
+                self.writes += 1
+            except Exception as error:
+                self.errors.append((file_name, error))
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_report_writer() -> ReportWriter:
+    """
+    Возвращает общий фоновый писатель отчетов; при выходе из программы очередь дописывается.
+
+    Возвращает:
+        ReportWriter: Писатель отчетов.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ReportWriter()
+            atexit.register(_writer.flush)
+        return _writer
@@ -1,30 +1,60 @@
+from __future__ import annotations
+
 import json
-import pandas as pd
 from datetime import datetime
 from functools import wraps
+from src.instrumentation import instrumented
+from src.encoding import Records
+from src.report_writer import get_report_writer, iter_report, write_atomic
+from src.cube import CUBE_COLUMNS
+from src.store import TransactionSource, as_store
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+# Столбцы, которые читает get_spending_records
+SPENDING_COLUMNS = ['Дата операции', 'Сумма операции', 'Категория']
+
+def report_decorator(file_name=None, background=False, compact=False):
+    """
+    Декоратор, сохраняющий результат функции отчета в JSON-файл.
 
-def report_decorator(file_name=None):
+    Строковый результат считается готовым JSON и записывается как есть,
+    остальные кодируются в файл по частям (src.encoding).
+    Запись атомарна (временный файл и переименование). По умолчанию файл
+    записан к моменту возврата из функции. В фоновом режиме вызов только
+    ставит отчет в очередь src.report_writer, а повторные отчеты в тот же
+    файл схлопываются; вызывающий код включает его сам, например
+    report_decorator(file_name, background=True)(spending_by_categories.__wrapped__).
+
+    Аргументы:
+        file_name (str): Путь к файлу отчета, по умолчанию report_output.json.
+        background (bool): Записывать файл в фоновом потоке.
+        compact (bool): Кодировать JSON без отступов.
+    """
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            if file_name:
-                with open(file_name, 'w') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=4)
+            report_file = file_name or 'report_output.json'
+            if background:
+                get_report_writer().submit(report_file, result, compact)
             else:
-                with open('report_output.json', 'w') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=4)
+                write_atomic(report_file, iter_report(result, compact))
             return result
         return wrapper
     return decorator
 
 @report_decorator(file_name='spending_by_category_report.json')
-def spending_by_category(transactions: pd.DataFrame, category: str, date: str = None) -> str:
+@instrumented('reports.spending_by_category')
+def spending_by_category(transactions: TransactionSource, category: str, date: str = None) -> str:
     """
     Получает траты по категории за последние три месяца.
 
     Аргументы:
-        transactions (pd.DataFrame): DataFrame с транзакциями.
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Хранилище, DataFrame
+            с транзакциями, путь к файлу или архив (читаются только операции трех месяцев).
         category (str): Название категории.
         date (str): Опциональная дата в формате 'YYYY-MM-DD'.
 
@@ -37,8 +67,93 @@ def spending_by_category(transactions: pd.DataFrame, category: str, date: str =
         end_date = datetime.now()
 
     start_date = end_date - pd.DateOffset(months=3)
-    filtered_transactions = transactions[(transactions['Дата операции'] >= start_date) & (transactions['Дата операции'] <= end_date)]
+    totals = as_store(transactions, start_date, end_date, CUBE_COLUMNS).cube.query(start_date, end_date)
+
+    category_spending = totals[totals['Категория'] == category]['sum'].sum()
+
+    return json.dumps({"category": category, "spending": float(category_spending)}, ensure_ascii=False, indent=4)
+
+@report_decorator(file_name='spending_by_categories_report.json')
+@instrumented('reports.spending_by_categories')
+def spending_by_categories(transactions: TransactionSource, categories: list, dates: list) -> Records:
+    """
+    Получает траты по каждой категории за три месяца до каждой из дат (см. get_spending_table).
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str): Хранилище, DataFrame с транзакциями или путь к файлу.
+        categories (list): Названия категорий.
+        dates (list): Даты в формате 'YYYY-MM-DD'.
+
+    Возвращает:
+        Records: Записи {"category", "date", "spending"} по всем парам категория-дата; в файл отчета
+            они кодируются по частям, строку JSON дает src.encoding.encode_json.
+    """
+    return get_spending_table(transactions, categories, dates)
+
+
+def get_spending_records(transactions: TransactionSource, categories: list, dates: list) -> list:
+    """
+    Считает траты по каждой категории за три месяца до каждой из дат (см. get_spending_table).
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str): Хранилище, DataFrame с транзакциями или путь к файлу.
+        categories (list): Названия категорий.
+        dates (list): Даты в формате 'YYYY-MM-DD'.
+
+    Возвращает:
+        list: Записи {"category", "date", "spending"} по всем парам категория-дата.
+    """
+    return get_spending_table(transactions, categories, dates).to_list()
+
+
+def get_spending_table(transactions: TransactionSource, categories: list, dates: list) -> Records:
+    """
+    Считает траты по каждой категории за три месяца до каждой из дат одним проходом.
+
+    Операции выбранных категорий группируются по категории (внутри группы
+    они остаются отсортированными по дате), по группам считаются накопленные
+    суммы, а сумма за окно [дата - 3 месяца, дата] - разность накопленных
+    сумм на границах окна, найденных двоичным поиском. Суммы округляются
+    до копеек. Результат хранится по столбцам и кодируется в JSON без словаря
+    на каждую пару.
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str): Хранилище, DataFrame с транзакциями или путь к файлу.
+        categories (list): Названия категорий.
+        dates (list): Даты в формате 'YYYY-MM-DD'.
+
+    Возвращает:
+        Records: Записи {"category", "date", "spending"} по всем парам категория-дата
+            (категория за категорией, внутри - даты по порядку).
+    """
+    store = as_store(transactions, columns=SPENDING_COLUMNS)
+    # Операции с датой (строки без даты хранилище держит в начале)
+    left, right = store.locate(pd.Timestamp.min, pd.Timestamp.max)
+    frame = store.frame.iloc[left:right]
+    names = pd.unique(pd.Series(categories, dtype=object))
+    end_dates = pd.DatetimeIndex([datetime.strptime(date, '%Y-%m-%d') for date in dates])
+    start_dates = pd.DatetimeIndex([end_date - pd.DateOffset(months=3) for end_date in end_dates])
+
+    # Коды категорий из запроса (-1 - прочие операции); устойчивая сортировка по коду
+    # сохраняет порядок по дате внутри каждой категории
+    codes = pd.Categorical(frame['Категория'], categories=names).codes
+    selected = np.flatnonzero(codes >= 0)
+    order = selected[np.argsort(codes[selected], kind='stable')]
+    sorted_codes = codes[order]
+    sorted_dates = frame.index.to_numpy()[order]
+    cumulative = np.concatenate([[0.0], np.cumsum(frame['Сумма операции'].to_numpy(dtype=float)[order])])
+    bounds = np.searchsorted(sorted_codes, np.arange(len(names) + 1), side='left')
 
-    category_spending = filtered_transactions[filtered_transactions['Категория'] == category]['Сумма операции'].sum()
+    spending = {}
+    for code, category in enumerate(names):
+        first, last = bounds[code], bounds[code + 1]
+        segment = sorted_dates[first:last]
+        left = first + np.searchsorted(segment, start_dates.to_numpy(), side='left')
+        right = first + np.searchsorted(segment, end_dates.to_numpy(), side='right')
+        spending[category] = np.round(cumulative[right] - cumulative[left], 2)
 
-    return json.dumps({"category": category, "spending": float(category_spending)}, ensure_ascii=False, indent=4)
\ No newline at end of file
+    return Records({
+        "category": np.repeat(np.array(categories, dtype=object), len(dates)),
+        "date": np.tile(np.array(dates, dtype=object), len(categories)),
+        "spending": np.array([spending[category] for category in categories], dtype=float).reshape(-1)
+    })
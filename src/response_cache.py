@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ResponseCache:
+    """
+    Ограниченный по размеру кеш (LRU) с временем жизни записей (TTL).
+
+    Используется сервером для готовых JSON-ответов и их частей. Ключ записи
+    должен включать версию данных, из которых она построена, тогда после
+    перезагрузки файлов старые записи просто перестают запрашиваться и
+    вытесняются. Счетчики hits, misses, evictions и expirations доступны
+    через stats().
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable):
+        """
+        Возвращает значение по ключу.
+
+        Аргументы:
+            key (Hashable): Ключ записи.
+
+        Возвращает:
+            Значение или None, если записи нет или ее время жизни истекло.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value, ttl: Optional[float] = None):
+        """
+        Сохраняет значение; при переполнении вытесняет давно не использованные записи.
+
+        Аргументы:
+            key (Hashable): Ключ записи.
+            value: Значение (не None).
+            ttl (float): Время жизни в секундах; None - без ограничения.
+        """
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, build: Callable[[], object], ttl: Optional[float] = None):
+        """
+        Возвращает значение по ключу, при промахе строит его и сохраняет.
+
+        Аргументы:
+            key (Hashable): Ключ записи.
+            build (Callable): Функция без аргументов, которая строит значение.
+            ttl (float): Время жизни в секундах; None - без ограничения.
+
+        Возвращает:
+            Значение из кеша или построенное значение.
+        """
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Возвращает счетчики кеша.
+
+        Возвращает:
+            dict: entries, hits, misses, evictions, expirations.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Optional
+from src.dates import DateParser
+from src.lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+DATETIME = 'datetime64[ns]'
+CATEGORY = 'category'
+
+# Столбец выгрузки -> тип при загрузке; None - столбец не используется и отбрасывается.
+# 'Сумма операции' остается float64: по ней считаются все суммы в ответах, и float32
+# (7 значащих цифр) исказил бы копейки в итогах.
+TRANSACTION_SCHEMA = {
+    'Дата операции': DATETIME,
+    'Дата платежа': DATETIME,
+    'Номер карты': CATEGORY,
+    'Статус': CATEGORY,
+    'Сумма операции': 'float64',
+    'Валюта операции': CATEGORY,
+    'Сумма платежа': 'float32',
+    'Валюта платежа': CATEGORY,
+    'Кэшбэк': 'float32',
+    'Категория': CATEGORY,
+    'MCC': 'float32',
+    'Описание': CATEGORY,
+    'Бонусы (включая кэшбэк)': 'int32',
+    'Округление на инвесткопилку': None,
+    'Сумма операции с округлением': None
+}
+
+# Версия схемы; входит в ключ столбцового кеша, чтобы он перестраивался при ее изменении
+SCHEMA_VERSION = 1
+
+
+def apply_schema(transactions: pd.DataFrame, schema: dict = TRANSACTION_SCHEMA,
+                 parsers: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Приводит столбцы операций к типам схемы и отбрасывает неиспользуемые столбцы.
+
+    Столбцы, которых нет в схеме, не изменяются. Текстовые даты разбираются
+    src.dates.DateParser, текстовые числа - через pd.to_numeric; целочисленный
+    столбец с пропусками становится float32.
+
+    Аргументы:
+        transactions (pd.DataFrame): DataFrame с транзакциями.
+        schema (dict): Схема: столбец -> тип или None.
+        parsers (dict): Разборщики дат по столбцам; при разборе файла порциями один и тот же
+            словарь передается для всех порций, и формат дат определяется один раз.
+
+    Возвращает:
+        pd.DataFrame: Новый DataFrame с приведенными типами.
+    """
+    dropped = [column for column, dtype in schema.items() if dtype is None and column in transactions]
+    transactions = transactions.drop(columns=dropped)
+
+    columns = {}
+    for column in transactions.columns:
+        dtype = schema.get(column)
+        if dtype is not None:
+            columns[column] = _convert(transactions[column], dtype, parsers)
+    return transactions.assign(**columns)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    Сравнивает память, занимаемую столбцами DataFrame до и после применения схемы.
+
+    Аргументы:
+        before (pd.DataFrame): DataFrame до применения схемы.
+        after (pd.DataFrame): DataFrame после применения схемы.
+
+    Возвращает:
+        pd.DataFrame: Байты по столбцам ('before', 'after', 'ratio') и строка 'Итого'.
+    """
+    report = pd.DataFrame({
+        'before': before.memory_usage(index=False, deep=True),
+        'after': after.memory_usage(index=False, deep=True)
+    }).fillna(0).astype('int64')
+    report.loc['Итого'] = report.sum()
+    report['ratio'] = report['before'] / report['after'].where(report['after'] > 0)
+    return report
+
+
+def _convert(series: pd.Series, dtype: str, parsers: Optional[dict] = None) -> pd.Series:
+    if dtype == DATETIME:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        parser = parsers.setdefault(series.name, DateParser()) if parsers is not None else DateParser()
+        return parser.parse(series)
+    if dtype == CATEGORY:
+        return series.astype(CATEGORY)
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    if pd.api.types.is_integer_dtype(dtype) and series.isna().any():
+        dtype = 'float32'
+    return series.astype(dtype)
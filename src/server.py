@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.instrumentation import MemorySink
+from src.lazy import lazy_import
+from src.response_cache import DEFAULT_MAX_ENTRIES, ResponseCache
+from src.store import TransactionStore
+from src.utils import load_user_settings
+from src.views import (TRANSACTIONS_FILE, USER_SETTINGS_FILE, get_events_sections, get_home_sections,
+                       get_market_sections, render_page)
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+# Минимальный интервал между проверками времени изменения файлов, в секундах
+RELOAD_CHECK_INTERVAL = 1.0
+# Время жизни в кеше ответов: разделов из транзакций (их ключ включает версию файлов)
+# и рыночных данных (курсы и цены акций устаревают быстрее)
+SECTIONS_TTL = 3600.0
+MARKET_TTL = 30.0
+
+
+class AppState:
+    """
+    Загруженные в память транзакции и настройки пользователя.
+
+    Файлы загружаются один раз при старте. Перед обработкой запроса refresh()
+    сверяет время изменения файлов и при изменении загружает их заново; новое
+    состояние подменяется целиком, поэтому запросы, которые уже выполняются,
+    дорабатывают со старыми данными. Если перезагрузка не удалась (например,
+    файл еще дописывается), остается прежнее состояние.
+
+    Ответы кешируются в cache (ResponseCache) по ключу (страница, параметры,
+    версия транзакций, версия настроек). Разделы из транзакций живут sections_ttl,
+    рыночные разделы и готовый JSON - market_ttl, поэтому повторный запрос
+    той же страницы - это поиск в словаре.
+    """
+
+    def __init__(self, transactions_path: str = TRANSACTIONS_FILE, settings_path: str = USER_SETTINGS_FILE,
+                 check_interval: float = RELOAD_CHECK_INTERVAL, cache_size: int = DEFAULT_MAX_ENTRIES,
+                 sections_ttl: Optional[float] = SECTIONS_TTL, market_ttl: float = MARKET_TTL):
+        self.transactions_path = transactions_path
+        self.settings_path = settings_path
+        self.check_interval = check_interval
+        self.sections_ttl = sections_ttl
+        self.market_ttl = market_ttl
+        self.reloads = 0
+        self.reload_errors = 0
+        self.cache = ResponseCache(cache_size)
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        store, transactions_mtime = self._load_store()
+        settings, settings_mtime = self._load_settings()
+        self._snapshot = (store, settings, transactions_mtime, settings_mtime)
+
+    @property
+    def store(self) -> TransactionStore:
+        return self._snapshot[0]
+
+    @property
+    def settings(self) -> dict:
+        return self._snapshot[1]
+
+    def snapshot(self) -> tuple:
+        """
+        Возвращает согласованное состояние: хранилище, настройки и их версии (mtime файлов).
+
+        Возвращает:
+            tuple: (store, settings, transactions_version, settings_version).
+        """
+        return self._snapshot
+
+    def render_home(self, date_str: str) -> str:
+        """
+        Возвращает JSON главной страницы, используя кеш ответов.
+
+        Аргументы:
+            date_str (str): Дата и время в формате 'YYYY-MM-DD HH:MM:SS'.
+
+        Возвращает:
+            str: JSON-ответ.
+        """
+        return self._render('home', (date_str,), lambda store: get_home_sections(date_str, store))
+
+    def render_events(self, date_str: str, period: str) -> str:
+        """
+        Возвращает JSON страницы событий, используя кеш ответов.
+
+        Аргументы:
+            date_str (str): Дата в формате 'YYYY-MM-DD'.
+            period (str): Период ('W', 'M', 'Y', 'ALL').
+
+        Возвращает:
+            str: JSON-ответ.
+        """
+        return self._render('events', (date_str, period), lambda store: get_events_sections(date_str, period, store))
+
+    def _render(self, endpoint: str, params: tuple, build_sections: Callable[[TransactionStore], dict]) -> str:
+        store, settings, transactions_version, settings_version = self._snapshot
+        key = (endpoint,) + params + (transactions_version, settings_version)
+
+        # Готовый ответ живет не дольше рыночных данных в нем
+        page = self.cache.get(('page',) + key)
+        if page is not None:
+            return page
+
+        # Разделы из транзакций меняются только вместе с версией данных
+        sections = self.cache.get_or_set(('sections',) + key, lambda: build_sections(store), self.sections_ttl)
+        market = self.cache.get_or_set(('market', settings_version), lambda: get_market_sections(settings),
+                                       self.market_ttl)
+        page = render_page({**sections, **market})
+        self.cache.set(('page',) + key, page, self.market_ttl)
+        return page
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Перезагружает файлы, если они изменились с последней загрузки.
+
+        Аргументы:
+            force (bool): Проверить файлы, не дожидаясь интервала проверки.
+
+        Возвращает:
+            bool: True, если что-то было перезагружено.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        if not self._lock.acquire(blocking=False):
+            # Проверку уже выполняет другой поток; запрос обслуживается текущим состоянием
+            return False
+        try:
+            self._checked_at = now
+            reloaded = False
+            store, settings, transactions_mtime, settings_mtime = self._snapshot
+            try:
+                if _get_mtime(self.transactions_path) != transactions_mtime:
+                    store, transactions_mtime = self._load_store()
+                    reloaded = True
+                if _get_mtime(self.settings_path) != settings_mtime:
+                    settings, settings_mtime = self._load_settings()
+                    reloaded = True
+            except Exception:
+                # Файл может быть недописан или поврежден: повторим при следующей проверке
+                self.reload_errors += 1
+                return False
+            if reloaded:
+                self._snapshot = (store, settings, transactions_mtime, settings_mtime)
+                self.reloads += 1
+            return reloaded
+        finally:
+            self._lock.release()
+
+    def _load_store(self) -> Tuple[TransactionStore, Optional[int]]:
+        mtime = _get_mtime(self.transactions_path)
+        store = TransactionStore.from_file(self.transactions_path)
+        # Куб агрегатов строится заранее, а не в первом запросе /events
+        store.cube
+        return store, mtime
+
+    def _load_settings(self) -> Tuple[dict, Optional[int]]:
+        mtime = _get_mtime(self.settings_path)
+        return load_user_settings(self.settings_path), mtime
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов /home?date=YYYY-MM-DD HH:MM:SS и /events?date=YYYY-MM-DD&period=M;
+    /stats возвращает счетчики кеша ответов и перезагрузок, /metrics - замеры
+    src.instrumentation в текстовом формате Prometheus (если сервер создан с metrics).
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        state = self.server.state
+        state.refresh()
+
+        try:
+            if url.path == '/home':
+                body = state.render_home(query.get('date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+            elif url.path == '/events':
+                body = state.render_events(query.get('date', datetime.now().strftime('%Y-%m-%d')),
+                                           query.get('period', 'M'))
+            elif url.path == '/metrics' and self.server.metrics is not None:
+                self.send_body(200, self.server.metrics.prometheus_text(), 'text/plain; version=0.0.4; charset=utf-8')
+                return
+            elif url.path == '/stats':
+                body = render_page({"cache": state.cache.stats(), "reloads": state.reloads,
+                                    "reload_errors": state.reload_errors})
+            else:
+                self.send_json(404, json.dumps({"error": "Не найдено"}, ensure_ascii=False))
+                return
+        except ValueError as error:
+            self.send_json(400, json.dumps({"error": str(error)}, ensure_ascii=False))
+            return
+        except Exception:
+            logger.exception('Ошибка обработки запроса %s', self.path)
+            self.send_json(500, json.dumps({"error": "Внутренняя ошибка сервера"}, ensure_ascii=False))
+            return
+        self.send_json(200, body)
+
+    def send_json(self, status: int, body: str):
+        self.send_body(status, body, 'application/json; charset=utf-8')
+
+    def send_body(self, status: int, body: str, content_type: str):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(state: AppState, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                quiet: bool = False, metrics: Optional[MemorySink] = None) -> ThreadingHTTPServer:
+    """
+    Создает HTTP-сервер, обрабатывающий каждый запрос в отдельном потоке.
+
+    Аргументы:
+        state (AppState): Загруженные данные.
+        host (str): Адрес.
+        port (int): Порт; 0 - любой свободный.
+        quiet (bool): Не писать журнал запросов.
+        metrics (MemorySink): Подключенный приемник замеров для /metrics.
+
+    Возвращает:
+        ThreadingHTTPServer: Сервер (запускается через serve_forever()).
+    """
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.daemon_threads = True
+    server.state = state
+    server.quiet = quiet
+    server.metrics = metrics
+    return server
+
+
+def run_benchmark(base_url: str, paths: List[str], requests_count: int = 200, concurrency: int = 8,
+                  timeout: float = 30.0) -> dict:
+    """
+    Нагружает сервер запросами и измеряет задержки и пропускную способность.
+
+    Запросы к paths отправляются по кругу из concurrency потоков.
+
+    Аргументы:
+        base_url (str): Адрес сервера, например 'http://127.0.0.1:8000'.
+        paths (list): Пути запросов с параметрами.
+        requests_count (int): Общее число запросов.
+        concurrency (int): Число одновременных запросов.
+        timeout (float): Таймаут одного запроса, в секундах.
+
+    Возвращает:
+        dict: Число запросов и ошибок, запросов в секунду и задержки в миллисекундах
+            (mean, p50, p90, p99, max).
+    """
+    def fetch(index: int) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + paths[index % len(paths)], timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except (urllib.error.URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(fetch, range(requests_count)))
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(not ok for _, ok in results)
+    return {
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests_count / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 2),
+            "p50": round(float(np.percentile(latencies, 50)), 2),
+            "p90": round(float(np.percentile(latencies, 90)), 2),
+            "p99": round(float(np.percentile(latencies, 99)), 2),
+            "max": round(float(latencies.max()), 2)
+        } if len(latencies) else {}
+    }
+
+
+def _get_mtime(file_path: str) -> Optional[int]:
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
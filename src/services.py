@@ -1,31 +1,40 @@
+from __future__ import annotations
+
 import json
-import pandas as pd
 from datetime import datetime
+from typing import Optional
+from src.instrumentation import instrumented
+from src.cube import CUBE_COLUMNS
+from src.store import TransactionSource, as_store
+from src.utils import USER_SETTINGS_FILE, get_user_settings
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
 
-def profitable_cashback_categories(data: pd.DataFrame, year: int, month: int) -> str:
+@instrumented('services.profitable_cashback_categories')
+def profitable_cashback_categories(data: TransactionSource, year: int, month: int) -> str:
     """
     Анализирует наиболее выгодные категории для кешбэка.
 
     Аргументы:
-        data (pd.DataFrame): DataFrame с транзакциями.
+        data (TransactionStore | pd.DataFrame | str): Хранилище, DataFrame с транзакциями или путь к файлу.
         year (int): Год для анализа.
         month (int): Месяц для анализа.
 
     Возвращает:
         str: JSON-ответ с анализом кешбэка.
     """
-    # Преобразование столбца 'Дата операции' в формат datetime
-    data['Дата операции'] = pd.to_datetime(data['Дата операции'], errors='coerce')
-
     # Определение начальной и конечной даты для фильтрации
     start_date = pd.to_datetime(f'{year}-{month}-01')
     end_date = start_date + pd.DateOffset(months=1) - pd.Timedelta(days=1)
 
-    # Фильтрация транзакций по заданному месяцу и году
-    filtered_transactions = data[(data['Дата операции'] >= start_date) & (data['Дата операции'] <= end_date)]
+    # Суммы по категориям за месяц берутся из куба агрегатов хранилища
+    # (хранилище уже содержит даты в формате datetime, входной DataFrame не изменяется)
+    totals = as_store(data, start_date, end_date, CUBE_COLUMNS).cube.query(start_date, end_date)
 
-    # Группировка транзакций по категориям и подсчет суммы операций
-    cashback_analysis = filtered_transactions.groupby('Категория')['Сумма операции'].sum()
+    # Группировка по категориям и подсчет суммы операций
+    cashback_analysis = totals.groupby('Категория')['sum'].sum()
 
     # Применение кешбэка (предположим, что кешбэк составляет 1%)
     cashback_analysis = cashback_analysis * 0.01
@@ -34,4 +43,115 @@ def profitable_cashback_categories(data: pd.DataFrame, year: int, month: int) ->
     cashback_analysis = cashback_analysis.to_dict()
 
     # Возвращение результата в формате JSON
-    return json.dumps(cashback_analysis, ensure_ascii=False, indent=4)
\ No newline at end of file
+    return json.dumps(cashback_analysis, ensure_ascii=False, indent=4)
+
+# Правила кешбэка по умолчанию; переопределяются ключом 'cashback' в user_settings.json:
+#   default_rate  - ставка для всех категорий,
+#   category_rates - {категория: ставка},
+#   card_rates    - {карта: {категория или '*': ставка}}, имеет приоритет над category_rates,
+#   monthly_caps  - {категория: максимальный кешбэк за месяц}.
+DEFAULT_CASHBACK_RULES = {
+    'default_rate': 0.01,
+    'category_rates': {},
+    'card_rates': {},
+    'monthly_caps': {}
+}
+
+def get_cashback_rules(user_settings: Optional[dict] = None) -> dict:
+    """
+    Возвращает правила кешбэка: значения по умолчанию, дополненные настройками пользователя.
+
+    Аргументы:
+        user_settings (dict): Настройки пользователя (ключ 'cashback').
+
+    Возвращает:
+        dict: Правила кешбэка (см. DEFAULT_CASHBACK_RULES).
+    """
+    return {**DEFAULT_CASHBACK_RULES, **((user_settings or {}).get('cashback') or {})}
+
+@instrumented('services.cashback_by_month')
+def cashback_by_month(data: TransactionSource, start_month: str, end_month: str, rules: Optional[dict] = None,
+                      top_n: Optional[int] = None) -> pd.DataFrame:
+    """
+    Считает кешбэк по категориям за каждый месяц диапазона одной группировкой.
+
+    Расходы берутся из ячеек куба агрегатов (месяц x категория x карта), ставка
+    подбирается для каждой ячейки по карте и категории, затем кешбэк суммируется
+    по (месяц, категория) и ограничивается месячными лимитами категорий.
+    Операции без категории не учитываются.
+
+    Аргументы:
+        data (TransactionStore | pd.DataFrame | str | TransactionArchive): Хранилище, DataFrame
+            с транзакциями, путь к файлу или архив (читаются только операции диапазона).
+        start_month (str): Первый месяц в формате 'YYYY-MM'.
+        end_month (str): Последний месяц в формате 'YYYY-MM' (включительно).
+        rules (dict): Правила кешбэка (см. get_cashback_rules), по умолчанию 1% на все категории.
+        top_n (int): Оставить только top_n самых выгодных категорий каждого месяца.
+
+    Возвращает:
+        pd.DataFrame: Столбцы 'Месяц', 'Категория', 'spent', 'cashback', 'rank';
+            внутри месяца строки упорядочены по убыванию кешбэка, при равенстве - по категории.
+    """
+    rules = get_cashback_rules({'cashback': rules})
+    start_date = pd.Timestamp(start_month)
+    after_end = pd.Timestamp(end_month) + pd.DateOffset(months=1)
+    # С диска читаются только операции диапазона месяцев и столбцы куба
+    cells = as_store(data, start_date, after_end - pd.Timedelta(1, 'ns'), CUBE_COLUMNS).cube.cells
+    months = cells['Месяц']
+    left = int(months.searchsorted(start_date, side='left'))
+    right = int(months.searchsorted(after_end, side='left'))
+    cells = cells.iloc[left:right]
+    cells = cells[cells['Категория'].notna() & (cells['expense_count'] > 0)]
+
+    categories = cells['Категория'].astype(object)
+    rates = categories.map(rules['category_rates']).astype(float).fillna(rules['default_rate'])
+    for card, table in rules['card_rates'].items():
+        on_card = (cells['Номер карты'] == card).to_numpy()
+        card_rates = categories[on_card].map(table).astype(float).fillna(table.get('*', np.nan))
+        rates[on_card] = card_rates.fillna(rates[on_card])
+
+    spent = -cells['expense_sum'].to_numpy(dtype=float)
+    totals = pd.DataFrame({
+        'Месяц': cells['Месяц'].to_numpy(),
+        'Категория': categories.to_numpy(),
+        'spent': spent,
+        'cashback': spent * rates.to_numpy()
+    }).groupby(['Месяц', 'Категория'], sort=False).sum().reset_index()
+
+    caps = totals['Категория'].map(rules['monthly_caps']).astype(float)
+    totals['cashback'] = totals['cashback'].where(caps.isna() | (totals['cashback'] <= caps), caps)
+
+    # При равном кешбэке категории идут по алфавиту
+    totals = totals.sort_values(['Месяц', 'cashback', 'Категория'], ascending=[True, False, True], kind='mergesort',
+                                ignore_index=True)
+    totals['rank'] = totals.groupby('Месяц', sort=False).cumcount() + 1
+    if top_n is not None:
+        totals = totals[totals['rank'] <= top_n].reset_index(drop=True)
+    return totals
+
+@instrumented('services.profitable_cashback_by_month')
+def profitable_cashback_by_month(data: TransactionSource, start_month: str, end_month: str,
+                                 user_settings: Optional[dict] = None, top_n: int = 3) -> str:
+    """
+    Анализирует наиболее выгодные категории для кешбэка за каждый месяц диапазона.
+
+    Аргументы:
+        data (TransactionStore | pd.DataFrame | str): Хранилище, DataFrame с транзакциями или путь к файлу.
+        start_month (str): Первый месяц в формате 'YYYY-MM'.
+        end_month (str): Последний месяц в формате 'YYYY-MM' (включительно).
+        user_settings (dict): Настройки пользователя с правилами кешбэка (ключ 'cashback'),
+            по умолчанию из файла user_settings.json.
+        top_n (int): Число категорий на месяц.
+
+    Возвращает:
+        str: JSON-ответ: {"YYYY-MM": [{"category", "spent", "cashback"}, ...]}.
+    """
+    if user_settings is None:
+        user_settings = get_user_settings(USER_SETTINGS_FILE)
+    totals = cashback_by_month(data, start_month, end_month, get_cashback_rules(user_settings), top_n)
+    report = {}
+    for row in totals.itertuples(index=False):
+        report.setdefault(row[0].strftime('%Y-%m'), []).append(
+            {"category": row[1], "spent": round(row.spent, 2), "cashback": round(row.cashback, 2)}
+        )
+    return json.dumps(report, ensure_ascii=False, indent=4)
@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Union
+from src.dates import parse_dates
+from src.topn import AMOUNT_COLUMN, TOP_GROUPS, TOP_KEYS, TopHeaps, top_group_positions, top_positions, top_scores
+from src.utils import load_transactions
+from src.lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+if TYPE_CHECKING:
+    from src.archive import TransactionArchive
+
+DATE_COLUMN = 'Дата операции'
+
+
+class TransactionStore:
+    """
+    Долгоживущее хранилище транзакций.
+
+    Данные загружаются один раз, даты приводятся к datetime, строки сортируются
+    по 'Дата операции', а индекс хранилища - DatetimeIndex по этому столбцу.
+    Хранилище выдает представления (views) без копирования; изменять их нельзя,
+    функции из src.views, src.reports и src.services только читают их.
+    """
+
+    def __init__(self, transactions: pd.DataFrame):
+        """
+        Создает хранилище из DataFrame. Исходный DataFrame не изменяется.
+
+        Аргументы:
+            transactions (pd.DataFrame): DataFrame с транзакциями.
+        """
+        self._set_frame(_prepare_frame(transactions))
+        self._cube = None
+        self._top_heaps = TopHeaps()
+
+    def _set_frame(self, frame: pd.DataFrame) -> None:
+        self._frame = frame
+        # Строки с NaT стоят в начале и в диапазоны дат не попадают
+        self._first_valid = int(frame.index.isna().sum())
+
+    @classmethod
+    def from_file(cls, file_path: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                  columns: Optional[list] = None) -> 'TransactionStore':
+        """
+        Создает хранилище из файла operations.xlsx.
+
+        Аргументы:
+            file_path (str): Путь к файлу operations.xlsx.
+            start_date (datetime): Загрузить только операции начиная с этой даты.
+            end_date (datetime): Загрузить только операции до этой даты включительно.
+            columns (list): Загрузить только эти столбцы ('Дата операции' добавляется всегда).
+
+        Возвращает:
+            TransactionStore: Хранилище транзакций.
+        """
+        if columns is not None and DATE_COLUMN not in columns:
+            columns = [DATE_COLUMN] + list(columns)
+        return cls(load_transactions(file_path, columns=columns, start_date=start_date, end_date=end_date))
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Все транзакции, отсортированные по дате (только для чтения).
+        """
+        return self._frame
+
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        """
+        Отсортированные даты операций.
+        """
+        return self._frame.index
+
+    @property
+    def cube(self):
+        """
+        Куб агрегатов месяц x категория x карта (src.cube.AggregateCube), строится при первом обращении.
+        """
+        if self._cube is None:
+            from src.cube import AggregateCube
+            self._cube = AggregateCube(self)
+        return self._cube
+
+    def append(self, transactions: pd.DataFrame) -> None:
+        """
+        Добавляет новые операции, сохраняя сортировку по дате, и обновляет куб агрегатов
+        и кучи лучших операций.
+
+        Аргументы:
+            transactions (pd.DataFrame): Новые операции.
+        """
+        new_rows = _prepare_frame(transactions)
+        if len(new_rows) == 0:
+            return
+        offset = len(self._frame)
+        frame = pd.concat([self._frame, new_rows])
+        first_new = new_rows.index[0]
+        if len(self._frame) and (pd.isna(first_new) or first_new < self._frame.index[-1]):
+            frame = frame.sort_values(DATE_COLUMN, kind='mergesort', na_position='first')
+            frame.index = pd.DatetimeIndex(frame[DATE_COLUMN].values)
+            # Позиции старых операций сдвинулись: кучи лучших операций строятся заново
+            self._top_heaps.clear()
+        else:
+            self._top_heaps.push(new_rows.index.values.astype('datetime64[M]'),
+                                 new_rows[AMOUNT_COLUMN].to_numpy(dtype=float), offset)
+        self._set_frame(frame)
+        if self._cube is not None:
+            self._cube.add(new_rows)
+
+    @property
+    def first_date(self) -> Optional[pd.Timestamp]:
+        """
+        Дата самой ранней операции или None, если операций нет.
+        """
+        if self._first_valid >= len(self._frame):
+            return None
+        return self._frame.index[self._first_valid]
+
+    def between(self, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Возвращает операции с start_date по end_date включительно.
+
+        Границы ищутся бинарным поиском (searchsorted) по отсортированным датам,
+        результат - срез iloc без копирования и без булевых масок.
+
+        Аргументы:
+            start_date (datetime): Начало периода (включительно).
+            end_date (datetime): Конец периода (включительно).
+
+        Возвращает:
+            pd.DataFrame: Срез операций (только для чтения).
+        """
+        left, right = self.locate(start_date, end_date)
+        return self._frame.iloc[left:right]
+
+    def locate(self, start_date: datetime, end_date: datetime) -> tuple:
+        """
+        Возвращает позиции [left, right) операций с start_date по end_date включительно.
+
+        Аргументы:
+            start_date (datetime): Начало периода (включительно).
+            end_date (datetime): Конец периода (включительно).
+
+        Возвращает:
+            tuple: Позиции начала и конца среза.
+        """
+        left = max(int(self.dates.searchsorted(pd.Timestamp(start_date), side='left')), self._first_valid)
+        right = max(int(self.dates.searchsorted(pd.Timestamp(end_date), side='right')), left)
+        return left, right
+
+    def top(self, n: int = 5, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+            key: str = 'amount', by: Optional[str] = None) -> pd.DataFrame:
+        """
+        Возвращает n лучших операций за период (по умолчанию за все время).
+
+        Выбор идет частичной сортировкой массива сумм, копируются только выбранные
+        строки. Если период - целый месяц (с его начала до последней операции месяца
+        или позже), ответ берется из поддерживаемой кучи этого месяца.
+
+        Аргументы:
+            n (int): Число операций (в каждой группе, если задан by).
+            start_date (datetime): Начало периода (включительно).
+            end_date (datetime): Конец периода (включительно).
+            key (str): Ключ сортировки: 'amount', 'abs', 'expense' или 'income' (см. src.topn.top_scores).
+            by (str): Группировка: 'card' или 'category'.
+
+        Возвращает:
+            pd.DataFrame: Выбранные операции (копия), по убыванию оценки.
+        """
+        if key not in TOP_KEYS:
+            raise ValueError(f'Неизвестный ключ сортировки: {key}')
+        left, right = self.locate(start_date if start_date is not None else pd.Timestamp.min,
+                                  end_date if end_date is not None else pd.Timestamp.max)
+        amounts = self._frame[AMOUNT_COLUMN].to_numpy(dtype=float)[left:right]
+
+        if by is not None:
+            groups = self._frame[TOP_GROUPS[by]].iloc[left:right]
+            positions = left + top_group_positions(top_scores(amounts, key), groups, n)
+            return self._frame.iloc[positions].copy()
+
+        if right > left:
+            month = self._frame.index[left].to_period('M').to_timestamp()
+            if self.locate(month, month + pd.DateOffset(months=1) - pd.Timedelta(1, 'ns')) == (left, right):
+                positions = self._top_heaps.get(month, key, top_scores(amounts, key), left, n)
+                if positions is not None:
+                    return self._frame.iloc[positions].copy()
+        positions = left + top_positions(top_scores(amounts, key), n)
+        return self._frame.iloc[positions].copy()
+
+    def period(self, date: datetime, period: str = 'M') -> pd.DataFrame:
+        """
+        Возвращает операции за период ('W', 'M', 'Y', 'ALL'), заканчивающийся датой date.
+
+        Аргументы:
+            date (datetime): Конец периода (включительно).
+            period (str): Период ('W', 'M', 'Y', 'ALL'); неизвестный период считается месяцем.
+
+        Возвращает:
+            pd.DataFrame: Срез операций (только для чтения).
+        """
+        return self.between(*self.period_bounds(date, period))
+
+    def period_bounds(self, date: datetime, period: str = 'M') -> tuple:
+        """
+        Возвращает границы периода ('W', 'M', 'Y', 'ALL'), заканчивающегося датой date.
+
+        Аргументы:
+            date (datetime): Конец периода (включительно).
+            period (str): Период ('W', 'M', 'Y', 'ALL'); неизвестный период считается месяцем.
+
+        Возвращает:
+            tuple: Начало и конец периода.
+        """
+        if period == 'ALL':
+            start_date = self.first_date
+            if start_date is None:
+                # Пустое хранилище: пустой период (конец раньше начала; через Timestamp, так как
+                # datetime - 1 нс округляется до микросекунд и дает саму дату)
+                return date, pd.Timestamp(date) - pd.Timedelta(1, 'ns')
+            return start_date, date
+        return get_period_start(date, period), date
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+
+def get_period_start(date: datetime, period: str = 'M') -> datetime:
+    """
+    Возвращает начало периода, заканчивающегося датой date.
+
+    Аргументы:
+        date (datetime): Конец периода.
+        period (str): Период ('W' - с понедельника, 'M' - с начала месяца, 'Y' - с начала года);
+            для 'ALL' и неизвестных значений возвращается начало месяца.
+
+    Возвращает:
+        datetime: Начало периода.
+    """
+    if period == 'W':
+        return date - pd.Timedelta(days=date.weekday())
+    if period == 'Y':
+        return date.replace(month=1, day=1, hour=0, minute=0, second=0)
+    return date.replace(day=1, hour=0, minute=0, second=0)
+
+
+def slice_by_date(transactions: pd.DataFrame, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """
+    Возвращает операции DataFrame с start_date по end_date включительно.
+
+    Если столбец 'Дата операции' отсортирован, границы ищутся бинарным поиском
+    и возвращается срез без копирования; иначе используется булева маска.
+
+    Аргументы:
+        transactions (pd.DataFrame): DataFrame с транзакциями.
+        start_date (datetime): Начало периода (включительно).
+        end_date (datetime): Конец периода (включительно).
+
+    Возвращает:
+        pd.DataFrame: Операции за период.
+    """
+    dates = transactions[DATE_COLUMN]
+    if dates.is_monotonic_increasing:
+        left = int(dates.searchsorted(pd.Timestamp(start_date), side='left'))
+        right = int(dates.searchsorted(pd.Timestamp(end_date), side='right'))
+        return transactions.iloc[left:max(left, right)]
+    return transactions[(dates >= start_date) & (dates <= end_date)]
+
+
+def _prepare_frame(transactions: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит даты к datetime, сортирует операции по дате и ставит DatetimeIndex.
+
+    Аргументы:
+        transactions (pd.DataFrame): DataFrame с транзакциями (не изменяется).
+
+    Возвращает:
+        pd.DataFrame: Новый отсортированный DataFrame.
+    """
+    dates = transactions[DATE_COLUMN]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = parse_dates(dates, errors='coerce')
+
+    frame = transactions.assign(**{DATE_COLUMN: dates})
+    if not dates.is_monotonic_increasing:
+        # NaT ставятся в начало, чтобы порядок совпадал с порядком значений datetime64
+        frame = frame.sort_values(DATE_COLUMN, kind='mergesort', na_position='first')
+    frame.index = pd.DatetimeIndex(frame[DATE_COLUMN].values)
+    return frame
+
+
+TransactionSource = Union[TransactionStore, 'pd.DataFrame', str, 'TransactionArchive']
+
+
+def as_store(transactions: TransactionSource, start_date: Optional[datetime] = None,
+             end_date: Optional[datetime] = None, columns: Optional[list] = None) -> TransactionStore:
+    """
+    Приводит источник транзакций к TransactionStore.
+
+    Окно дат и столбцы - то, что нужно вызывающей функции. Они учитываются только
+    при загрузке с диска: из файла (через столбцовый кеш) читаются лишь эти столбцы
+    и строки окна, из архива (src.archive.TransactionArchive) - эти столбцы из
+    партиций окна. Хранилище и DataFrame возвращаются целиком.
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Хранилище,
+            DataFrame, путь к файлу или архив.
+        start_date (datetime): Начало нужного окна; None - без ограничения.
+        end_date (datetime): Конец нужного окна; None - без ограничения.
+        columns (list): Нужные столбцы; None - все.
+
+    Возвращает:
+        TransactionStore: Хранилище транзакций.
+    """
+    if isinstance(transactions, TransactionStore):
+        return transactions
+    from src.archive import TransactionArchive
+    if isinstance(transactions, TransactionArchive):
+        return transactions.window(start_date, end_date, columns)
+    if isinstance(transactions, str):
+        return TransactionStore.from_file(transactions, start_date, end_date, columns)
+    return TransactionStore(transactions)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import heapq
+from typing import Optional
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+AMOUNT_COLUMN = 'Сумма операции'
+
+# Ключ сортировки -> как из суммы операции получить оценку (NaN - строка не участвует)
+TOP_KEYS = ('amount', 'abs', 'expense', 'income')
+# Группировка -> столбец
+TOP_GROUPS = {'card': 'Номер карты', 'category': 'Категория'}
+# Сколько лучших операций месяца хранится в куче для каждого ключа
+TOP_HEAP_CAPACITY = 20
+
+
+def top_scores(amounts: np.ndarray, key: str = 'amount') -> np.ndarray:
+    """
+    Переводит суммы операций в оценки для выбора лучших операций.
+
+    Аргументы:
+        amounts (np.ndarray): Суммы операций.
+        key (str): 'amount' - наибольшие суммы, 'abs' - наибольшие по модулю,
+            'expense' - крупнейшие расходы, 'income' - крупнейшие доходы.
+
+    Возвращает:
+        np.ndarray: Оценки; NaN у операций, которые не подходят под ключ.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if key == 'amount':
+        return amounts
+    if key == 'abs':
+        return np.abs(amounts)
+    if key == 'expense':
+        return np.where(amounts < 0, -amounts, np.nan)
+    if key == 'income':
+        return np.where(amounts > 0, amounts, np.nan)
+    raise ValueError(f'Неизвестный ключ сортировки: {key}')
+
+
+def top_positions(scores: np.ndarray, n: int) -> np.ndarray:
+    """
+    Возвращает позиции n наибольших оценок частичной сортировкой (np.argpartition).
+
+    Порядок совпадает с DataFrame.nlargest(n, keep='first'): по убыванию оценки,
+    при равенстве - по возрастанию позиции; NaN пропускаются.
+
+    Аргументы:
+        scores (np.ndarray): Оценки.
+        n (int): Число позиций.
+
+    Возвращает:
+        np.ndarray: Позиции (не больше n).
+    """
+    valid = np.flatnonzero(~np.isnan(scores))
+    if n <= 0:
+        return valid[:0]
+    if len(valid) > n:
+        values = scores[valid]
+        threshold = values[np.argpartition(-values, n - 1)[n - 1]]
+        above = valid[values > threshold]
+        # Из равных пороговому значению берутся самые ранние, как в nlargest(keep='first')
+        valid = np.concatenate([above, valid[values == threshold][:n - len(above)]])
+    return valid[np.lexsort((valid, -scores[valid]))]
+
+
+def top_group_positions(scores: np.ndarray, groups: pd.Series, n: int) -> np.ndarray:
+    """
+    Возвращает позиции n наибольших оценок в каждой группе.
+
+    Группы идут в порядке первого появления (операции без значения - отдельная группа),
+    внутри группы - по убыванию оценки.
+
+    Аргументы:
+        scores (np.ndarray): Оценки.
+        groups (pd.Series): Значение группы для каждой операции.
+        n (int): Число позиций в группе.
+
+    Возвращает:
+        np.ndarray: Позиции.
+    """
+    codes, _ = pd.factorize(groups, use_na_sentinel=False)
+    valid = np.flatnonzero(~np.isnan(scores))
+    order = valid[np.lexsort((valid, -scores[valid], codes[valid]))]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else order
+    ranks = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return order[ranks < n]
+
+
+class TopHeaps:
+    """
+    Кучи лучших операций по месяцам для TransactionStore.
+
+    Для пары (месяц, ключ) куча строится при первом запросе и хранит до
+    TOP_HEAP_CAPACITY лучших операций месяца как (оценка, -позиция).
+    Новые операции, дописанные в конец хранилища, проталкиваются через
+    кучи их месяцев, поэтому запрос лучших операций за весь месяц после
+    добавления не пересматривает строки месяца.
+    """
+
+    def __init__(self, capacity: int = TOP_HEAP_CAPACITY):
+        self.capacity = capacity
+        self._heaps = {}
+
+    def get(self, month: pd.Timestamp, key: str, scores: np.ndarray, offset: int, n: int) -> Optional[np.ndarray]:
+        """
+        Возвращает позиции n лучших операций месяца, при необходимости строя кучу.
+
+        Аргументы:
+            month (pd.Timestamp): Начало месяца.
+            key (str): Ключ сортировки.
+            scores (np.ndarray): Оценки операций месяца (используются при построении кучи).
+            offset (int): Позиция первой операции месяца в хранилище.
+            n (int): Число позиций.
+
+        Возвращает:
+            np.ndarray: Позиции в хранилище или None, если n больше емкости кучи.
+        """
+        if n > self.capacity:
+            return None
+        heap = self._heaps.get((month, key))
+        if heap is None:
+            positions = top_positions(scores, self.capacity)
+            heap = [(float(scores[position]), -int(position + offset)) for position in positions]
+            heapq.heapify(heap)
+            self._heaps[(month, key)] = heap
+        best = heapq.nlargest(n, heap)
+        return np.array([-position for _, position in best], dtype=np.int64)
+
+    def push(self, months: np.ndarray, amounts: np.ndarray, offset: int):
+        """
+        Добавляет в кучи операции, дописанные в конец хранилища.
+
+        Аргументы:
+            months (np.ndarray): Месяц каждой новой операции (datetime64[M]).
+            amounts (np.ndarray): Суммы новых операций.
+            offset (int): Позиция первой новой операции в хранилище.
+        """
+        for (month, key), heap in self._heaps.items():
+            selected = np.flatnonzero(months == month.to_datetime64().astype('datetime64[M]'))
+            if len(selected) == 0:
+                continue
+            scores = top_scores(amounts[selected], key)
+            for position, score in zip(selected, scores):
+                if np.isnan(score):
+                    continue
+                entry = (float(score), -int(position + offset))
+                if len(heap) < self.capacity:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+    def clear(self):
+        self._heaps.clear()
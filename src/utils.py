@@ -1,13 +1,22 @@
+from __future__ import annotations
+
+import copy
 import json
-import pandas as pd
+import threading
 from datetime import datetime
-import requests
+from typing import Optional
 import os
-from dotenv import load_dotenv
+from src.cache import load_cached_frame, rebuild_cache, clear_cache, select_frame
+from src.instrumentation import instrumented
+from src.schema import apply_schema, SCHEMA_VERSION
+from src.lazy import lazy_import
+
+pd = lazy_import('pandas')
 
-# Загрузка переменных окружения
-load_dotenv()
+# Файл настроек пользователя по умолчанию (валюты, акции, правила кешбэка)
+USER_SETTINGS_FILE = 'user_settings.json'
 
+@instrumented('utils.load_user_settings')
 def load_user_settings(file_path: str) -> dict:
     """
     Загружает настройки пользователя из JSON файла.
@@ -21,10 +30,92 @@ def load_user_settings(file_path: str) -> dict:
     with open(file_path, 'r', encoding='utf-8') as file:
         return json.load(file)
 
-def load_transactions(file_path: str) -> pd.DataFrame:
+class SettingsFile:
+    """
+    Настройки пользователя из JSON файла, которые перечитываются только при изменении файла.
+
+    При каждом обращении проверяются время изменения и размер файла (os.stat);
+    пока они те же, возвращается копия уже разобранных настроек.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._version = None
+        self._settings = None
+
+    def get(self) -> dict:
+        """
+        Возвращает настройки, перечитывая файл, если он изменился.
+
+        Возвращает:
+            dict: Копия настроек (ее можно изменять).
+        """
+        stat = os.stat(self.file_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if version != self._version:
+                self._settings = load_user_settings(self.file_path)
+                self._version = version
+            return copy.deepcopy(self._settings)
+
+_settings_files = {}
+_settings_files_lock = threading.Lock()
+
+def get_user_settings(file_path: str) -> dict:
+    """
+    Возвращает настройки пользователя из общего для процесса кеша (см. SettingsFile).
+
+    Аргументы:
+        file_path (str): Путь к файлу user_settings.json.
+
+    Возвращает:
+        dict: Словарь с настройками пользователя.
+    """
+    with _settings_files_lock:
+        settings_file = _settings_files.get(file_path)
+        if settings_file is None:
+            settings_file = _settings_files[file_path] = SettingsFile(file_path)
+    return settings_file.get()
+
+@instrumented('utils.load_transactions')
+def load_transactions(file_path: str, use_cache: bool = True, columns: Optional[list] = None,
+                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
     """
     Загружает данные о транзакциях из Excel файла и преобразует даты в формат datetime.
 
+    Результат разбора сохраняется в столбцовый кеш рядом с файлом (см. src.cache),
+    поэтому повторные загрузки не перечитывают Excel, пока файл не изменится.
+    Типы столбцов задаются схемой src.schema.TRANSACTION_SCHEMA.
+
+    Если заданы столбцы или даты, из кеша читаются и декодируются только эти
+    столбцы и строки (операции без даты при этом отбрасываются). Так загружают
+    данные страницы и отчеты, объявляющие нужные им столбцы (например,
+    src.views.HOME_COLUMNS).
+
+    Аргументы:
+        file_path (str): Путь к файлу operations.xlsx.
+        use_cache (bool): Использовать столбцовый кеш.
+        columns (list): Загрузить только эти столбцы.
+        start_date (datetime): Загрузить только операции начиная с этой даты.
+        end_date (datetime): Загрузить только операции до этой даты включительно.
+
+    Возвращает:
+        pd.DataFrame: DataFrame с транзакциями.
+    """
+    between = None
+    if start_date is not None or end_date is not None:
+        between = ('Дата операции', start_date, end_date)
+    if use_cache and os.path.isfile(file_path):
+        return load_cached_frame(file_path, read_transactions_file, reader_version=SCHEMA_VERSION,
+                                 columns=columns, between=between)
+    return select_frame(read_transactions_file(file_path), columns, between)
+
+def read_transactions_file(file_path: str) -> pd.DataFrame:
+    """
+    Читает Excel файл с транзакциями без кеша, преобразует даты в формат datetime
+    и применяет схему типов.
+
     Аргументы:
         file_path (str): Путь к файлу operations.xlsx.
 
@@ -32,47 +123,58 @@ def load_transactions(file_path: str) -> pd.DataFrame:
         pd.DataFrame: DataFrame с транзакциями.
     """
     transactions = pd.read_excel(file_path)
-    transactions['Дата операции'] = pd.to_datetime(transactions['Дата операции'], dayfirst=True)
-    transactions['Дата платежа'] = pd.to_datetime(transactions['Дата платежа'], dayfirst=True)
-    return transactions
+    # Даты разбираются схемой (src.dates.DateParser): формат определяется один раз для столбца
+    return apply_schema(transactions)
+
+def rebuild_transactions_cache(file_path: str) -> None:
+    """
+    Принудительно перестраивает столбцовый кеш для файла с транзакциями.
+
+    Аргументы:
+        file_path (str): Путь к файлу operations.xlsx.
+    """
+    rebuild_cache(file_path, read_transactions_file, reader_version=SCHEMA_VERSION)
 
+def clear_transactions_cache(file_path: str) -> None:
+    """
+    Удаляет столбцовый кеш для файла с транзакциями.
+
+    Аргументы:
+        file_path (str): Путь к файлу operations.xlsx.
+    """
+    clear_cache(file_path)
+
+@instrumented('utils.get_currency_rates')
 def get_currency_rates(currencies: list) -> dict:
     """
     Получает курсы валют для указанных валют из API.
 
+    Запросы выполняются параллельно общим клиентом рыночных данных
+    (src.market_data) с кешированием и таймаутами.
+
     Аргументы:
         currencies (list): Список валют.
 
     Возвращает:
         dict: Курсы валют.
     """
-    rates = {}
-    for currency in currencies:
-        response = requests.get(f'https://api.exchangerate-api.com/v4/latest/{currency}')
-        if response.status_code == 200:
-            data = response.json()
-            rates[currency] = data['rates']['RUB']
-    return rates
+    # Клиент (и requests) загружается при первом запросе рыночных данных
+    from src.market_data import get_market_data_client
+    return get_market_data_client().get_currency_rates(currencies)
 
+@instrumented('utils.get_stock_prices')
 def get_stock_prices(stocks: list) -> dict:
     """
     Получает цены на акции для указанных акций из API.
 
+    Запросы выполняются параллельно общим клиентом рыночных данных
+    (src.market_data) с кешированием и таймаутами.
+
     Аргументы:
         stocks (list): Список акций.
 
     Возвращает:
         dict: Цены на акции.
     """
-    api_key = os.getenv('API_KEY')
-    base_url = os.getenv('STOCK_API_URL')
-    stock_prices = {}
-    for stock in stocks:
-        response = requests.get(f'{base_url}/time_series?symbol={stock}&interval=1min&apikey={api_key}')
-        if response.status_code == 200:
-            data = response.json()
-            time_series = data.get('values', [])
-            if time_series:
-                latest_data = time_series[0]
-                stock_prices[stock] = float(latest_data['open'])
-    return stock_prices
\ No newline at end of file
+    from src.market_data import get_market_data_client
+    return get_market_data_client().get_stock_prices(stocks)
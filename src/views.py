@@ -1,24 +1,72 @@
-import json
-import pandas as pd
-from datetime import datetime
-from src.utils import load_transactions, get_currency_rates, get_stock_prices, load_user_settings
+from __future__ import annotations
 
-def home_page(date_str: str) -> str:
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from src.utils import USER_SETTINGS_FILE, load_transactions, get_currency_rates, get_stock_prices, get_user_settings
+from src.instrumentation import instrumented, span
+from src.cube import CUBE_COLUMNS
+from src.dates import parse_dates
+from src.encoding import encode_json
+from src.store import TransactionSource, TransactionStore, as_store, get_period_start
+from src.topn import TOP_GROUPS, top_group_positions, top_positions, top_scores
+from src.lazy import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+TRANSACTIONS_FILE = 'operations.xlsx'
+# Потоки для запросов курсов валют, идущих параллельно с запросом цен акций
+MARKET_WORKERS = 4
+
+# Число основных категорий расходов и категории, которые выводятся отдельно
+TOP_CATEGORIES = 7
+TRANSFER_CATEGORIES = ('Наличные', 'Переводы')
+
+# Столбцы главной страницы (страница событий читает только куб - src.cube.CUBE_COLUMNS);
+# при загрузке с диска остальные столбцы не декодируются
+HOME_COLUMNS = ['Дата операции', 'Номер карты', 'Сумма операции', 'Категория', 'Описание']
+
+@instrumented('views.home_page')
+def home_page(date_str: str, transactions: Optional[TransactionSource] = None,
+              user_settings: Optional[dict] = None) -> str:
     """
     Генерирует JSON-ответ для главной страницы.
 
     Аргументы:
         date_str (str): Дата и время в формате 'YYYY-MM-DD HH:MM:SS'.
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Источник транзакций,
+            по умолчанию файл operations.xlsx.
+        user_settings (dict): Настройки пользователя, по умолчанию из файла user_settings.json.
 
     Возвращает:
         str: JSON-ответ.
     """
+    sections = get_home_sections(date_str, transactions)
+    return render_page({**sections, **get_market_sections(user_settings)})
+
+@instrumented('views.get_home_sections')
+def get_home_sections(date_str: str, transactions: Optional[TransactionSource] = None) -> dict:
+    """
+    Формирует разделы главной страницы, зависящие только от транзакций.
+
+    Аргументы:
+        date_str (str): Дата и время в формате 'YYYY-MM-DD HH:MM:SS'.
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Источник транзакций,
+            по умолчанию файл operations.xlsx.
+
+    Возвращает:
+        dict: Разделы 'greeting', 'cards' и 'top_transactions'.
+    """
     date = datetime.strptime(date_str, '%Y-%m-%d %H:%M:%S')
-    transactions = load_transactions('operations.xlsx')
+    store = _get_store(transactions, get_period_start(date, 'M'), date, HOME_COLUMNS)
 
     # Фильтруем транзакции за текущий месяц
-    start_date = date.replace(day=1, hour=0, minute=0, second=0)
-    filtered_transactions = transactions[(transactions['Дата операции'] >= start_date) & (transactions['Дата операции'] <= date)]
+    with span('views.filter', len(store)) as info:
+        filtered_transactions = store.between(get_period_start(date, 'M'), date)
+        info['rows_out'] = len(filtered_transactions)
 
     # Приветствие
     greeting = get_greeting(date)
@@ -26,27 +74,92 @@ def home_page(date_str: str) -> str:
     # Данные по картам
     cards_data = get_cards_data(filtered_transactions)
 
-    # Топ-5 транзакций
-    top_transactions = get_top_transactions(filtered_transactions)
+    # Топ-5 транзакций (для целого месяца - из кучи хранилища)
+    with span('views.top_transactions', len(filtered_transactions)):
+        top_transactions = format_transactions(store.top(5, get_period_start(date, 'M'), date))
 
-    # Курсы валют
-    user_settings = load_user_settings('user_settings.json')
-    user_currencies = user_settings.get('user_currencies', [])
-    currency_rates = get_currency_rates(user_currencies)
+    return {
+        "greeting": greeting,
+        "cards": cards_data,
+        "top_transactions": top_transactions
+    }
 
-    # Цены на акции
+@instrumented('views.get_market_sections')
+def get_market_sections(user_settings: Optional[dict] = None) -> dict:
+    """
+    Формирует разделы с рыночными данными: курсы валют и цены акций из настроек пользователя.
+
+    Аргументы:
+        user_settings (dict): Настройки пользователя, по умолчанию из файла user_settings.json.
+
+    Возвращает:
+        dict: Разделы 'currency_rates' и 'stock_prices'.
+    """
+    if user_settings is None:
+        user_settings = get_user_settings(USER_SETTINGS_FILE)
+    user_currencies = user_settings.get('user_currencies', [])
     user_stocks = user_settings.get('user_stocks', [])
+
+    # Курсы валют запрашиваются в фоновом потоке одновременно с ценами акций
+    rates_future = _get_market_executor().submit(get_currency_rates, user_currencies)
     stock_prices = get_stock_prices(user_stocks)
+    currency_rates = rates_future.result()
 
-    response = {
-        "greeting": greeting,
-        "cards": cards_data,
-        "top_transactions": top_transactions,
+    return {
         "currency_rates": currency_rates,
         "stock_prices": stock_prices
     }
 
-    return json.dumps(response, ensure_ascii=False, indent=4, default=str)
+_market_executor = None
+_market_executor_lock = threading.Lock()
+
+def _get_market_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает общий пул потоков для запросов рыночных данных (создается при первом обращении).
+
+    Возвращает:
+        ThreadPoolExecutor: Пул потоков.
+    """
+    global _market_executor
+    with _market_executor_lock:
+        if _market_executor is None:
+            _market_executor = ThreadPoolExecutor(max_workers=MARKET_WORKERS, thread_name_prefix='market-data')
+        return _market_executor
+
+@instrumented('views.render_page')
+def render_page(sections: dict, compact: bool = False) -> str:
+    """
+    Сериализует разделы страницы в JSON-ответ (см. src.encoding).
+
+    Аргументы:
+        sections (dict): Разделы страницы.
+        compact (bool): Без отступов и лишних пробелов.
+
+    Возвращает:
+        str: JSON-ответ.
+    """
+    return encode_json(sections, compact)
+
+def _get_store(transactions: Optional[TransactionSource], start_date: Optional[datetime] = None,
+               end_date: Optional[datetime] = None, columns: Optional[list] = None) -> TransactionStore:
+    """
+    Возвращает хранилище транзакций; без источника загружает файл operations.xlsx.
+
+    Окно дат и столбцы - то, что нужно странице: при загрузке файла или архива
+    читаются только они (см. src.store.as_store).
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Источник транзакций.
+        start_date (datetime): Начало окна, которое нужно странице.
+        end_date (datetime): Конец окна, которое нужно странице.
+        columns (list): Столбцы, которые нужны странице.
+
+    Возвращает:
+        TransactionStore: Хранилище транзакций.
+    """
+    if transactions is None:
+        transactions = load_transactions(TRANSACTIONS_FILE, columns=columns, start_date=start_date, end_date=end_date)
+    return as_store(transactions, start_date, end_date, columns)
 
 def get_greeting(date: datetime) -> str:
     """
@@ -68,6 +181,7 @@ def get_greeting(date: datetime) -> str:
     else:
         return "Доброй ночи"
 
+@instrumented('views.get_cards_data')
 def get_cards_data(transactions: pd.DataFrame) -> list:
     """
     Генерирует данные по каждой карте.
@@ -78,85 +192,185 @@ def get_cards_data(transactions: pd.DataFrame) -> list:
     Возвращает:
         list: Список данных по картам.
     """
-    cards = transactions['Номер карты'].unique()
-    cards_data = []
-    for card in cards:
-        card_transactions = transactions[transactions['Номер карты'] == card]
-        total_spent = card_transactions['Сумма операции'].sum()
-        cashback = total_spent * 0.01
-        cards_data.append({
-            "last_digits": card,
-            "total_spent": float(total_spent),
-            "cashback": float(cashback)
-        })
-    return cards_data
+    summary = get_cards_summary(transactions)
+    return [
+        {
+            "last_digits": row.card,
+            "total_spent": float(row.total_spent),
+            "cashback": float(row.cashback)
+        }
+        for row in summary.itertuples(index=False)
+    ]
+
+def get_cards_summary(transactions: TransactionSource, windows: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Считает сводку по картам за одно или несколько окон дат одной группировкой.
+
+    Для каждой пары (окно, карта) считаются сумма операций, кешбэк (1%),
+    число операций и самый затратный получатель ('Описание' с наибольшей суммой
+    расходов). Операции без карты попадают в строку с картой NaN.
 
-def get_top_transactions(transactions: pd.DataFrame) -> list:
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame | str): Источник транзакций.
+        windows (dict): Окна: название -> (начало, конец) включительно, например
+            результат get_card_windows; если не указаны, берутся все операции (окно 'all').
+
+    Возвращает:
+        pd.DataFrame: Столбцы window, card, total_spent, cashback, count, top_merchant.
     """
-    Получает топ-5 транзакций по сумме.
+    if windows is None:
+        frame = transactions.frame if isinstance(transactions, TransactionStore) else transactions
+        positions = np.arange(len(frame))
+        labels = np.full(len(frame), 'all', dtype=object)
+    else:
+        store = as_store(transactions)
+        frame = store.frame
+        bounds = [(name, *store.locate(start_date, end_date)) for name, (start_date, end_date) in windows.items()]
+        positions = np.concatenate([np.arange(left, right) for _, left, right in bounds] + [np.arange(0)])
+        labels = np.repeat(np.array([name for name, _, _ in bounds], dtype=object),
+                           [right - left for _, left, right in bounds])
+
+    amounts = frame['Сумма операции'].to_numpy(dtype=float)[positions]
+    rows = pd.DataFrame({
+        'window': labels,
+        'card': frame['Номер карты'].to_numpy(dtype=object)[positions],
+        'merchant': (frame['Описание'].to_numpy(dtype=object)[positions] if 'Описание' in frame
+                     else np.full(len(positions), None, dtype=object)),
+        'amount': amounts,
+        'expense': np.minimum(amounts, 0.0)
+    })
+
+    # Единственный проход по строкам: группировка (окно, карта, получатель);
+    # дальше агрегируются только группы
+    merchants = rows.groupby(['window', 'card', 'merchant'], sort=False, dropna=False).agg(
+        total_spent=('amount', 'sum'), count=('amount', 'size'), expense=('expense', 'sum')
+    ).reset_index()
+    cards = merchants.groupby(['window', 'card'], sort=False, dropna=False)
+    summary = cards.agg(total_spent=('total_spent', 'sum'), count=('count', 'sum')).reset_index()
+
+    # Самый затратный получатель: для каждой группы карты - получатель с минимальной суммой расходов
+    group_ids = cards.ngroup().to_numpy()
+    spends = (merchants['expense'] < 0).to_numpy() & merchants['merchant'].notna().to_numpy()
+    ids, expense = group_ids[spends], merchants['expense'].to_numpy()[spends]
+    order = np.lexsort((expense, ids))
+    first = np.r_[True, ids[order][1:] != ids[order][:-1]] if len(order) else np.zeros(0, dtype=bool)
+    top_merchant = np.full(len(summary), None, dtype=object)
+    top_merchant[ids[order][first]] = merchants['merchant'].to_numpy()[spends][order][first]
+
+    summary['cashback'] = summary['total_spent'] * 0.01
+    summary['top_merchant'] = top_merchant
+    return summary[['window', 'card', 'total_spent', 'cashback', 'count', 'top_merchant']]
+
+def get_card_windows(date: datetime) -> dict:
+    """
+    Возвращает стандартные окна сводки по картам: текущий месяц, прошлый месяц и год до даты.
 
     Аргументы:
-        transactions (pd.DataFrame): DataFrame с транзакциями.
+        date (datetime): Текущая дата и время.
+
+    Возвращает:
+        dict: Окна: название -> (начало, конец).
+    """
+    month_start = get_period_start(date, 'M')
+    previous_month_start = month_start - pd.DateOffset(months=1)
+    return {
+        "current_month": (month_start, date),
+        # Через Timestamp: datetime - 1 нс округляется до микросекунд и дает саму полночь
+        "previous_month": (previous_month_start, pd.Timestamp(month_start) - pd.Timedelta(1, 'ns')),
+        "year_to_date": (get_period_start(date, 'Y'), date)
+    }
+
+@instrumented('views.get_top_transactions')
+def get_top_transactions(transactions: TransactionSource, n: int = 5, key: str = 'amount',
+                         by: Optional[str] = None) -> list:
+    """
+    Получает топ-n транзакций.
+
+    Аргументы:
+        transactions (TransactionStore | pd.DataFrame): Хранилище или DataFrame с транзакциями.
+        n (int): Число транзакций (в каждой группе, если задан by).
+        key (str): Ключ сортировки: 'amount' - по сумме, 'abs' - по модулю суммы,
+            'expense' - расходы, 'income' - доходы.
+        by (str): Группировка: 'card' - по картам, 'category' - по категориям.
 
     Возвращает:
         list: Список топ-транзакций.
     """
-    top_transactions = transactions.nlargest(5, 'Сумма операции')
-    top_transactions['Дата операции'] = top_transactions['Дата операции'].dt.strftime('%Y-%m-%d %H:%M:%S')
-    return top_transactions[['Дата операции', 'Сумма операции', 'Категория', 'Описание']].to_dict(orient='records')
+    if isinstance(transactions, TransactionStore):
+        return format_transactions(transactions.top(n, key=key, by=by))
+    scores = top_scores(transactions['Сумма операции'].to_numpy(dtype=float), key)
+    if by is None:
+        positions = top_positions(scores, n)
+    else:
+        positions = top_group_positions(scores, transactions[TOP_GROUPS[by]], n)
+    return format_transactions(transactions.iloc[positions])
 
-def events_page(date_str: str, period: str = 'M') -> str:
+@instrumented('views.format_transactions')
+def format_transactions(transactions: pd.DataFrame) -> list:
+    """
+    Преобразует выбранные транзакции в список словарей для JSON-ответа.
+
+    Аргументы:
+        transactions (pd.DataFrame): Несколько выбранных транзакций.
+
+    Возвращает:
+        list: Список транзакций (дата в формате 'YYYY-MM-DD HH:MM:SS').
+    """
+    columns = ['Дата операции', 'Сумма операции', 'Категория', 'Описание']
+    dates = transactions['Дата операции']
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        # Разбираются только даты выбранных строк
+        dates = parse_dates(dates)
+    records = transactions[columns].assign(**{'Дата операции': dates.dt.strftime('%Y-%m-%d %H:%M:%S')})
+    return records.to_dict(orient='records')
+
+@instrumented('views.events_page')
+def events_page(date_str: str, period: str = 'M', transactions: Optional[TransactionSource] = None,
+                user_settings: Optional[dict] = None) -> str:
     """
     Генерирует JSON-ответ для страницы событий.
 
     Аргументы:
         date_str (str): Дата в формате 'YYYY-MM-DD'.
         period (str): Период для фильтрации данных ('W', 'M', 'Y', 'ALL').
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Источник транзакций,
+            по умолчанию файл operations.xlsx.
+        user_settings (dict): Настройки пользователя, по умолчанию из файла user_settings.json.
 
     Возвращает:
         str: JSON-ответ.
     """
-    date = datetime.strptime(date_str, '%Y-%m-%d')
-    transactions = load_transactions('operations.xlsx')
-
-    # Фильтруем транзакции на основе периода
-    if period == 'W':
-        start_date = date - pd.Timedelta(days=date.weekday())
-    elif period == 'M':
-        start_date = date.replace(day=1, hour=0, minute=0, second=0)
-    elif period == 'Y':
-        start_date = date.replace(month=1, day=1, hour=0, minute=0, second=0)
-    elif period == 'ALL':
-        start_date = transactions['Дата операции'].min()
-    else:
-        start_date = date.replace(day=1, hour=0, minute=0, second=0)
+    sections = get_events_sections(date_str, period, transactions)
+    return render_page({**sections, **get_market_sections(user_settings)})
 
-    filtered_transactions = transactions[(transactions['Дата операции'] >= start_date) & (transactions['Дата операции'] <= date)]
-
-    # Расходы
-    expenses = get_expenses(filtered_transactions)
+@instrumented('views.get_events_sections')
+def get_events_sections(date_str: str, period: str = 'M', transactions: Optional[TransactionSource] = None) -> dict:
+    """
+    Формирует разделы страницы событий, зависящие только от транзакций.
 
-    # Доходы
-    income = get_income(filtered_transactions)
+    Аргументы:
+        date_str (str): Дата в формате 'YYYY-MM-DD'.
+        period (str): Период для фильтрации данных ('W', 'M', 'Y', 'ALL').
+        transactions (TransactionStore | pd.DataFrame | str | TransactionArchive): Источник транзакций,
+            по умолчанию файл operations.xlsx.
 
-    # Курсы валют
-    user_settings = load_user_settings('user_settings.json')
-    user_currencies = user_settings.get('user_currencies', [])
-    currency_rates = get_currency_rates(user_currencies)
+    Возвращает:
+        dict: Разделы 'expenses' и 'income'.
+    """
+    date = datetime.strptime(date_str, '%Y-%m-%d')
+    # С диска читаются только операции периода; для 'ALL' - вся история до даты
+    store = _get_store(transactions, get_period_start(date, period) if period != 'ALL' else None, date,
+                       CUBE_COLUMNS)
 
-    # Цены на акции
-    user_stocks = user_settings.get('user_stocks', [])
-    stock_prices = get_stock_prices(user_stocks)
+    # Расходы и доходы за период берутся из куба агрегатов
+    start_date, end_date = store.period_bounds(date, period)
+    expenses, income = get_period_totals(store, start_date, end_date)
 
-    response = {
+    return {
         "expenses": expenses,
-        "income": income,
-        "currency_rates": currency_rates,
-        "stock_prices": stock_prices
+        "income": income
     }
 
-    return json.dumps(response, ensure_ascii=False, indent=4, default=str)
-
 def get_expenses(transactions: pd.DataFrame) -> dict:
     """
     Получает данные о расходах.
@@ -167,18 +381,7 @@ def get_expenses(transactions: pd.DataFrame) -> dict:
     Возвращает:
         dict: Данные о расходах.
     """
-    expenses = transactions[transactions['Сумма операции'] < 0]
-    total_amount = expenses['Сумма операции'].sum()
-    main_categories = expenses.groupby('Категория')['Сумма операции'].sum().sort_values(ascending=False).head(7)
-    other_categories = expenses.groupby('Категория')['Сумма операции'].sum().sort_values(ascending=False).iloc[7:].sum()
-    main_categories['Остальное'] = other_categories
-    transfers_and_cash = expenses[expenses['Категория'].isin(['Наличные', 'Переводы'])].groupby('Категория')['Сумма операции'].sum().sort_values(ascending=False)
-
-    return {
-        "total_amount": total_amount,
-        "main": main_categories.to_dict(),
-        "transfers_and_cash": transfers_and_cash.to_dict()
-    }
+    return get_breakdown(transactions)["expenses"]
 
 def get_income(transactions: pd.DataFrame) -> dict:
     """
@@ -190,13 +393,107 @@ def get_income(transactions: pd.DataFrame) -> dict:
     Возвращает:
         dict: Данные о доходах.
     """
-    income = transactions[transactions['Сумма операции'] > 0]
-    total_amount = income['Сумма операции'].sum()
-    main_categories = income.groupby('Категория')['Сумма операции'].sum().sort_values(ascending=False)
+    return get_breakdown(transactions)["income"]
 
-    return {
-        "total_amount": total_amount,
-        "main": main_categories.to_dict()
-    }
+@instrumented('views.get_breakdown')
+def get_breakdown(transactions: pd.DataFrame, top_k: int = TOP_CATEGORIES) -> dict:
+    """
+    Получает данные о расходах и доходах за один проход по операциям.
+
+    Аргументы:
+        transactions (pd.DataFrame): DataFrame с транзакциями.
+        top_k (int): Число основных категорий расходов.
+
+    Возвращает:
+        dict: Данные о расходах ('expenses', включая 'transfers_and_cash') и доходах ('income').
+    """
+    amounts = transactions['Сумма операции'].to_numpy(dtype=float)
+    return summarize_breakdown(
+        transactions['Категория'],
+        np.minimum(amounts, 0.0), amounts < 0,
+        np.maximum(amounts, 0.0), amounts > 0,
+        top_k
+    )
+
+@instrumented('views.get_period_totals')
+def get_period_totals(store: TransactionStore, start_date: datetime, end_date: datetime) -> tuple:
+    """
+    Получает данные о расходах и доходах за период из куба агрегатов хранилища.
 
+    Аргументы:
+        store (TransactionStore): Хранилище транзакций.
+        start_date (datetime): Начало периода.
+        end_date (datetime): Конец периода.
+
+    Возвращает:
+        tuple: Данные о расходах и данные о доходах.
+    """
+    totals = store.cube.query(start_date, end_date)
+    breakdown = summarize_breakdown(
+        totals['Категория'],
+        totals['expense_sum'].to_numpy(dtype=float), totals['expense_count'].to_numpy(),
+        totals['income_sum'].to_numpy(dtype=float), totals['income_count'].to_numpy()
+    )
+    return breakdown["expenses"], breakdown["income"]
+
+def summarize_breakdown(categories: pd.Series, expense_sums: np.ndarray, expense_counts: np.ndarray,
+                        income_sums: np.ndarray, income_counts: np.ndarray,
+                        top_k: int = TOP_CATEGORIES) -> dict:
+    """
+    Формирует данные о расходах и доходах по построчным (или уже агрегированным) суммам.
+
+    Категории кодируются один раз, суммы по категориям считаются через np.bincount,
+    а основные категории расходов выбираются частичной сортировкой (np.argpartition).
+    Категории с равными суммами идут по алфавиту, как после группировки по категории.
+    Строки без категории входят только в общие суммы.
+
+    Аргументы:
+        categories (pd.Series): Категория каждой строки.
+        expense_sums (np.ndarray): Сумма расходов строки (<= 0).
+        expense_counts (np.ndarray): Число расходных операций строки (или признак расхода).
+        income_sums (np.ndarray): Сумма доходов строки (>= 0).
+        income_counts (np.ndarray): Число доходных операций строки (или признак дохода).
+        top_k (int): Число основных категорий расходов.
 
+    Возвращает:
+        dict: Данные о расходах ('expenses') и доходах ('income').
+    """
+    codes, names = pd.factorize(categories)
+    known = codes >= 0
+    size = len(names)
+    # Категории по алфавиту: при равных суммах позиция решает порядок (см. top_positions)
+    by_name = np.argsort(np.asarray(names, dtype=object), kind='stable')
+    per_category = {
+        key: np.bincount(codes[known], weights=np.asarray(values, dtype=float)[known], minlength=size)[by_name]
+        for key, values in (('expense_sum', expense_sums), ('expense_count', expense_counts),
+                            ('income_sum', income_sums), ('income_count', income_counts))
+    }
+    names = np.asarray(names, dtype=object)[by_name]
+
+    spent = np.flatnonzero(per_category['expense_count'] > 0)
+    expense_totals = per_category['expense_sum'][spent]
+    top = top_positions(expense_totals, top_k)
+    rest = np.ones(len(spent), dtype=bool)
+    rest[top] = False
+    main_expenses = {names[spent[i]]: float(expense_totals[i]) for i in top}
+    # Остаток суммируется точно (math.fsum): порядок слагаемых после частичной сортировки не определен
+    main_expenses['Остальное'] = math.fsum(expense_totals[rest])
+    transfers = np.flatnonzero(np.isin(names[spent], TRANSFER_CATEGORIES))
+    transfers_and_cash = {names[spent[transfers[i]]]: float(expense_totals[transfers[i]])
+                          for i in top_positions(expense_totals[transfers], len(transfers))}
+
+    earned = np.flatnonzero(per_category['income_count'] > 0)
+    income_totals = per_category['income_sum'][earned]
+    main_income = {names[earned[i]]: float(income_totals[i]) for i in top_positions(income_totals, len(earned))}
+
+    return {
+        "expenses": {
+            "total_amount": float(np.sum(expense_sums)),
+            "main": main_expenses,
+            "transfers_and_cash": transfers_and_cash
+        },
+        "income": {
+            "total_amount": float(np.sum(income_sums)),
+            "main": main_income
+        }
+    }
@@ -0,0 +1,85 @@
+import json
+import os
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from benchmarks.synthetic import generate_transactions
+from src.archive import TransactionArchive
+from src.reports import spending_by_category
+from src.schema import apply_schema
+from src.store import TransactionStore
+from src.views import get_events_sections, get_home_sections
+
+
+def make_exports():
+    transactions = apply_schema(generate_transactions(3000, seed=5, as_text=False))
+    # Выгрузки идут от новых операций к старым и пересекаются
+    return transactions.iloc[:2000], transactions.iloc[1500:], transactions
+
+
+def test_ingest_deduplicates(tmp_path):
+    newer, older, transactions = make_exports()
+    archive = TransactionArchive(str(tmp_path / 'archive'))
+
+    assert archive.ingest(newer) == 2000
+    assert archive.ingest(older) == 1000
+    assert archive.ingest(older) == 0
+
+    assert len(archive.load()) == len(transactions)
+    assert archive.partitions()[0] == '2018-01'
+    assert [source['rows_added'] for source in archive.read_manifest()['sources']] == [2000, 1000, 0]
+
+
+def test_ingest_checks_keys_on_hash_collision(tmp_path):
+    newer, older, transactions = make_exports()
+    archive = TransactionArchive(str(tmp_path / 'archive'))
+
+    # Все хеши совпадают: новые операции отличаются от известных только ключевыми столбцами
+    with patch('src.archive._row_keys', side_effect=lambda keys: np.zeros(len(keys), dtype=np.uint64)):
+        assert archive.ingest(newer) == 2000
+        assert archive.ingest(older) == 1000
+        assert archive.ingest(transactions) == 0
+
+
+def test_failed_ingest_leaves_no_segments(tmp_path):
+    newer, older, transactions = make_exports()
+    archive = TransactionArchive(str(tmp_path / 'archive'))
+    archive.ingest(newer)
+    manifest = archive.read_manifest()
+
+    def fail_after_segments(file_name, text, before_replace):
+        # Сегменты уже переименованы, но манифест не заменен
+        before_replace()
+        raise OSError('Нет места на диске')
+
+    with patch('src.archive.write_atomic', side_effect=fail_after_segments), pytest.raises(OSError):
+        archive.ingest(older)
+
+    segments = {os.path.relpath(os.path.join(path, name), archive.root)
+                for path, names, _ in os.walk(archive.root) for name in names if len(name) == 6}
+    assert segments == {segment['path'] for entry in manifest['partitions'].values() for segment in entry['segments']}
+    assert not [name for _, names, _ in os.walk(archive.root) for name in names if name.startswith('.')]
+    assert archive.ingest(older) == 1000
+    assert len(archive.load()) == len(transactions)
+
+
+def test_window_reads_only_touched_partitions(tmp_path):
+    newer, older, transactions = make_exports()
+    archive = TransactionArchive(str(tmp_path / 'archive'))
+    archive.ingest(older)
+    archive.ingest(newer)
+    store = TransactionStore(transactions)
+
+    window = archive.window(store.dates[-1].replace(day=1, hour=0, minute=0, second=0), store.dates[-1])
+    assert len(window) < len(store) / 10
+    assert window.dates.min().month == store.dates[-1].month
+
+    home_date = '2021-11-20 12:00:00'
+    # Сравнение через JSON: карта без номера дает NaN, а NaN != NaN
+    assert json.dumps(get_home_sections(home_date, archive)) == json.dumps(get_home_sections(home_date, store))
+    for period in ('W', 'M', 'ALL'):
+        assert json.dumps(get_events_sections('2020-03-15', period, archive)) == \
+            json.dumps(get_events_sections('2020-03-15', period, store))
+    assert json.loads(spending_by_category.__wrapped__(archive, 'Супермаркеты', '2021-06-30')) == \
+        json.loads(spending_by_category.__wrapped__(store, 'Супермаркеты', '2021-06-30'))
@@ -0,0 +1,66 @@
+import json
+import pandas as pd
+from benchmarks.synthetic import write_operations
+from unittest.mock import patch
+from src.batch import aggregate_file_parallel, analyze_files, split_months, split_rows
+from src.cache import read_bundle
+from src.store import TransactionStore
+from src.utils import load_transactions
+from src.views import get_events_sections
+
+KEYS = ['Месяц', 'Категория', 'Номер карты']
+
+
+def test_split_months():
+    dates = pd.to_datetime(['2021-01-05', '2021-01-20', '2021-02-01', '2021-03-01', '2021-03-02', None]).to_numpy()
+    assert split_months(dates, 2) == [('2021-01', '2021-02'), ('2021-02', '2021-04')]
+    assert split_months(dates, 10) == [('2021-01', '2021-02'), ('2021-02', '2021-03'), ('2021-03', '2021-04')]
+
+
+def test_split_rows():
+    ranges = [('2021-01', '2021-02'), ('2021-02', '2021-04')]
+    ascending = pd.to_datetime(['2020-12-31', '2021-01-05', '2021-01-20', '2021-02-01', '2021-03-02', None]).to_numpy()
+    assert split_rows(ascending, ranges) == [slice(1, 3), slice(3, 5)]
+
+    descending = ascending[[4, 3, 5, 2, 1, 0]]
+    assert split_rows(descending, ranges) == [slice(3, 5), slice(0, 2)]
+    unordered = ascending[[4, 2, 3, 1]]
+    assert [rows.tolist() for rows in split_rows(unordered, ranges)] == [[1, 3], [0, 2]]
+
+
+def test_aggregate_file_parallel_reads_only_its_rows(tmp_path):
+    path = write_operations(str(tmp_path / 'operations.xlsx'), 2000, seed=3)
+    load_transactions(path)
+
+    with patch('src.batch.read_bundle', wraps=read_bundle) as reader, \
+            patch('src.batch.load_transactions', wraps=load_transactions) as loader:
+        aggregate_file_parallel(path, processes=1, partitions=4)
+
+    assert loader.call_args.kwargs['columns'] == ['Дата операции']
+    rows = [call.kwargs['rows'] for call in reader.call_args_list]
+    assert len(rows) == 4
+    assert sum(len(range(2000)[selection]) for selection in rows) == 2000
+
+
+def test_aggregate_file_parallel_matches_cube(tmp_path):
+    path = write_operations(str(tmp_path / 'operations.xlsx'), 2000, seed=3)
+    expected = TransactionStore(load_transactions(path)).cube.cells
+    expected = expected.sort_values(KEYS, kind='mergesort', ignore_index=True)
+
+    serial = aggregate_file_parallel(path, processes=1, partitions=4)
+    parallel = aggregate_file_parallel(path, processes=2)
+
+    pd.testing.assert_frame_equal(serial, expected)
+    pd.testing.assert_frame_equal(parallel, expected)
+
+
+def test_analyze_files(tmp_path):
+    paths = [write_operations(str(tmp_path / f'operations_{seed}.xlsx'), 500, seed=seed) for seed in range(3)]
+
+    results = analyze_files(paths, '2021-06-30', 'M', categories=['Супермаркеты'], processes=2)
+
+    assert [result['file'] for result in results] == paths
+    store = TransactionStore(load_transactions(paths[1]))
+    assert json.dumps(results[1]['expenses']) == json.dumps(get_events_sections('2021-06-30', 'M', store)['expenses'])
+    assert set(results[1]) == {'file', 'expenses', 'income', 'spending', 'cashback'}
+    assert results[1]['spending']['Супермаркеты'] < 0
@@ -0,0 +1,27 @@
+import pandas as pd
+from benchmarks.run import compare, parse_size
+from benchmarks.synthetic import COLUMNS, generate_transactions, write_operations
+from src.ingest import iter_transaction_chunks
+
+
+def test_generate_transactions_matches_export_schema(tmp_path):
+    transactions = generate_transactions(500, seed=1)
+
+    assert list(transactions.columns) == COLUMNS
+    pd.testing.assert_frame_equal(transactions, generate_transactions(500, seed=1))
+
+    path = write_operations(str(tmp_path / 'operations.csv'), 500, seed=1)
+    loaded = pd.concat(iter_transaction_chunks(path), ignore_index=True)
+    assert len(loaded) == 500
+    assert loaded['Дата операции'].is_monotonic_decreasing
+    assert loaded['Сумма операции'].sum() == transactions['Сумма операции'].sum()
+
+
+def test_parse_size_and_compare():
+    assert [parse_size(size) for size in ['10k', '1m', '2500']] == [10000, 1000000, 2500]
+
+    baseline = {'results': [{'name': 'home_page', 'rows': 10, 'median': 1.0}]}
+    current = {'results': [{'name': 'home_page', 'rows': 10, 'median': 1.5},
+                           {'name': 'events_page[M]', 'rows': 10, 'median': 1.0}]}
+    report = compare(current, baseline, threshold=1.25)
+    assert [(entry['name'], entry['regression']) for entry in report] == [('home_page', True)]
@@ -0,0 +1,85 @@
+import os
+import numpy as np
+import pandas as pd
+from src.cache import load_cached_frame, clear_cache, get_bundle_path, select_frame
+
+
+def make_source(tmp_path, content=b'source'):
+    source = tmp_path / 'operations.xlsx'
+    source.write_bytes(content)
+    return str(source)
+
+
+def make_reader(calls):
+    def reader(file_path):
+        calls.append(file_path)
+        return pd.DataFrame({
+            'Дата операции': pd.to_datetime(['2021-12-31 16:44:00', '2021-12-30 10:00:00', '2021-12-29 09:15:00']),
+            'Номер карты': ['*7197', np.nan, '*7197'],
+            'Статус': pd.Categorical(['OK', 'FAILED', 'OK']),
+            'Сумма операции': [-160.89, 500.0, -64.0],
+            'Бонусы (включая кэшбэк)': [3, 0, 1],
+            'Категория': ['Супермаркеты', 'Пополнения', 'Супермаркеты']
+        })
+    return reader
+
+
+def as_cached(frame):
+    # Текстовые столбцы кеш отдает как category
+    return frame.astype({name: 'category' for name in frame.columns if frame[name].dtype == object})
+
+
+def test_load_cached_frame_round_trip(tmp_path):
+    source = make_source(tmp_path)
+    calls = []
+    reader = make_reader(calls)
+
+    first = load_cached_frame(source, reader)
+    second = load_cached_frame(source, reader)
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, as_cached(reader(source)))
+    pd.testing.assert_frame_equal(second, first)
+    assert pd.api.types.is_datetime64_any_dtype(second['Дата операции'])
+    assert pd.isna(second['Номер карты'].iloc[1])
+    assert second['Статус'].dtype == 'category'
+    assert second['Категория'].dtype == 'category'
+
+
+def test_load_cached_frame_invalidates_on_change(tmp_path):
+    source = make_source(tmp_path)
+    calls = []
+    reader = make_reader(calls)
+
+    load_cached_frame(source, reader)
+    with open(source, 'wb') as f:
+        f.write(b'changed source')
+    load_cached_frame(source, reader)
+    load_cached_frame(source, reader, rebuild=True)
+
+    assert len(calls) == 3
+
+
+def test_load_cached_frame_prunes_columns_and_rows(tmp_path):
+    source = make_source(tmp_path)
+    reader = make_reader([])
+    full = reader(source)
+    columns = ['Дата операции', 'Номер карты', 'Сумма операции']
+    between = ('Дата операции', pd.Timestamp('2021-12-30'), pd.Timestamp('2021-12-31 23:59:59'))
+
+    # Первая загрузка строит кеш, вторая читает из него
+    for _ in range(2):
+        pruned = load_cached_frame(source, reader, columns=columns, between=between)
+        assert list(pruned.columns) == columns
+        assert pruned['Сумма операции'].tolist() == [-160.89, 500.0]
+    expected = select_frame(full, columns, between).reset_index(drop=True)
+    pd.testing.assert_frame_equal(pruned, as_cached(expected))
+
+
+def test_clear_cache(tmp_path):
+    source = make_source(tmp_path)
+    load_cached_frame(source, make_reader([]))
+    assert os.path.isdir(get_bundle_path(source))
+
+    clear_cache(source)
+    assert not os.path.exists(get_bundle_path(source))
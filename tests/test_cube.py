@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from src.store import TransactionStore
+
+
+def make_transactions(size=500, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2021-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, size), unit='min')
+    return pd.DataFrame({
+        'Дата операции': dates,
+        'Номер карты': rng.choice(['*7197', '*4556', None], size),
+        'Сумма операции': rng.integers(-5000, 3000, size).astype(float),
+        'Категория': rng.choice(['Супермаркеты', 'Фастфуд', 'Переводы', 'Пополнения'], size)
+    })
+
+
+def brute_force(transactions, start_date, end_date):
+    dates = transactions['Дата операции']
+    rows = transactions[(dates >= start_date) & (dates <= end_date)]
+    return rows.groupby('Категория')['Сумма операции'].agg(['sum', 'count', 'min', 'max'])
+
+
+def cube_totals(store, start_date, end_date):
+    totals = store.cube.query(start_date, end_date)
+    return totals.groupby('Категория').agg({'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+
+
+def test_query_matches_raw_rows():
+    transactions = make_transactions()
+    store = TransactionStore(transactions)
+    windows = [
+        (datetime(2021, 1, 1), datetime(2021, 12, 31, 23, 59)),
+        (datetime(2021, 2, 14, 10, 30), datetime(2021, 5, 3, 8, 0)),
+        (datetime(2021, 3, 1), datetime(2021, 3, 31, 23, 59, 59)),
+        (datetime(2021, 6, 10), datetime(2021, 6, 20))
+    ]
+    for start_date, end_date in windows:
+        expected = brute_force(transactions, start_date, end_date)
+        result = cube_totals(store, start_date, end_date)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_append_updates_cube_incrementally():
+    transactions = make_transactions(seed=1)
+    store = TransactionStore(transactions.iloc[:300])
+    store.cube
+    store.append(transactions.iloc[300:])
+
+    rebuilt = TransactionStore(transactions)
+    start_date, end_date = datetime(2021, 1, 1), datetime(2021, 12, 31, 23, 59)
+    pd.testing.assert_frame_equal(cube_totals(store, start_date, end_date), cube_totals(rebuilt, start_date, end_date))
+    assert len(store) == len(transactions)
+    assert store.dates.is_monotonic_increasing
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+from benchmarks.synthetic import generate_transactions
+from src.dates import DateParser, detect_format, parse_dates, parse_exact
+from src.ingest import type_chunk
+
+
+def test_parse_matches_dayfirst_inference():
+    transactions = generate_transactions(2000, seed=2)
+    for column in ('Дата операции', 'Дата платежа'):
+        expected = pd.to_datetime(transactions[column], dayfirst=True)
+        pd.testing.assert_series_equal(parse_dates(transactions[column]), expected)
+
+
+def test_detect_format():
+    assert detect_format(['31.12.2021 16:44:00', '01.01.2022 00:00:00']) == '%d.%m.%Y %H:%M:%S'
+    assert detect_format(['31.12.2021']) == '%d.%m.%Y'
+    assert detect_format(['2023-10-01 12:00:00']) == '%Y-%m-%d %H:%M:%S'
+    assert detect_format(['вчера']) is None
+
+
+def test_parse_exact_rejects_outliers():
+    parsed = parse_exact(['31.12.2021 16:44:00', '31.12.2021 16:44', '3x.12.2021 16:44:00'], '%d.%m.%Y %H:%M:%S')
+    assert parsed[0] == pd.Timestamp('2021-12-31 16:44:00').to_datetime64()
+    assert pd.isna(parsed[1:]).all()
+
+
+def test_fallback_rows_are_counted():
+    parser = DateParser(errors='coerce')
+    values = pd.Series(['31.12.2021 16:44:00', '2021-12-01 10:00:00', None, 'мусор', '31.12.2021 16:44:00', ''])
+
+    parsed = parser.parse(values)
+
+    assert parsed.tolist()[:4] == [pd.Timestamp('2021-12-31 16:44:00'), pd.Timestamp('2021-12-01 10:00:00'),
+                                   pd.NaT, pd.NaT]
+    assert pd.isna(parsed.iloc[5])
+    assert parser.stats() == {"format": '%d.%m.%Y %H:%M:%S', "rows": 6, "unique_values": 4, "fallback_rows": 2}
+    with pytest.raises(ValueError):
+        parse_dates(['31.12.2021 16:44:00', 'мусор'])
+
+
+def test_format_detected_once_per_file():
+    transactions = generate_transactions(300, seed=4)
+    parsers = {}
+    for start in range(0, 300, 100):
+        type_chunk(transactions.iloc[start:start + 100], parsers)
+
+    stats = parsers['Дата операции'].stats()
+    assert stats['rows'] == 300 and stats['fallback_rows'] == 0
+    assert parsers['Дата платежа'].date_format == '%d.%m.%Y'
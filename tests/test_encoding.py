@@ -0,0 +1,77 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.encoding
+from src.encoding import Records, encode_json, iter_json, write_json
+from src.reports import get_spending_records, get_spending_table
+
+
+def make_records():
+    return Records({
+        "category": np.array(['Супермаркеты', 'Кафе "У дома"', 'Супермаркеты', '{x}'], dtype=object),
+        "spending": np.array([1.5, np.nan, -0.0, 1e20]),
+        "count": np.arange(4),
+        "extra": [None, True, {"a": [1, {}]}, []]
+    })
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_encode_json_matches_json_dumps(compact, monkeypatch):
+    # Несколько порций записей, вложенные Records и ключи не-строки
+    monkeypatch.setattr(src.encoding, 'ROWS_PER_CHUNK', 3)
+    records = make_records()
+    value = {"top": records, "nested": [{"rows": records}, [1, {}]], 1.5: 'ключ', None: [], "empty": Records({})}
+    expected = {"top": records.to_list(), "nested": [{"rows": records.to_list()}, [1, {}]], 1.5: 'ключ', None: [],
+                "empty": []}
+    options = {"separators": (',', ':')} if compact else {"indent": 4}
+
+    assert encode_json(value, compact) == json.dumps(expected, ensure_ascii=False, default=str, **options)
+
+
+def test_encode_json_without_records_matches_json_dumps():
+    value = {"date": pd.Timestamp('2021-12-31'), "amount": np.int64(5), "rates": [{"currency": "USD", "rate": 73.21}]}
+
+    assert encode_json(value) == json.dumps(value, ensure_ascii=False, indent=4, default=str)
+
+
+def test_write_json_streams_chunks(monkeypatch):
+    monkeypatch.setattr(src.encoding, 'ROWS_PER_CHUNK', 2)
+    records = make_records()
+    file = io.StringIO()
+
+    write_json(file, records, compact=True)
+
+    assert len(list(iter_json(records))) > 3
+    assert json.loads(file.getvalue().replace('NaN', 'null'))[2]["extra"] == {"a": [1, {}]}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        encode_json({}, backend='simplejson')
+
+
+def test_orjson_backend():
+    pytest.importorskip('orjson')
+    value = {"records": make_records(), "amount": 1.5}
+
+    assert json.loads(encode_json(value, compact=True, backend='orjson').replace('NaN', 'null')) == \
+        json.loads(encode_json(value, compact=True).replace('NaN', 'null'))
+
+
+def test_spending_table_matches_records():
+    data = pd.DataFrame({
+        'Дата операции': pd.to_datetime(['2021-10-01', '2021-11-15', '2021-12-01']),
+        'Сумма операции': [-100.0, -200.5, -300.0],
+        'Категория': ['Супермаркеты', 'Кафе', 'Супермаркеты']
+    })
+    categories, dates = ['Супермаркеты', 'Кафе', 'Такси'], ['2021-11-30', '2021-12-31']
+
+    table = get_spending_table(data, categories, dates)
+
+    assert len(table) == 6
+    assert table.to_list() == get_spending_records(data, categories, dates)
+    assert encode_json(table) == json.dumps(table.to_list(), ensure_ascii=False, indent=4)
@@ -0,0 +1,58 @@
+import pandas as pd
+from openpyxl import Workbook
+from src.ingest import iter_transaction_chunks, aggregate_file
+from src.store import TransactionStore
+
+HEADER = ['Дата операции', 'Дата платежа', 'Номер карты', 'Сумма операции', 'Категория', 'Описание']
+ROWS = [
+    ['31.12.2021 16:44:00', '31.12.2021', '*7197', -160.89, 'Супермаркеты', 'Колхоз'],
+    ['31.12.2021 16:42:04', '31.12.2021', '*7197', -64.0, 'Супермаркеты', 'Колхоз'],
+    ['15.11.2021 09:30:00', '16.11.2021', None, 500.0, 'Пополнения', 'Перевод'],
+    ['01.10.2021 12:00:00', '02.10.2021', '*4556', -1200.5, 'Фастфуд', 'Вкусно и точка'],
+    ['01.10.2021 11:00:00', None, '*4556', -99.0, None, 'Такси']
+]
+
+
+def make_workbook(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in ROWS:
+        sheet.append(row)
+    path = tmp_path / 'operations.xlsx'
+    workbook.save(path)
+    return str(path)
+
+
+def make_csv(tmp_path):
+    path = tmp_path / 'operations.csv'
+    pd.DataFrame(ROWS, columns=HEADER).to_csv(path, sep=';', decimal=',', index=False)
+    return str(path)
+
+
+def test_iter_transaction_chunks_excel(tmp_path):
+    chunks = list(iter_transaction_chunks(make_workbook(tmp_path), chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    transactions = pd.concat(chunks, ignore_index=True)
+    assert list(transactions.columns) == HEADER
+    assert pd.api.types.is_datetime64_any_dtype(transactions['Дата операции'])
+    assert transactions['Дата операции'].iloc[3] == pd.Timestamp('2021-10-01 12:00:00')
+    assert transactions['Сумма операции'].sum() == sum(row[3] for row in ROWS)
+
+
+def test_iter_transaction_chunks_csv(tmp_path):
+    chunks = list(iter_transaction_chunks(make_csv(tmp_path), chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 2]
+    assert chunks[0]['Сумма операции'].iloc[0] == -160.89
+    assert pd.api.types.is_datetime64_any_dtype(chunks[1]['Дата платежа'])
+
+
+def test_aggregate_file_matches_cube(tmp_path):
+    path = make_csv(tmp_path)
+    keys = ['Месяц', 'Категория', 'Номер карты']
+
+    cells = aggregate_file(path, chunk_size=2).sort_values(keys, ignore_index=True)
+    expected = TransactionStore(pd.DataFrame(ROWS, columns=HEADER)).cube.cells.sort_values(keys, ignore_index=True)
+    pd.testing.assert_frame_equal(cells, expected, check_dtype=False)
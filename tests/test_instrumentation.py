@@ -0,0 +1,35 @@
+import pandas as pd
+from src.instrumentation import MemorySink, add_sink, instrumented, increment, remove_sink, span
+
+
+@instrumented('test.double')
+def double(transactions):
+    return pd.concat([transactions, transactions])
+
+
+def test_spans_and_counters():
+    sink = MemorySink(buckets=(0.5, 1.0))
+    frame = pd.DataFrame({'Сумма операции': [1.0, 2.0, 3.0]})
+
+    double(frame)
+    add_sink(sink)
+    try:
+        double(frame)
+        with span('test.block', rows_in=7) as info:
+            info['rows_out'] = 2
+        increment('market_data.http_requests', 2)
+    finally:
+        remove_sink(sink)
+    double(frame)
+
+    snapshot = sink.snapshot()
+    assert snapshot['spans']['test.double']['count'] == 1
+    assert snapshot['spans']['test.double']['rows_in'] == 3
+    assert snapshot['spans']['test.double']['rows_out'] == 6
+    assert snapshot['spans']['test.block']['buckets'] == [1, 0, 0]
+    assert snapshot['counters'] == {'market_data.http_requests': 2}
+
+    text = sink.prometheus_text()
+    assert 'operations_span_seconds_bucket{span="test.double",le="+Inf"} 1' in text
+    assert 'operations_span_rows_out_total{span="test.block"} 2' in text
+    assert 'operations_market_data_http_requests_total 2' in text
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from src.lazy import lazy_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет импорта src.views, микросекунды (-X importtime, накопленное время); сейчас около 30 мс
+VIEWS_IMPORT_BUDGET_US = 200000
+
+HEAVY_MODULES = ('pandas', 'numpy', 'requests', 'dotenv')
+
+SCRIPT = '''
+import sys
+from datetime import datetime
+from src.views import get_greeting
+assert get_greeting(datetime(2023, 10, 3, 8, 0, 0)) == "Доброе утро"
+print(",".join(name for name in %r if name in sys.modules))
+''' % (HEAVY_MODULES,)
+
+
+def test_views_import_without_heavy_modules():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ''
+    # Строки вида "import time:  self [us] | cumulative | module"
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    assert times['src.views'] < VIEWS_IMPORT_BUDGET_US
+
+
+def test_lazy_import():
+    module = lazy_import('json')
+    assert 'не загружен' in repr(module)
+    assert module.loads('[1]') == [1]
+    assert 'не загружен' not in repr(module)
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.market_data import MarketDataClient, RateTable, parse_time_series_prices
+
+RUB_RATES = {'RUB': 1.0, 'USD': 0.0125, 'EUR': 0.01}
+STOCK_PRICES = {'AAPL': '150.5', 'MSFT': '330.25'}
+
+
+class StubMarketHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+        if server.delay:
+            time.sleep(server.delay)
+        if server.fail:
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == '/v4/latest/RUB':
+            body = {'base': 'RUB', 'rates': RUB_RATES}
+        elif url.path == '/time_series' and query.get('outputsize') == ['1']:
+            symbols = query['symbol'][0].split(',')
+            series = {
+                symbol: {'meta': {'symbol': symbol}, 'values': [{'open': STOCK_PRICES[symbol]}], 'status': 'ok'}
+                if symbol in STOCK_PRICES else {'code': 400, 'status': 'error'}
+                for symbol in symbols
+            }
+            body = series[symbols[0]] if len(symbols) == 1 else series
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubMarketHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.delay = 0
+    server.fail = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, **kwargs):
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    return MarketDataClient(exchange_api_url=f'{base_url}/v4', stock_api_url=base_url, api_key='test', **kwargs)
+
+
+def test_fetches_rates_and_prices(stub_server):
+    client = make_client(stub_server)
+
+    assert client.get_currency_rates(['USD', 'EUR']) == {'USD': 80.0, 'EUR': 100.0}
+    assert client.get_stock_prices(['AAPL', 'MSFT']) == {'AAPL': 150.5, 'MSFT': 330.25}
+
+
+def test_fetches_all_symbols_in_one_request(stub_server):
+    client = make_client(stub_server)
+
+    client.get_currency_rates(['USD', 'EUR'])
+    assert client.get_stock_prices(['AAPL', 'MSFT', 'UNKNOWN']) == {'AAPL': 150.5, 'MSFT': 330.25}
+    assert client.get_stock_prices(['MSFT']) == {'MSFT': 330.25}
+
+    assert len(stub_server.requests) == 2
+
+
+def test_caches_values_for_ttl(stub_server):
+    client = make_client(stub_server)
+
+    client.get_currency_rates(['USD', 'EUR'])
+    client.get_currency_rates(['EUR'])
+
+    assert len(stub_server.requests) == 1
+
+
+def test_deduplicates_inflight_requests(stub_server):
+    stub_server.delay = 0.2
+    client = make_client(stub_server)
+
+    threads = [threading.Thread(target=client.get_currency_rates, args=(['USD'],)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stub_server.requests) == 1
+
+
+def test_falls_back_to_stale_value(stub_server):
+    client = make_client(stub_server, rates_ttl=0)
+
+    assert client.get_currency_rates(['USD']) == {'USD': 80.0}
+    stub_server.fail = True
+    assert client.get_currency_rates(['USD', 'CNY']) == {'USD': 80.0}
+
+    client = make_client(stub_server)
+    assert client.get_currency_rates(['USD']) == {}
+
+
+def test_rate_table_cross_rates_and_convert():
+    table = RateTable('RUB', {'USD': 0.0125, 'EUR': 0.01})
+
+    assert table.rate('USD', 'RUB') == 80.0
+    assert table.rate('EUR', 'USD') == 1.25
+    assert table.convert(10, 'USD', 'RUB') == 800.0
+
+    amounts = pd.Series([-100.0, 10.0, 5.0, 1.0])
+    converted = table.convert(amounts, pd.Series(['RUB', 'USD', 'EUR', 'TRY']), 'RUB')
+    assert list(converted[:3]) == [-100.0, 800.0, 500.0]
+    assert np.isnan(converted[3])
+
+
+def test_parse_time_series_prices_single_symbol():
+    data = {'meta': {'symbol': 'AAPL'}, 'values': [{'open': '150.5'}]}
+    assert parse_time_series_prices(data, ['AAPL']) == {'AAPL': 150.5}
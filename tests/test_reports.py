@@ -1,8 +1,14 @@
+import json
+import os
+import stat
 import pytest
-from src.reports import spending_by_category
+from src.report_writer import ReportWriter, write_atomic
+from src.reports import report_decorator, spending_by_category, spending_by_categories
 import pandas as pd
 
-def test_spending_by_category():
+def test_spending_by_category(tmp_path, monkeypatch):
+    # Отчет пишется в текущий каталог
+    monkeypatch.chdir(tmp_path)
     data = pd.DataFrame({
         'Дата операции': ['2023-10-01', '2023-10-02'],
         'Категория': ['Продукты', 'Продукты'],
@@ -12,3 +18,85 @@ def test_spending_by_category():
     assert isinstance(response, str)
     assert 'category' in response
     assert 'spending' in response
+    with open('spending_by_category_report.json', encoding='utf-8') as f:
+        assert f.read() == response
+
+def test_report_decorator_writes_json_once(tmp_path):
+    file_name = str(tmp_path / 'report.json')
+
+    @report_decorator(file_name=file_name)
+    def report():
+        return json.dumps({"category": "Продукты", "spending": 3000.0}, ensure_ascii=False)
+
+    report()
+    with open(file_name, encoding='utf-8') as f:
+        assert json.load(f) == {"category": "Продукты", "spending": 3000.0}
+
+
+def test_report_writer_background_coalesces(tmp_path):
+    file_name = str(tmp_path / 'report.json')
+    writer = ReportWriter()
+    for value in range(5):
+        writer.submit(file_name, {"value": value}, compact=True)
+    assert writer.flush(timeout=5)
+
+    # Отчеты, не записанные к моменту следующей отправки, схлопываются; последний записан всегда
+    assert writer.writes + writer.coalesced == 5
+    assert writer.writes >= 1
+    assert writer.errors == []
+    with open(file_name, encoding='utf-8') as f:
+        assert f.read() == '{"value":4}'
+    assert os.listdir(tmp_path) == ['report.json']
+
+
+def test_write_atomic_keeps_file_mode(tmp_path, monkeypatch):
+    file_name = str(tmp_path / 'report.json')
+    umask = os.umask(0o022)
+    try:
+        # Запись не трогает umask процесса
+        monkeypatch.setattr(os, 'umask', None)
+        write_atomic(file_name, '{}')
+        assert stat.S_IMODE(os.stat(file_name).st_mode) == 0o644
+        os.chmod(file_name, 0o640)
+        write_atomic(file_name, ['{', '}'])
+        assert stat.S_IMODE(os.stat(file_name).st_mode) == 0o640
+        assert os.listdir(tmp_path) == ['report.json']
+    finally:
+        monkeypatch.undo()
+        os.umask(umask)
+
+
+def test_spending_by_categories_matches_single_calls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = pd.DataFrame({
+        'Дата операции': ['2023-06-30', '2023-07-15', '2023-08-01', '2023-09-30', '2023-10-02', None],
+        'Категория': ['Продукты', 'Кафе', 'Продукты', 'Продукты', 'Кафе', 'Продукты'],
+        'Сумма операции': [-100.5, -200, -300.25, -400, -500, -600]
+    })
+    categories = ['Продукты', 'Кафе', 'Такси']
+    dates = ['2023-09-30', '2023-10-02', '2023-07-31']
+
+    report = spending_by_categories(data, categories, dates).to_list()
+
+    # Записи кодируются в файл отчета по частям
+    with open('spending_by_categories_report.json', encoding='utf-8') as f:
+        assert json.load(f) == report
+
+    assert [(row['category'], row['date']) for row in report] == [(c, d) for c in categories for d in dates]
+    for row in report:
+        single = json.loads(spending_by_category.__wrapped__(data, row['category'], row['date']))
+        assert row['spending'] == pytest.approx(single['spending'])
+    assert report[0]['spending'] == -800.75
+
+
+def test_spending_by_categories_keeps_requested_order_on_ties():
+    data = pd.DataFrame({
+        'Дата операции': ['2023-09-01', '2023-09-02', '2023-09-03'],
+        'Категория': ['Кафе', 'Аптека', 'Такси'],
+        'Сумма операции': [-100, -100, -100]
+    })
+    categories = ['Такси', 'Кафе', 'Аптека']
+
+    report = spending_by_categories.__wrapped__(data, categories, ['2023-09-30']).to_list()
+
+    assert [(row['category'], row['spending']) for row in report] == [(category, -100.0) for category in categories]
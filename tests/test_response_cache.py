@@ -0,0 +1,40 @@
+from src.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats() == {'entries': 2, 'hits': 3, 'misses': 1, 'evictions': 1, 'expirations': 0}
+
+
+def test_ttl_and_get_or_set():
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    builds = []
+
+    def build():
+        builds.append(clock.now)
+        return 'page %d' % len(builds)
+
+    assert cache.get_or_set('page', build, ttl=30) == 'page 1'
+    clock.now = 29
+    assert cache.get_or_set('page', build, ttl=30) == 'page 1'
+    clock.now = 30
+    assert cache.get_or_set('page', build, ttl=30) == 'page 2'
+    assert cache.stats()['expirations'] == 1
+    assert builds == [0, 30]
@@ -0,0 +1,36 @@
+import pandas as pd
+from src.schema import apply_schema, memory_report
+
+
+def make_transactions():
+    return pd.DataFrame({
+        'Дата операции': ['31.12.2021 16:44:00', '31.12.2021 16:42:04', '30.12.2021 10:00:00'],
+        'Номер карты': ['*7197', '*7197', None],
+        'Сумма операции': [-160.89, -64.0, 500.0],
+        'Категория': ['Супермаркеты', 'Супермаркеты', 'Пополнения'],
+        'Бонусы (включая кэшбэк)': ['3', '1', None],
+        'Сумма операции с округлением': [160.89, 64.0, 500.0]
+    })
+
+
+def test_apply_schema_types_and_drops_columns():
+    transactions = make_transactions()
+    typed = apply_schema(transactions)
+
+    assert pd.api.types.is_datetime64_any_dtype(typed['Дата операции'])
+    assert typed['Дата операции'].iloc[2] == pd.Timestamp('2021-12-30 10:00:00')
+    assert typed['Категория'].dtype == 'category'
+    assert typed['Номер карты'].dtype == 'category'
+    assert typed['Сумма операции'].dtype == 'float64'
+    assert typed['Бонусы (включая кэшбэк)'].dtype == 'float32'
+    assert 'Сумма операции с округлением' not in typed
+    assert 'Сумма операции с округлением' in transactions
+
+
+def test_memory_report():
+    transactions = make_transactions()
+    report = memory_report(transactions, apply_schema(transactions))
+
+    assert report.loc['Сумма операции с округлением', 'after'] == 0
+    assert report.loc['Итого', 'before'] == report['before'].drop('Итого').sum()
+    assert report.loc['Итого', 'after'] < report.loc['Итого', 'before']
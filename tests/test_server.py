@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from src.server import AppState, make_server, run_benchmark
+from src.views import get_home_sections
+
+TRANSACTIONS = pd.DataFrame({
+    'Дата операции': ['01.10.2023 10:00:00', '05.10.2023 12:00:00', '07.10.2023 18:30:00'],
+    'Дата платежа': ['01.10.2023', '05.10.2023', '07.10.2023'],
+    'Номер карты': ['*7197', '*7197', '*4556'],
+    'Сумма операции': [-100.0, -50.0, 1000.0],
+    'Категория': ['Супермаркеты', 'Фастфуд', 'Пополнения'],
+    'Описание': ['Колхоз', 'Вкусно и точка', 'Перевод']
+})
+
+
+@pytest.fixture
+def server(tmp_path):
+    transactions_path = str(tmp_path / 'operations.xlsx')
+    settings_path = str(tmp_path / 'user_settings.json')
+    TRANSACTIONS.to_excel(transactions_path, index=False)
+    with open(settings_path, 'w', encoding='utf-8') as file:
+        json.dump({'user_currencies': ['USD'], 'user_stocks': []}, file)
+
+    state = AppState(transactions_path, settings_path, check_interval=0)
+    server = make_server(state, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with patch('src.views.get_currency_rates', side_effect=lambda currencies: {c: 90.0 for c in currencies}), \
+            patch('src.views.get_stock_prices', return_value={}):
+        yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path):
+    host, port = server.server_address[:2]
+    with urllib.request.urlopen('http://%s:%d%s' % (host, port, path)) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def test_home_and_events(server):
+    home = get(server, '/home?date=2023-10-10%2019:00:00')
+    assert home['greeting'] == 'Добрый вечер'
+    assert {card['last_digits'] for card in home['cards']} == {'*7197', '*4556'}
+    assert home['currency_rates'] == {'USD': 90.0}
+
+    events = get(server, '/events?date=2023-10-10&period=M')
+    assert events['expenses']['total_amount'] == -150.0
+    assert events['income']['main'] == {'Пополнения': 1000.0}
+
+
+def test_bad_requests(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, '/home?date=10.10.2023')
+    assert error.value.code == 400
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(server, '/unknown')
+    assert error.value.code == 404
+
+
+def test_internal_error(server):
+    with patch('src.server.get_home_sections', side_effect=KeyError('Категория')), \
+            pytest.raises(urllib.error.HTTPError) as error:
+        get(server, '/home?date=2023-10-10%2019:00:00')
+    assert error.value.code == 500
+    assert json.loads(error.value.read().decode('utf-8')) == {"error": "Внутренняя ошибка сервера"}
+    # Сервер продолжает отвечать
+    assert get(server, '/stats')['reloads'] == server.state.reloads
+
+
+def test_reload_on_change(server):
+    state = server.state
+    settings_path = state.settings_path
+    with open(settings_path, 'w', encoding='utf-8') as file:
+        json.dump({'user_currencies': ['EUR'], 'user_stocks': []}, file)
+    os.utime(settings_path, ns=(0, 0))
+
+    home = get(server, '/home?date=2023-10-10%2019:00:00')
+    assert home['currency_rates'] == {'EUR': 90.0}
+    assert state.reloads == 1
+
+
+def test_response_cache(server):
+    state = server.state
+    with patch('src.server.get_home_sections', wraps=get_home_sections) as build_sections:
+        first = get(server, '/home?date=2023-10-10%2019:00:00')
+        second = get(server, '/home?date=2023-10-10%2019:00:00')
+        get(server, '/home?date=2023-10-11%2019:00:00')
+
+    assert first == second
+    assert build_sections.call_count == 2
+    stats = get(server, '/stats')['cache']
+    assert stats['hits'] == 2
+    assert stats['entries'] == 5
+
+    # Рыночные разделы и готовые ответы устаревают раньше разделов из транзакций
+    state.cache.clear()
+    state.market_ttl = 0
+    with patch('src.server.get_home_sections', wraps=get_home_sections) as build_sections:
+        get(server, '/home?date=2023-10-10%2019:00:00')
+        get(server, '/home?date=2023-10-10%2019:00:00')
+    assert build_sections.call_count == 1
+
+
+def test_run_benchmark(server):
+    host, port = server.server_address[:2]
+    result = run_benchmark('http://%s:%d' % (host, port), ['/events?date=2023-10-10&period=M'],
+                           requests_count=10, concurrency=4)
+    assert result['errors'] == 0
+    assert result['latency_ms']['p50'] <= result['latency_ms']['max']
@@ -1,5 +1,10 @@
 import pytest
-from src.services import profitable_cashback_categories
+import json
+from unittest.mock import patch
+from benchmarks.synthetic import write_operations
+from src.cache import load_cached_frame
+from src.utils import load_transactions
+from src.services import profitable_cashback_categories, cashback_by_month, profitable_cashback_by_month
 import pandas as pd
 
 def test_profitable_cashback_categories():
@@ -12,3 +17,74 @@ def test_profitable_cashback_categories():
     assert isinstance(response, str)
     assert 'Продукты' in response
     assert 'Рестораны' in response
+
+def test_cashback_by_month_rules_caps_and_ranking():
+    data = pd.DataFrame({
+        'Дата операции': ['2023-09-05', '2023-09-10', '2023-09-12', '2023-10-01', '2023-10-02', '2023-10-03'],
+        'Номер карты': ['*1111', '*2222', '*1111', '*1111', '*2222', '*2222'],
+        'Категория': ['Продукты', 'Продукты', 'Рестораны', 'Продукты', 'Такси', 'Рестораны'],
+        'Сумма операции': [-1000, -2000, -500, -3000, -400, 100]
+    })
+    rules = {
+        'category_rates': {'Рестораны': 0.05},
+        'card_rates': {'*2222': {'Продукты': 0.1, '*': 0.02}},
+        'monthly_caps': {'Продукты': 150}
+    }
+
+    totals = cashback_by_month(data, '2023-09', '2023-10', rules).set_index(['Месяц', 'Категория'])
+
+    assert totals.loc[('2023-09-01', 'Продукты'), 'spent'] == 3000
+    assert totals.loc[('2023-09-01', 'Продукты'), 'cashback'] == 150
+    assert totals.loc[('2023-09-01', 'Рестораны'), 'cashback'] == 25
+    assert totals.loc[('2023-10-01', 'Продукты'), 'cashback'] == 30
+    assert totals.loc[('2023-10-01', 'Такси'), 'cashback'] == 8
+    assert ('2023-10-01', 'Рестораны') not in totals.index
+    assert list(totals['rank']) == [1, 2, 1, 2]
+
+def test_cashback_by_month_ties_by_category():
+    data = pd.DataFrame({
+        'Дата операции': ['2023-09-05', '2023-09-10', '2023-09-12', '2023-09-15'],
+        'Категория': ['Такси', 'Рестораны', 'Аптеки', 'Продукты'],
+        'Сумма операции': [-1000, -1000, -500, -1000]
+    })
+
+    totals = cashback_by_month(data, '2023-09', '2023-09', top_n=2)
+
+    assert list(totals['Категория']) == ['Продукты', 'Рестораны']
+    assert list(totals['rank']) == [1, 2]
+
+def test_profitable_cashback_by_month_top_n():
+    data = pd.DataFrame({
+        'Дата операции': ['2023-09-05', '2023-09-10', '2023-11-01'],
+        'Категория': ['Продукты', 'Рестораны', 'Продукты'],
+        'Сумма операции': [-1000, -2000, -300]
+    })
+    with patch('src.services.get_user_settings', return_value={}):
+        report = json.loads(profitable_cashback_by_month(data, '2023-09', '2023-11', top_n=1))
+    assert report == {
+        '2023-09': [{'category': 'Рестораны', 'spent': 2000.0, 'cashback': 20.0}],
+        '2023-11': [{'category': 'Продукты', 'spent': 300.0, 'cashback': 3.0}]
+    }
+
+def test_profitable_cashback_by_month_reads_user_settings():
+    data = pd.DataFrame({
+        'Дата операции': ['2023-09-05', '2023-09-10'],
+        'Категория': ['Продукты', 'Рестораны'],
+        'Сумма операции': [-1000, -2000]
+    })
+    settings = {"cashback": {"category_rates": {"Продукты": 0.1}}}
+    with patch('src.services.get_user_settings', return_value=settings) as get_settings:
+        report = json.loads(profitable_cashback_by_month(data, '2023-09', '2023-09', top_n=1))
+    get_settings.assert_called_once_with('user_settings.json')
+    assert report == {'2023-09': [{'category': 'Продукты', 'spent': 1000.0, 'cashback': 100.0}]}
+
+def test_cashback_by_month_loads_only_range(tmp_path):
+    path = write_operations(str(tmp_path / 'operations.xlsx'), 2000, seed=7)
+    with patch('src.utils.load_cached_frame', wraps=load_cached_frame) as loader:
+        from_file = cashback_by_month(path, '2021-03', '2021-05')
+    column, start, end = loader.call_args.kwargs['between']
+    assert (start, end) == (pd.Timestamp('2021-03-01'), pd.Timestamp('2021-06-01') - pd.Timedelta(1, 'ns'))
+    assert 'Описание' not in loader.call_args.kwargs['columns']
+    assert len(from_file) > 0
+    full_history = load_transactions(path, use_cache=False)
+    pd.testing.assert_frame_equal(from_file, cashback_by_month(full_history, '2021-03', '2021-05'))
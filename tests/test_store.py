@@ -0,0 +1,79 @@
+import pandas as pd
+from datetime import datetime
+from src.store import TransactionStore, as_store, get_period_start
+
+
+def make_transactions():
+    return pd.DataFrame({
+        'Дата операции': ['31.12.2021 16:44:00', '01.10.2021 12:00:00', '15.11.2021 09:30:00'],
+        'Номер карты': ['*7197', '*4556', '*7197'],
+        'Сумма операции': [-160.89, 500.0, -64.0],
+        'Категория': ['Супермаркеты', 'Пополнения', 'Фастфуд']
+    })
+
+
+def test_store_sorts_by_date_with_datetime_index():
+    store = TransactionStore(make_transactions())
+
+    assert isinstance(store.dates, pd.DatetimeIndex)
+    assert store.dates.is_monotonic_increasing
+    assert list(store.frame['Сумма операции']) == [500.0, -64.0, -160.89]
+    assert len(store) == 3
+
+
+def test_store_does_not_modify_input():
+    transactions = make_transactions()
+    TransactionStore(transactions)
+
+    assert transactions['Дата операции'].dtype == object
+    assert transactions['Сумма операции'].iloc[0] == -160.89
+
+
+def test_as_store_returns_same_store():
+    store = TransactionStore(make_transactions())
+    assert as_store(store) is store
+    assert isinstance(as_store(make_transactions()), TransactionStore)
+
+
+def test_between_is_inclusive_slice():
+    store = TransactionStore(make_transactions())
+    result = store.between(datetime(2021, 11, 15, 9, 30), datetime(2021, 12, 31, 16, 44))
+
+    assert list(result['Сумма операции']) == [-64.0, -160.89]
+    assert store.between(datetime(2022, 1, 1), datetime(2022, 2, 1)).empty
+
+
+def test_period():
+    store = TransactionStore(make_transactions())
+    date = datetime(2021, 12, 31, 23, 59)
+
+    assert len(store.period(date, 'M')) == 1
+    assert len(store.period(date, 'Y')) == 3
+    assert len(store.period(date, 'ALL')) == 3
+    assert len(store.period(datetime(2021, 11, 20), 'W')) == 1
+    assert get_period_start(datetime(2021, 11, 20), 'W') == datetime(2021, 11, 15)
+
+
+def test_top_keys_groups_and_heap():
+    store = TransactionStore(pd.DataFrame({
+        'Дата операции': ['2021-11-01 10:00:00', '2021-11-02 10:00:00', '2021-11-03 10:00:00',
+                          '2021-11-04 10:00:00', '2021-10-31 10:00:00'],
+        'Номер карты': ['*1', '*2', '*1', '*2', '*1'],
+        'Сумма операции': [-500.0, 300.0, 300.0, -20.0, 1000.0]
+    }))
+    november = (datetime(2021, 11, 1), datetime(2021, 11, 30, 23, 59, 59))
+
+    assert list(store.top(2, *november)['Сумма операции']) == [300.0, 300.0]
+    assert list(store.top(2, *november)['Номер карты']) == ['*2', '*1']
+    assert list(store.top(1, *november, key='abs')['Сумма операции']) == [-500.0]
+    assert list(store.top(5, *november, key='expense')['Сумма операции']) == [-500.0, -20.0]
+    assert list(store.top(1, key='income', by='card')['Сумма операции']) == [1000.0, 300.0]
+
+    store.append(pd.DataFrame({
+        'Дата операции': ['2021-11-05 10:00:00', '2021-11-06 10:00:00'],
+        'Номер карты': ['*2', '*1'],
+        'Сумма операции': [700.0, 300.0]
+    }))
+    top = store.top(3, *november)
+    expected = store.between(*november).nlargest(3, 'Сумма операции')
+    pd.testing.assert_frame_equal(top, expected)
@@ -2,7 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from datetime import datetime
-from src.utils import load_transactions, get_currency_rates, get_stock_prices, load_user_settings
+from src.utils import load_transactions, get_currency_rates, get_stock_prices, load_user_settings, get_user_settings
 from src.views import home_page, get_greeting, get_cards_data, get_top_transactions, events_page, get_expenses, get_income
 
 class TestFinancialFunctions(unittest.TestCase):
@@ -63,7 +63,7 @@ class TestFinancialFunctions(unittest.TestCase):
         self.assertEqual(prices, {'AAPL': 150.0})
 
     @patch('src.views.load_transactions')
-    @patch('src.views.load_user_settings')
+    @patch('src.views.get_user_settings')
     @patch('src.views.get_currency_rates')
     @patch('src.views.get_stock_prices')
     def test_home_page(self, mock_get_stock_prices, mock_get_currency_rates, mock_load_user_settings, mock_load_transactions):
@@ -125,7 +125,7 @@ class TestFinancialFunctions(unittest.TestCase):
         self.assertEqual(top_transactions[0]['Сумма операции'], 200)
 
     @patch('src.views.load_transactions')
-    @patch('src.views.load_user_settings')
+    @patch('src.views.get_user_settings')
     @patch('src.views.get_currency_rates')
     @patch('src.views.get_stock_prices')
     def test_events_page(self, mock_get_stock_prices, mock_get_currency_rates, mock_load_user_settings, mock_load_transactions):
@@ -213,5 +213,19 @@ def test_events_page():
     assert 'currency_rates' in response
     assert 'stock_prices' in response
 
+def test_get_user_settings_reloads_on_change(tmp_path):
+    path = tmp_path / 'user_settings.json'
+    path.write_text('{"user_currencies": ["USD"]}', encoding='utf-8')
+
+    with patch('src.utils.load_user_settings', wraps=load_user_settings) as load:
+        first = get_user_settings(str(path))
+        first['user_currencies'].append('EUR')
+        assert get_user_settings(str(path)) == {"user_currencies": ["USD"]}
+        assert load.call_count == 1
+
+        path.write_text('{"user_currencies": ["USD", "CNY"]}', encoding='utf-8')
+        assert get_user_settings(str(path)) == {"user_currencies": ["USD", "CNY"]}
+        assert load.call_count == 2
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,14 @@
+import threading
 import unittest
 from datetime import datetime
-from src.views import home_page, events_page
+from unittest.mock import patch
+from benchmarks.synthetic import write_operations
+from src.cache import load_cached_frame
+from src.store import TransactionStore
+from src.utils import load_transactions
+from src.views import home_page, events_page, get_cards_summary, get_card_windows, get_breakdown
+from src.views import HOME_COLUMNS, get_events_sections, get_home_sections, get_market_sections
+import pandas as pd
 import json
 
 class TestViews(unittest.TestCase):
@@ -23,5 +31,103 @@ class TestViews(unittest.TestCase):
         self.assertIn('currency_rates', data)
         self.assertIn('stock_prices', data)
 
+    def test_get_cards_summary_windows(self):
+        transactions = pd.DataFrame({
+            'Дата операции': ['2023-09-10 12:00:00', '2023-10-01 10:00:00', '2023-10-02 11:00:00',
+                              '2023-10-03 12:00:00', '2023-10-04 13:00:00'],
+            'Номер карты': ['1234', '1234', '1234', '5678', None],
+            'Сумма операции': [-300, -100, -50, 200, -10],
+            'Описание': ['Такси', 'Обед', 'Такси', 'Перевод', 'Комиссия']
+        })
+        summary = get_cards_summary(transactions, get_card_windows(datetime(2023, 10, 10, 12, 0, 0)))
+        summary = summary.set_index(['window', 'card'])
+
+        self.assertEqual(summary.loc[('current_month', '1234'), 'total_spent'], -150)
+        self.assertEqual(summary.loc[('current_month', '1234'), 'count'], 2)
+        self.assertEqual(summary.loc[('current_month', '1234'), 'top_merchant'], 'Обед')
+        self.assertEqual(summary.loc[('current_month', '5678'), 'cashback'], 2.0)
+        self.assertTrue(pd.isna(summary.loc[('current_month', '5678'), 'top_merchant']))
+        self.assertEqual(summary.loc[('previous_month', '1234'), 'total_spent'], -300)
+        self.assertEqual(summary.loc[('year_to_date', '1234'), 'top_merchant'], 'Такси')
+        self.assertEqual(len(summary.loc['year_to_date']), 3)
+
+    def test_card_windows_split_at_midnight(self):
+        # Операция ровно в полночь 1-го числа относится только к текущему месяцу
+        transactions = pd.DataFrame({
+            'Дата операции': ['2021-11-30 23:59:59', '2021-12-01 00:00:00'],
+            'Номер карты': ['1234', '1234'],
+            'Сумма операции': [-100, -40],
+            'Описание': ['Такси', 'Обед']
+        })
+        summary = get_cards_summary(transactions, get_card_windows(datetime(2021, 12, 31)))
+        summary = summary.set_index(['window', 'card'])
+
+        self.assertEqual(summary.loc[('current_month', '1234'), 'total_spent'], -40)
+        self.assertEqual(summary.loc[('previous_month', '1234'), 'total_spent'], -100)
+        self.assertEqual(summary.loc[('previous_month', '1234'), 'count'], 1)
+
+    def test_get_breakdown(self):
+        transactions = pd.DataFrame({
+            'Сумма операции': [-50, -30, -20, -10, -5, 100, 40, -7],
+            'Категория': ['Еда', 'Транспорт', 'Еда', 'Переводы', 'Кино', 'Зарплата', 'Переводы', None]
+        })
+        breakdown = get_breakdown(transactions, top_k=2)
+        expenses, income = breakdown['expenses'], breakdown['income']
+
+        self.assertEqual(expenses['total_amount'], -122)
+        self.assertEqual(list(expenses['main'].items()), [('Кино', -5), ('Переводы', -10), ('Остальное', -100)])
+        self.assertEqual(expenses['transfers_and_cash'], {'Переводы': -10})
+        self.assertEqual(income['total_amount'], 140)
+        self.assertEqual(list(income['main']), ['Зарплата', 'Переводы'])
+
+    def test_get_breakdown_ties_follow_category_order(self):
+        # Равные суммы: порядок как у groupby('Категория').sum() с устойчивой сортировкой по убыванию
+        transactions = pd.DataFrame({
+            'Сумма операции': [-10, -10, -10, -10, -5, 20, 20, -10],
+            'Категория': ['Такси', 'Кафе', 'Переводы', 'Наличные', 'Аптека', 'Кешбэк', 'Бонусы', 'Аптека']
+        })
+        breakdown = get_breakdown(transactions, top_k=3)
+        expenses = transactions[transactions['Сумма операции'] < 0]
+        totals = expenses.groupby('Категория')['Сумма операции'].sum()
+        ranked = totals.sort_values(ascending=False, kind='mergesort')
+
+        self.assertEqual(list(breakdown['expenses']['main']), list(ranked.index[:3]) + ['Остальное'])
+        self.assertEqual(list(breakdown['expenses']['main']), ['Кафе', 'Наличные', 'Переводы', 'Остальное'])
+        self.assertEqual(list(breakdown['expenses']['transfers_and_cash']), ['Наличные', 'Переводы'])
+        self.assertEqual(list(breakdown['income']['main']), ['Бонусы', 'Кешбэк'])
+
+    def test_market_sections_fetch_concurrently(self):
+        # Оба запроса ждут друг друга: при последовательном выполнении барьер не сработает
+        barrier = threading.Barrier(2, timeout=5)
+
+        def rates(currencies):
+            barrier.wait()
+            return {currency: 90.0 for currency in currencies}
+
+        def prices(stocks):
+            barrier.wait()
+            return {stock: 150.0 for stock in stocks}
+
+        with patch('src.views.get_currency_rates', side_effect=rates), \
+                patch('src.views.get_stock_prices', side_effect=prices):
+            sections = get_market_sections({"user_currencies": ["USD"], "user_stocks": ["AAPL"]})
+
+        self.assertEqual(sections, {"currency_rates": {"USD": 90.0}, "stock_prices": {"AAPL": 150.0}})
+
+
+def test_pages_load_only_declared_columns(tmp_path):
+    path = write_operations(str(tmp_path / 'operations.xlsx'), 2000, seed=7)
+    store = TransactionStore(load_transactions(path))
+
+    with patch('src.utils.load_cached_frame', wraps=load_cached_frame) as loader:
+        home = get_home_sections('2021-11-20 12:00:00', path)
+        events = get_events_sections('2021-11-20', 'Y', path)
+    assert loader.call_args_list[0].kwargs['columns'] == HOME_COLUMNS
+    assert loader.call_args_list[1].kwargs['between'][1] == datetime(2021, 1, 1)
+
+    assert json.dumps(home) == json.dumps(get_home_sections('2021-11-20 12:00:00', store))
+    assert json.dumps(events) == json.dumps(get_events_sections('2021-11-20', 'Y', store))
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()